@@ -1,9 +1,7 @@
 import streamlit as st
-import pandas as pd
-import os
-import uuid
-from datetime import datetime
 import utils
+import perf_metrics
+import ticket_schema
 
 # Page configuration
 st.set_page_config(
@@ -13,52 +11,11 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
-# Hide pages from sidebar for regular users and apply custom styling
-# Load custom CSS file
-with open('streamlit/style.css') as f:
-    css = f.read()
-    
-# Add CSS to hide sidebar navigation
-hide_pages_style = """
-<style>
-    div[data-testid="stSidebarNav"] {display: none !important;}
-</style>
-"""
-# Apply both styles
-st.markdown(f"""
-{hide_pages_style}
-<style>
-{css}
-</style>
-""", unsafe_allow_html=True)
-
-# Create data directory if it doesn't exist
-os.makedirs('data', exist_ok=True)
+# Data file path
 data_file = 'data/tickets.csv'
 
-# Initialize dataframe if file doesn't exist
-if not os.path.exists(data_file):
-    initial_df = pd.DataFrame(columns=[
-        'ticket_id', 'created_at', 'updated_at', 'name', 'email', 
-        'subject', 'category', 'priority', 'status', 'description', 'resolution'
-    ])
-    initial_df.to_csv(data_file, index=False)
-
-# Page title with Trakindo CAT theme
-st.markdown("""
-<div style="text-align: center; padding: 1.5rem 0; margin-bottom: 2rem;">
-    <h1 style="color: #000000; font-size: 2.5rem; font-weight: 700; margin-bottom: 0.5rem;">
-        <span style="color: #FFBB00;">🎫 Trakindo</span> Support System
-    </h1>
-    <p style="color: #6b7280; font-size: 1rem;">Submit and track support requests easily</p>
-</div>
-""", unsafe_allow_html=True)
-
-# Create tabs for submission and tracking with improved styling
-tab1, tab2 = st.tabs(["📝 Submit a Ticket", "🔍 Track Your Ticket"])
-
 # Submit a Ticket tab
-with tab1:
+def submit_ticket_tab():
     st.markdown("""
     <h2 style="color: #111827; font-weight: 600; margin-bottom: 1rem; padding-bottom: 0.5rem; border-bottom: 1px solid #e5e7eb;">
         📝 Submit a New Support Ticket
@@ -81,14 +38,11 @@ with tab1:
         with col1:
             name = st.text_input("Full Name *", placeholder="Enter your full name")
             email = st.text_input("Email Address *", placeholder="Enter your email address")
-            category = st.selectbox(
-                "Ticket Category *", 
-                ["General Inquiry", "Technical Support", "Billing Issue", "Feature Request", "Bug Report", "Other"]
-            )
+            category = st.selectbox("Ticket Category *", ticket_schema.CATEGORIES)
         
         with col2:
             subject = st.text_input("Subject Line *", placeholder="Brief summary of your issue")
-            priority = st.selectbox("Priority Level *", ["Low", "Medium", "High", "Critical"],
+            priority = st.selectbox("Priority Level *", ticket_schema.PRIORITIES,
                                   help="Select the urgency of your issue")
         
         description = st.text_area(
@@ -105,27 +59,11 @@ with tab1:
             elif not utils.is_valid_email(email):
                 st.error("Please enter a valid email address.")
             else:
-                # Generate unique ticket ID
-                ticket_id = str(uuid.uuid4())[:8].upper()
-                timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                
-                # Create new ticket
-                new_ticket = {
-                    'ticket_id': ticket_id,
-                    'created_at': timestamp,
-                    'updated_at': timestamp,
-                    'name': name,
-                    'email': email,
-                    'subject': subject,
-                    'category': category,
-                    'priority': priority,
-                    'status': "Open",
-                    'description': description,
-                    'resolution': ""
-                }
+                # Create new ticket, the storage layer allocates its unique ID
+                new_ticket = ticket_schema.new_ticket(name, email, subject, category, priority, description)
                 
                 # Save to CSV
-                utils.add_ticket(new_ticket, data_file)
+                ticket_id = utils.add_ticket(new_ticket, data_file)
                 
                 # Success message with ticket ID
                 st.success(f"Your ticket has been submitted successfully!")
@@ -133,7 +71,7 @@ with tab1:
                 st.info("Please save this ID to track the status of your ticket.")
 
 # Track Your Ticket tab
-with tab2:
+def track_ticket_tab():
     st.markdown("""
     <h2 style="color: #111827; font-weight: 600; margin-bottom: 1rem; padding-bottom: 0.5rem; border-bottom: 1px solid #e5e7eb;">
         🔍 Track Your Existing Ticket
@@ -226,8 +164,50 @@ with tab2:
             else:
                 st.error(f"No ticket found with ID: {ticket_id}")
 
-# Footer with Trakindo CAT theme
-st.markdown("""
+# Main page function
+def show_app():
+    # Hide pages from sidebar for regular users and apply custom styling
+    # Load custom CSS file (cached until the file changes)
+    css = utils.read_static_file('streamlit/style.css')
+    
+    # Add CSS to hide sidebar navigation
+    hide_pages_style = """
+<style>
+    div[data-testid="stSidebarNav"] {display: none !important;}
+</style>
+"""
+    # Apply both styles
+    st.markdown(f"""
+{hide_pages_style}
+<style>
+{css}
+</style>
+""", unsafe_allow_html=True)
+    
+    # Create the data directory and an empty tickets file on the first run of this process
+    utils.ensure_tickets_file(data_file)
+    
+    # Page title with Trakindo CAT theme
+    st.markdown("""
+<div style="text-align: center; padding: 1.5rem 0; margin-bottom: 2rem;">
+    <h1 style="color: #000000; font-size: 2.5rem; font-weight: 700; margin-bottom: 0.5rem;">
+        <span style="color: #FFBB00;">🎫 Trakindo</span> Support System
+    </h1>
+    <p style="color: #6b7280; font-size: 1rem;">Submit and track support requests easily</p>
+</div>
+""", unsafe_allow_html=True)
+    
+    # Create tabs for submission and tracking with improved styling
+    tab1, tab2 = st.tabs(["📝 Submit a Ticket", "🔍 Track Your Ticket"])
+    
+    with tab1:
+        submit_ticket_tab()
+    
+    with tab2:
+        track_ticket_tab()
+    
+    # Footer with Trakindo CAT theme
+    st.markdown("""
 <div style="margin-top: 3rem; padding-top: 1.5rem; border-top: 1px solid #e5e7eb; text-align: center;">
     <p style="color: #6b7280; font-size: 0.875rem;">© 2025 Trakindo Support System • Need help? <a href="mailto:support@trakindo.co.id" style="color: #FFBB00; text-decoration: none; font-weight: 500;">Contact Support</a></p>
 </div>
@@ -236,3 +216,7 @@ st.markdown("""
     <a href="/admin_dashboard" target="_self">Admin</a>
 </div>
 """, unsafe_allow_html=True)
+
+# Main execution, timed as one rerun of the page
+with perf_metrics.measure('page.app'):
+    show_app()
@@ -0,0 +1,63 @@
+"""
+Regression check: adding a ticket must not get slower as the tickets file grows.
+
+Generates a small and a large synthetic tickets file (see synthetic_data.py),
+times add_ticket on each after a few warm-up appends (the first write builds
+the index and the stats and rollup sidecars), and compares the median times.
+Exits with status 1 if the large file's median is more than --max-ratio times
+the small file's, which is what a full rewrite or re-parse per append shows.
+
+    python benchmarks/append_latency.py
+    python benchmarks/append_latency.py --large 1m --max-ratio 2
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import utils
+import synthetic_data
+from bench_utils import new_ticket
+
+WARMUP_APPENDS = 3
+
+def append_median(count, appends):
+    """
+    Median seconds of add_ticket against a fresh file of count tickets
+    """
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = synthetic_data.write_data_dir(tmp_dir, count)
+        for n in range(WARMUP_APPENDS):
+            utils.add_ticket(new_ticket(n), file_path)
+        
+        timings = []
+        for n in range(WARMUP_APPENDS, WARMUP_APPENDS + appends):
+            start = time.perf_counter()
+            utils.add_ticket(new_ticket(n), file_path)
+            timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--small', choices=list(synthetic_data.SIZES), default='1k')
+    parser.add_argument('--large', choices=list(synthetic_data.SIZES), default='100k')
+    parser.add_argument('--appends', type=int, default=50, help='timed appends per file')
+    parser.add_argument('--max-ratio', type=float, default=3.0, help='largest allowed large/small median ratio')
+    args = parser.parse_args()
+    
+    medians = {}
+    for size_name in (args.small, args.large):
+        medians[size_name] = append_median(synthetic_data.SIZES[size_name], args.appends)
+        print(f"{size_name:>5} tickets: add_ticket median {medians[size_name] * 1000:8.2f} ms")
+    
+    ratio = medians[args.large] / medians[args.small]
+    if ratio > args.max_ratio:
+        print(f"FAIL: appending to {args.large} tickets is x{ratio:.1f} slower than to {args.small} (max x{args.max_ratio:g})")
+        sys.exit(1)
+    print(f"OK: x{ratio:.2f} (max x{args.max_ratio:g})")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""
+Micro-benchmarks for the storage functions in utils.
+
+For each size a synthetic tickets file is generated (see synthetic_data.py)
+and the functions the pages call are timed: the first (cold) call, which
+parses the file or builds a sidecar, and repeated warm calls. Results are
+written as JSON; pass an earlier result file to --compare to see the change
+per operation.
+
+    python benchmarks/bench_utils.py --sizes 1k 100k --output results.json
+    python benchmarks/bench_utils.py --sizes 1k 100k --compare results.json
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import utils
+import synthetic_data
+
+SEARCH_TERMS = ['printer', 'login', 'andi', 'floor error', 'A1']
+
+def timed(func, *args, **kwargs):
+    start = time.perf_counter()
+    func(*args, **kwargs)
+    return time.perf_counter() - start
+
+def summarize(timings):
+    timings = sorted(timings)
+    return {
+        'runs': len(timings),
+        'median_ms': statistics.median(timings) * 1000,
+        'p95_ms': timings[min(len(timings) - 1, int(len(timings) * 0.95))] * 1000,
+        'min_ms': timings[0] * 1000,
+        'max_ms': timings[-1] * 1000,
+    }
+
+def new_ticket(n):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return {
+        'ticket_id': f'BENCH{n:03d}', 'created_at': timestamp, 'updated_at': timestamp,
+        'name': 'Bench User', 'email': 'bench@example.com', 'subject': 'Benchmark ticket',
+        'category': 'Other', 'priority': 'Low', 'status': 'Open',
+        'description': 'Added by the benchmark', 'resolution': ''
+    }
+
+def run_size(size_name, count, repeats, write_repeats):
+    """
+    Timings of every operation against a fresh file of count tickets
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = synthetic_data.write_data_dir(tmp_dir, count)
+        ids = pd.read_csv(file_path, usecols=['ticket_id'])['ticket_id'].tolist()
+        rng = random.Random(0)
+        
+        # First calls parse the CSV or build the index, stats and search sidecars
+        results['get_all_tickets (cold)'] = [timed(utils.get_all_tickets, file_path)]
+        results['get_ticket_stats (cold)'] = [timed(utils.get_ticket_stats, file_path)]
+        results['get_ticket_by_id (cold)'] = [timed(utils.get_ticket_by_id, rng.choice(ids), file_path)]
+        results['search_tickets index (cold)'] = [timed(utils.search_tickets, SEARCH_TERMS[0], file_path)]
+        
+        results['get_all_tickets'] = [timed(utils.get_all_tickets, file_path) for _ in range(repeats)]
+        results['get_ticket_stats'] = [timed(utils.get_ticket_stats, file_path) for _ in range(repeats)]
+        results['get_ticket_by_id'] = [timed(utils.get_ticket_by_id, rng.choice(ids), file_path) for _ in range(repeats)]
+        results['search_tickets index'] = [
+            timed(utils.search_tickets, SEARCH_TERMS[n % len(SEARCH_TERMS)], file_path) for n in range(repeats)
+        ]
+        results['search_tickets substring'] = [
+            timed(utils.search_tickets, SEARCH_TERMS[n % len(SEARCH_TERMS)], file_path, mode='substring') for n in range(repeats)
+        ]
+        
+        # Writes, each followed by the sidecar updates it triggers
+        results['add_ticket'] = [timed(utils.add_ticket, new_ticket(n), file_path) for n in range(write_repeats)]
+        results['update_ticket'] = [
+            timed(utils.update_ticket, rng.choice(ids), {'status': 'In Progress'}, file_path) for _ in range(write_repeats)
+        ]
+        results['delete_ticket'] = [timed(utils.delete_ticket, f'BENCH{n:03d}', file_path) for n in range(write_repeats)]
+    
+    return [dict(summarize(timings), size=size_name, rows=count, operation=operation) for operation, timings in results.items()]
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+def compare(results, previous_path):
+    with open(previous_path, encoding='utf-8') as f:
+        previous = {(r['size'], r['operation']): r for r in json.load(f)['results']}
+    
+    print(f"\nChange against {previous_path} (median):")
+    for result in results:
+        before = previous.get((result['size'], result['operation']))
+        if before and before['median_ms'] > 0:
+            ratio = result['median_ms'] / before['median_ms']
+            print(f"  {result['size']:>5} {result['operation']:<30} {before['median_ms']:10.2f} -> {result['median_ms']:10.2f} ms  x{ratio:.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', nargs='+', choices=list(synthetic_data.SIZES), default=['1k', '100k'])
+    parser.add_argument('--repeats', type=int, default=20, help='runs of each read operation')
+    parser.add_argument('--write-repeats', type=int, default=5, help='runs of each write operation')
+    parser.add_argument('--output', default=f"bench_utils_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+    parser.add_argument('--compare', help='earlier result file to compare with')
+    args = parser.parse_args()
+    
+    results = []
+    for size_name in args.sizes:
+        count = synthetic_data.SIZES[size_name]
+        print(f"{size_name} ({count} tickets):")
+        for result in run_size(size_name, count, args.repeats, args.write_repeats):
+            results.append(result)
+            print(f"  {result['operation']:<30} median {result['median_ms']:10.2f} ms  p95 {result['p95_ms']:10.2f} ms")
+    
+    report = {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'commit': git_commit(),
+        'backend': utils.get_storage_backend(),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'results': results,
+    }
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+    
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == '__main__':
+    main()
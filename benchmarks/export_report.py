@@ -0,0 +1,92 @@
+"""
+Benchmark for the Reports page export.
+
+Builds a synthetic report table and exports it in every format, once with the
+old whole-table approach (to_csv() to a string, pandas ExcelWriter into a
+BytesIO) and once through the streaming exporter. Prints the time until the
+file is ready for download and the peak memory allocated during the export.
+
+    python benchmarks/export_report.py --rows 200000
+"""
+import argparse
+import io
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import ticket_export
+import ticket_snapshot
+
+def make_report_table(rows):
+    rng = np.random.default_rng(0)
+    created_at = pd.Timestamp('2024-01-01') + pd.to_timedelta(np.sort(rng.integers(0, 365 * 86400, rows)), unit='s')
+    tickets_df = pd.DataFrame({
+        'ticket_id': [f'{n:08x}' for n in range(rows)],
+        'created_at': created_at.strftime('%Y-%m-%d %H:%M:%S'),
+        'updated_at': created_at.strftime('%Y-%m-%d %H:%M:%S'),
+        'name': [f'User {n % 5000}' for n in range(rows)],
+        'email': [f'user{n % 5000}@example.com' for n in range(rows)],
+        'subject': rng.choice(['Printer jam', 'Login issue', 'Invoice wrong', 'Need a new chair'], rows),
+        'category': rng.choice(['General Inquiry', 'Technical Support', 'Billing Issue', 'Other'], rows),
+        'priority': rng.choice(['Low', 'Medium', 'High', 'Critical'], rows),
+        'status': rng.choice(['Open', 'In Progress', 'Resolved', 'Closed'], rows),
+        'description': 'The device on the second floor stopped working, please check it.',
+        'resolution': '',
+    })
+    return ticket_snapshot.to_report_table(tickets_df)
+
+def whole_table(report_df, export_format):
+    """
+    The export as it was done before: the complete file built in memory
+    """
+    if export_format == 'CSV':
+        return report_df.to_csv(index=False).encode('utf-8')
+    if export_format == 'JSON Lines':
+        return report_df.to_json(orient='records', lines=True, date_format='iso').encode('utf-8')
+    output = io.BytesIO()
+    with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
+        report_df.to_excel(writer, sheet_name='Ticket Data', index=False)
+    return output.getvalue()
+
+def streamed(report_df, export_format):
+    with ticket_export.export_tickets(ticket_export.iter_chunks(report_df), report_df.columns, export_format) as report_file:
+        report_file.seek(0, os.SEEK_END)
+        return report_file.tell()
+
+def measure(func, *args):
+    """
+    Time of one run, then peak allocated memory of a second, traced run (tracing slows it down)
+    """
+    start = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - start
+    size = result if isinstance(result, int) else len(result)
+    del result
+    
+    tracemalloc.start()
+    func(*args)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, size
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=200000, help='rows in the exported table')
+    parser.add_argument('--formats', nargs='+', default=list(ticket_export.EXPORT_FORMATS), help='formats to export')
+    args = parser.parse_args()
+    
+    report_df = make_report_table(args.rows)
+    print(f"Exporting {len(report_df)} rows")
+    
+    for export_format in args.formats:
+        for label, func in [('whole table', whole_table), ('streamed', streamed)]:
+            elapsed, peak, size = measure(func, report_df, export_format)
+            print(f"{export_format:<10} {label:<12} {elapsed:7.2f}s  peak {peak / 2**20:8.1f} MiB  file {size / 2**20:8.1f} MiB")
+
+if __name__ == '__main__':
+    main()
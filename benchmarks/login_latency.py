@@ -0,0 +1,112 @@
+"""
+Benchmark for logins.
+
+Measures the time to verify a password at several PBKDF2 iteration counts and
+reports the highest tested count that stays within a login latency budget
+(set it with the PASSWORD_HASH_ITERATIONS environment variable). Then it runs a
+burst of concurrent logins against a user directory with many accounts and
+compares the lookup cost with parsing admin.csv on every login.
+
+    python benchmarks/login_latency.py --budget-ms 250 --users 500 --threads 16
+"""
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import utils
+
+ITERATION_COUNTS = [60000, 120000, 240000, 480000, 960000]
+
+def verify_latency(iterations, repeats):
+    hashed = utils.hash_password('correct horse', iterations=iterations)
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        utils.verify_password(hashed, 'correct horse')
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+def login_burst(threads, logins_per_thread, usernames, lookup, verify):
+    """
+    Logins from several threads at once, as at shift start. Returns per-login latencies.
+    """
+    latencies = []
+    lock = threading.Lock()
+    
+    def login(thread_no):
+        local = []
+        for i in range(logins_per_thread):
+            username = usernames[(thread_no * logins_per_thread + i) % len(usernames)]
+            start = time.perf_counter()
+            user = lookup(username)
+            if verify:
+                utils.verify_password(user['password'], 'secret')
+            local.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(local)
+    
+    workers = [threading.Thread(target=login, args=(n,)) for n in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return sorted(latencies)
+
+def read_csv_lookup(username):
+    """
+    The lookup as it was done before: parse admin.csv and filter
+    """
+    admin_df = pd.read_csv(utils.ADMIN_FILE)
+    return admin_df[admin_df['username'] == username].iloc[0].to_dict()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--budget-ms', type=float, default=250, help='login latency budget for the password check')
+    parser.add_argument('--repeats', type=int, default=5, help='verifications per iteration count')
+    parser.add_argument('--users', type=int, default=500, help='accounts in the admin file')
+    parser.add_argument('--threads', type=int, default=16, help='concurrent logins')
+    parser.add_argument('--logins', type=int, default=5, help='logins per thread')
+    args = parser.parse_args()
+    
+    print("PBKDF2-SHA256 verification time:")
+    within_budget = None
+    for iterations in ITERATION_COUNTS:
+        latency_ms = verify_latency(iterations, args.repeats) * 1000
+        marker = ''
+        if latency_ms <= args.budget_ms:
+            within_budget = iterations
+            marker = '  within budget'
+        print(f"  {iterations:>8} iterations  {latency_ms:8.1f} ms{marker}")
+    print(f"Configured: {utils.PASSWORD_HASH_ITERATIONS} iterations; "
+          f"highest tested within {args.budget_ms:.0f} ms: {within_budget}")
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        utils.ADMIN_FILE = os.path.join(tmp_dir, 'admin.csv')
+        # One hash shared by every account keeps the setup fast
+        hashed = utils.hash_password('secret')
+        utils._write_users([{'username': f'user{n}', 'password': hashed, 'role': 'staff'} for n in range(args.users)])
+        usernames = [f'user{n}' for n in range(args.users)]
+        
+        runs = [
+            ('csv parse, lookup only', read_csv_lookup, False),
+            ('directory, lookup only', utils.get_admin_user, False),
+            ('csv parse + verify', read_csv_lookup, True),
+            ('directory + verify', utils.get_admin_user, True),
+        ]
+        for label, lookup, verify in runs:
+            start = time.perf_counter()
+            latencies = login_burst(args.threads, args.logins, usernames, lookup, verify)
+            elapsed = time.perf_counter() - start
+            p50 = latencies[len(latencies) // 2] * 1000
+            p95 = latencies[int(len(latencies) * 0.95)] * 1000
+            print(f"{label:<24} {len(latencies)} logins in {elapsed:.2f}s  p50 {p50:.2f} ms  p95 {p95:.2f} ms")
+
+if __name__ == '__main__':
+    main()
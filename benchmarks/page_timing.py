@@ -0,0 +1,119 @@
+"""
+Import time and rerun wall time of the app and its pages.
+
+For every page, a fresh interpreter imports the modules the page imports at
+the top level (in order) and reports how long each took, which is the cold
+start cost of the page in a new server process. Then the page is run with
+Streamlit's AppTest against a synthetic data directory: once cold and then
+--reruns more times, reporting the median and worst rerun.
+
+    python benchmarks/page_timing.py --tickets 5000 --reruns 10
+"""
+import argparse
+import ast
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+PAGES = ['app.py', 'pages/admin_dashboard.py', 'pages/reports.py', 'pages/user_management.py']
+
+IMPORT_PROBE = """
+import json, sys, time
+sys.path.insert(0, {root!r})
+timings = []
+for name in {modules!r}:
+    start = time.perf_counter()
+    __import__(name)
+    timings.append((name, time.perf_counter() - start))
+print(json.dumps(timings))
+"""
+
+def top_level_imports(page):
+    """
+    Modules a page imports at module level, in order
+    """
+    with open(os.path.join(ROOT, page), encoding='utf-8') as f:
+        tree = ast.parse(f.read())
+    
+    modules = []
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            modules.extend(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+            modules.append(node.module)
+    return list(dict.fromkeys(modules))
+
+def import_times(page):
+    probe = IMPORT_PROBE.format(root=ROOT, modules=top_level_imports(page))
+    output = subprocess.run([sys.executable, '-c', probe], capture_output=True, text=True, check=True, cwd=ROOT).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def make_data_dir(work_dir, tickets):
+    import utils
+    from datetime import datetime, timedelta
+    
+    os.makedirs(os.path.join(work_dir, 'data'))
+    shutil.copytree(os.path.join(ROOT, 'streamlit'), os.path.join(work_dir, 'streamlit'))
+    
+    statuses = ['Open', 'In Progress', 'Resolved', 'Closed']
+    rows = []
+    for n in range(tickets):
+        timestamp = (datetime(2025, 1, 1) + timedelta(minutes=37 * n)).strftime("%Y-%m-%d %H:%M:%S")
+        rows.append({
+            'ticket_id': f'{n:08X}', 'created_at': timestamp, 'updated_at': timestamp,
+            'name': f'User {n % 300}', 'email': f'user{n % 300}@example.com', 'subject': f'Request {n}',
+            'category': 'Technical Support', 'priority': 'Medium', 'status': statuses[n % 4],
+            'description': 'Synthetic ticket', 'resolution': ''
+        })
+    utils.data_writer.run('data/tickets.csv', utils._append_tickets, 'data/tickets.csv', rows)
+
+def rerun_times(page, reruns):
+    from streamlit.testing.v1 import AppTest
+    
+    at = AppTest.from_file(os.path.join(ROOT, page), default_timeout=120)
+    at.session_state['authenticated'] = True
+    at.session_state['username'] = 'admin'
+    
+    timings = []
+    for _ in range(reruns + 1):
+        start = time.perf_counter()
+        at.run()
+        timings.append(time.perf_counter() - start)
+    if at.exception:
+        print(f"  {page}: {at.exception[0].value}")
+    return timings[0], timings[1:]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--tickets', type=int, default=5000, help='tickets in the synthetic data directory')
+    parser.add_argument('--reruns', type=int, default=10, help='reruns per page after the first run')
+    parser.add_argument('--pages', nargs='+', default=PAGES, help='pages to measure')
+    args = parser.parse_args()
+    
+    print("Import time in a fresh interpreter:")
+    for page in args.pages:
+        timings = import_times(page)
+        detail = ', '.join(f"{name} {seconds * 1000:.0f}" for name, seconds in timings if seconds >= 0.001)
+        print(f"  {page:<28} {sum(seconds for _, seconds in timings) * 1000:7.0f} ms  ({detail})")
+    
+    with tempfile.TemporaryDirectory() as work_dir:
+        os.chdir(work_dir)
+        make_data_dir(work_dir, args.tickets)
+        
+        print(f"Rerun wall time with {args.tickets} tickets:")
+        for page in args.pages:
+            first, reruns = rerun_times(page, args.reruns)
+            print(f"  {page:<28} first {first * 1000:7.0f} ms  rerun median {statistics.median(reruns) * 1000:6.0f} ms  "
+                  f"max {max(reruns) * 1000:6.0f} ms")
+        os.chdir(ROOT)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark for the ranked, typo-tolerant ticket search.
+
+Writes a synthetic tickets file (see synthetic_data.py), builds the search
+index once, and times each query the way the admin search used to run it (a
+case-insensitive substring scan of every search field, sorted by created_at)
+against the word-prefix index and the ranked top-k search. Prints the time and
+number of results of each, and the best ranked match.
+
+    python benchmarks/ranked_search.py --size 1m
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import search_index
+import synthetic_data
+import ticket_schema
+
+QUERIES = ['printer', 'pritner', 'vpn disconects', 'andi santoso', 'acess card']
+
+def substring_scan(tickets_df, query):
+    """
+    The admin search before ranking: every substring match, newest first
+    """
+    mask = pd.Series(False, index=tickets_df.index)
+    for column in search_index.SEARCH_FIELDS:
+        mask |= tickets_df[column].astype('string').str.contains(query, case=False, na=False, regex=False)
+    return tickets_df[mask].sort_values('created_at', ascending=False)
+
+def best_time(func, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', choices=list(synthetic_data.SIZES), default='1m')
+    parser.add_argument('--repeats', type=int, default=3, help='timed runs of each query')
+    parser.add_argument('--limit', type=int, default=50, help='results of a ranked search')
+    args = parser.parse_args()
+    
+    count = synthetic_data.SIZES[args.size]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = synthetic_data.write_data_dir(tmp_dir, count)
+        tickets_df = ticket_schema.read_tickets(file_path)
+    
+    version = (count,)
+    start = time.perf_counter()
+    search_index.search(file_path, 'warmup', tickets_df, version)
+    print(f"{count} tickets, word index built in {time.perf_counter() - start:.1f} s")
+    start = time.perf_counter()
+    search_index.rank(file_path, 'warmup', tickets_df, version, args.limit)
+    print(f"trigram index of the vocabulary built in {(time.perf_counter() - start) * 1000:.0f} ms")
+    
+    print(f"{'query':<16} {'substring scan':>22} {'word index':>22} {'ranked top-k':>22}  best match")
+    for query in QUERIES:
+        scan_seconds, scan_df = best_time(lambda: substring_scan(tickets_df, query), args.repeats)
+        index_seconds, index_ids = best_time(lambda: search_index.search(file_path, query, tickets_df, version), args.repeats)
+        rank_seconds, ranked = best_time(lambda: search_index.rank(file_path, query, tickets_df, version, args.limit), args.repeats)
+        
+        best = ''
+        if ranked:
+            row = tickets_df[tickets_df['ticket_id'] == ranked[0][0]].iloc[0]
+            best = f"{row['subject']} ({row['name']}, {ranked[0][1]:.2f})"
+        print(
+            f"{query:<16} {scan_seconds * 1000:8.0f} ms {len(scan_df):>8} hits "
+            f"{index_seconds * 1000:8.0f} ms {len(index_ids):>8} hits "
+            f"{rank_seconds * 1000:8.0f} ms {len(ranked):>8} hits  {best}"
+        )
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark for column-projected, dtype-declared reads of the tickets file.
+
+Writes a synthetic tickets file (see synthetic_data.py) and parses it the way
+the storage functions used to (pd.read_csv of every column with inferred
+dtypes) and the way they do now: the full table with declared dtypes, the
+stats and rollup columns with categorical status/category/priority, and the
+typed Reports table. Prints the parse time, the size of the resulting table
+and the peak memory allocated while parsing.
+
+    python benchmarks/read_columns.py --size 1m
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import synthetic_data
+import ticket_rollup
+import ticket_schema
+import ticket_stats
+
+def reads(file_path):
+    """
+    (label, function) of every read to compare
+    """
+    return [
+        ("all columns, inferred (before)", lambda: pd.read_csv(file_path)),
+        ("all columns, declared", lambda: ticket_schema.read_tickets(file_path)),
+        ("stats columns, categorical", lambda: ticket_schema.read_tickets(
+            file_path, list(ticket_stats.COUNTED_COLUMNS), categorical=True)),
+        ("rollup columns, categorical", lambda: ticket_schema.read_tickets(
+            file_path, ticket_rollup.ROLLUP_COLUMNS, categorical=True)),
+        ("report table, typed", lambda: ticket_schema.read_tickets(
+            file_path, categorical=True, parse_dates=True)),
+    ]
+
+def measure(func, repeats):
+    """
+    Best time of repeats runs and the table's size, then the peak allocated memory
+    of a separate, traced run (tracing slows it down)
+    """
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        tickets_df = func()
+        timings.append(time.perf_counter() - start)
+    table_bytes = int(tickets_df.memory_usage(deep=True).sum())
+    del tickets_df
+    
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return min(timings), table_bytes, peak
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', choices=list(synthetic_data.SIZES), default='1m')
+    parser.add_argument('--repeats', type=int, default=3, help='timed runs of each read')
+    args = parser.parse_args()
+    
+    count = synthetic_data.SIZES[args.size]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = synthetic_data.write_data_dir(tmp_dir, count)
+        print(f"{count} tickets, {os.path.getsize(file_path) / 2 ** 20:.0f} MiB CSV")
+        print(f"{'read':<32} {'parse':>10} {'table':>12} {'peak':>12}")
+        
+        for label, func in reads(file_path):
+            seconds, table_bytes, peak = measure(func, args.repeats)
+            print(f"{label:<32} {seconds * 1000:8.0f} ms {table_bytes / 2 ** 20:8.1f} MiB {peak / 2 ** 20:8.1f} MiB")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Check that the ticket-store service serves only its tickets files.
+
+Writes a tickets file and an admin file into a temporary data directory,
+builds the sidecars with a few reads and writes, and calls every operation
+of ticket_rpc.OPERATIONS on the admin file, the token and socket files, the
+sidecars, the archive and a path leading out of the directory. Every one of
+these calls has to be refused, and the same calls on the tickets file have to
+work. Exits with status 1 otherwise.
+
+    python benchmarks/server_paths.py
+"""
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import utils
+import synthetic_data
+import ticket_server
+from bench_utils import new_ticket
+
+def calls_on(file_path):
+    """
+    One call of every served operation on file_path
+    """
+    return [
+        {'op': 'get_all_tickets', 'args': [file_path]},
+        {'op': 'get_ticket_by_id', 'args': ['admin', file_path]},
+        {'op': 'search_tickets', 'args': ['admin', file_path]},
+        {'op': 'get_ticket_stats', 'args': [file_path]},
+        {'op': 'get_daily_rollup', 'args': [file_path]},
+        {'op': 'get_change_version', 'args': [file_path]},
+        {'op': 'get_changes_since', 'args': [0, file_path]},
+        {'op': 'add_ticket', 'args': [{'ticket_id': 'mallory', 'created_at': 'hash', 'updated_at': 'admin'}, file_path]},
+        {'op': 'update_tickets', 'args': [['admin'], {'status': 'Closed'}, file_path]},
+        {'op': 'delete_tickets', 'args': [['admin'], file_path]},
+    ]
+
+def main():
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        tickets_file = synthetic_data.write_data_dir(tmp_dir, 200, users=3)
+        admin_file = os.path.join(tmp_dir, 'admin.csv')
+        ticket_server.set_tickets_files(tmp_dir, [ticket_server.DEFAULT_TICKETS])
+        utils.ADMIN_FILE = admin_file
+        ticket_server.load_token(tmp_dir)
+        
+        # Reads and writes that create the sidecars next to the tickets file
+        utils.add_ticket(new_ticket(0), tickets_file)
+        utils.delete_tickets(['BENCH000'], tickets_file)
+        utils.get_ticket_stats(tickets_file)
+        utils.get_daily_rollup(tickets_file)
+        utils.get_all_tickets(tickets_file)
+        
+        refused_paths = [admin_file, os.path.join(tmp_dir, ticket_server.TOKEN_NAME),
+                         os.path.join(tmp_dir, ticket_server.SOCKET_NAME),
+                         os.path.join(tmp_dir, 'archive', 'tickets-2024-01.csv.gz'),
+                         os.path.join(tmp_dir, '..', 'tickets.csv'), os.path.join(tmp_dir, 'sub', '..', 'admin.csv')]
+        refused_paths += [os.path.join(tmp_dir, name) for name in sorted(os.listdir(tmp_dir))
+                          if name.startswith('tickets.') and name != 'tickets.csv']
+        with open(admin_file, 'rb') as f:
+            admin_before = f.read()
+        
+        for path in refused_paths:
+            for call, result in zip(calls_on(path), ticket_server.execute(calls_on(path))):
+                if result['ok'] or result['type'] != 'PermissionError':
+                    failures.append(f"{call['op']} on {os.path.relpath(path, tmp_dir)} was not refused: {result}")
+        with open(admin_file, 'rb') as f:
+            if f.read() != admin_before:
+                failures.append("admin.csv was changed")
+        
+        for call, result in zip(calls_on(tickets_file), ticket_server.execute(calls_on(tickets_file))):
+            if not result['ok']:
+                failures.append(f"{call['op']} on tickets.csv failed: {result}")
+        print(f"{len(refused_paths)} paths checked: {', '.join(os.path.relpath(path, tmp_dir) for path in refused_paths)}")
+    
+    if failures:
+        print('FAIL:')
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print('OK: only tickets.csv is served')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Check that a process notices sidecar logs that another process cleared and
+created again.
+
+This process deletes a ticket and reads the tickets, the ID index, the change
+log and the rollup, so it has all of them loaded. A second process then
+compacts the file, which removes the tombstones and rebuilds the index, and
+deletes two more tickets, which creates the tombstones again. It removes the
+change log and deletes one more ticket, then removes the rollup and rebuilds it.
+Each new file is created right after the old one was removed, so on ext4 it
+gets the old file's inode number. This process then has to see exactly the
+second process's state: the right tickets, no deleted ticket through the
+index, the new change version and rollup counts that add up. Exits with
+status 1 otherwise.
+
+    python benchmarks/sidecar_reload.py
+"""
+import multiprocessing
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import utils
+import synthetic_data
+import ticket_changes
+import ticket_rollup
+
+def recreate_sidecars(file_path, deleted_ids, last_id):
+    """
+    Run in the second process: clear and create again each sidecar log
+    """
+    utils.compact_tickets(file_path)
+    utils.delete_tickets(deleted_ids, file_path)
+    os.remove(ticket_changes.changes_path_for(file_path))
+    utils.delete_tickets([last_id], file_path)
+    os.remove(ticket_rollup.rollup_path_for(file_path))
+    utils.get_daily_rollup(file_path)
+    return utils.get_change_version(file_path)
+
+def main():
+    failures = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = synthetic_data.write_data_dir(tmp_dir, 200)
+        ticket_ids = utils.get_all_tickets(file_path)['ticket_id'].tolist()
+        first, second, third, last, kept = ticket_ids[:5]
+        deleted = {first, second, third, last}
+        
+        utils.delete_tickets([first], file_path)
+        utils.get_all_tickets(file_path)
+        utils.get_ticket_by_id(kept, file_path)
+        utils.get_change_version(file_path)
+        utils.get_daily_rollup(file_path)
+        
+        with multiprocessing.get_context('spawn').Pool(1) as pool:
+            version = pool.apply(recreate_sidecars, (file_path, [second, third], last))
+        
+        tickets_df = utils.get_all_tickets(file_path)
+        listed = set(tickets_df['ticket_id'])
+        if len(tickets_df) != 196 or listed & deleted:
+            failures.append(f"get_all_tickets: {len(tickets_df)} tickets, deleted ones listed: {sorted(listed & deleted)}")
+        for ticket_id in sorted(deleted):
+            if utils.get_ticket_by_id(ticket_id, file_path) is not None:
+                failures.append(f"get_ticket_by_id found the deleted ticket {ticket_id}")
+        if utils.get_ticket_by_id(kept, file_path) is None:
+            failures.append(f"get_ticket_by_id didn't find {kept}")
+        if utils.get_change_version(file_path) != version:
+            failures.append(f"change version {utils.get_change_version(file_path)}, the other process wrote {version}")
+        rollup_total = int(utils.get_daily_rollup(file_path)['count'].sum())
+        if rollup_total != 196:
+            failures.append(f"the rollup counts {rollup_total} tickets")
+    
+    if failures:
+        print('FAIL:')
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print('OK: the sidecars recreated by the other process were read again from the start')
+
+if __name__ == '__main__':
+    main()
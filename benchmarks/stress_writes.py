@@ -0,0 +1,98 @@
+"""
+Stress test for the single-writer pipeline.
+
+Many threads (and optionally several processes) submit tickets to the same
+CSV file at once, some of them also updating tickets. At the end every
+submitted ticket has to be present exactly once, findable through the index
+and counted in the dashboard stats.
+
+    python benchmarks/stress_writes.py --threads 32 --tickets 50 --processes 2
+"""
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import utils
+import data_writer
+
+def make_ticket(ticket_id):
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return {
+        'ticket_id': ticket_id,
+        'created_at': timestamp,
+        'updated_at': timestamp,
+        'name': 'Stress Tester',
+        'email': 'stress@example.com',
+        'subject': f'Stress ticket {ticket_id}',
+        'category': 'Technical Support',
+        'priority': 'Medium',
+        'status': 'Open',
+        'description': 'Submitted concurrently,\nwith "quotes" and a second line',
+        'resolution': ''
+    }
+
+def submit_tickets(file_path, prefix, threads, tickets_per_thread):
+    """
+    Submit tickets from several threads of this process, updating every tenth one
+    """
+    def submitter(thread_no):
+        for i in range(tickets_per_thread):
+            ticket_id = f"{prefix}{thread_no:03d}{i:05d}"
+            utils.add_ticket(make_ticket(ticket_id), file_path)
+            if i % 10 == 0:
+                utils.update_ticket(ticket_id, {'status': 'In Progress'}, file_path)
+    
+    workers = [threading.Thread(target=submitter, args=(n,)) for n in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    
+    return data_writer.get_writer_stats()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--threads', type=int, default=32, help='submitting threads per process')
+    parser.add_argument('--tickets', type=int, default=50, help='tickets per thread')
+    parser.add_argument('--processes', type=int, default=1, help='server processes writing the same file')
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        file_path = os.path.join(tmp_dir, 'tickets.csv')
+        expected = args.threads * args.tickets * args.processes
+        
+        start = time.perf_counter()
+        if args.processes == 1:
+            writer_stats = submit_tickets(file_path, 'P0', args.threads, args.tickets)
+            print(f"Writer: {writer_stats['jobs']} jobs in {writer_stats['flushes']} flushes")
+        else:
+            with multiprocessing.Pool(args.processes) as pool:
+                pool.starmap(submit_tickets, [(file_path, f'P{n}', args.threads, args.tickets) for n in range(args.processes)])
+        elapsed = time.perf_counter() - start
+        
+        # Every submission must be there exactly once
+        tickets_df = utils.get_all_tickets(file_path)
+        ids = tickets_df['ticket_id'].astype(str)
+        stats = utils.get_ticket_stats(file_path)
+        lost = expected - ids.nunique()
+        duplicated = int(ids.duplicated().sum())
+        missing_in_index = sum(utils.get_ticket_by_id(ticket_id, file_path) is None for ticket_id in ids.sample(min(200, len(ids))))
+        
+        print(f"Submitted {expected} tickets ({args.processes} x {args.threads} threads) in {elapsed:.2f}s "
+              f"= {expected / elapsed:.0f} writes/s")
+        print(f"Stored {len(tickets_df)} rows, lost {lost}, duplicated {duplicated}, "
+              f"index misses {missing_in_index}, stats total {stats['total']}, "
+              f"stats consistent {utils.verify_ticket_stats(file_path)}")
+        
+        ok = lost == 0 and duplicated == 0 and missing_in_index == 0 and stats['total'] == expected
+        print("OK" if ok else "FAILED")
+        sys.exit(0 if ok else 1)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,153 @@
+"""
+Synthetic tickets and users for benchmarks.
+
+Tickets follow the app's categories, priorities and statuses with skewed
+frequencies, arrive mostly during office hours over the last year, and older
+tickets are more likely to be resolved or closed. Descriptions have
+log-normally distributed lengths. Columns are generated with numpy; a million
+rows take about ten seconds.
+
+    python benchmarks/synthetic_data.py --size 100k --users 50 --out /tmp/bench-data
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import utils
+
+SIZES = {'1k': 1000, '100k': 100000, '1m': 1000000}
+
+# Choices as offered by the forms, with their relative frequencies
+CATEGORIES = {
+    'General Inquiry': 0.25, 'Technical Support': 0.35, 'Billing Issue': 0.12,
+    'Feature Request': 0.08, 'Bug Report': 0.15, 'Other': 0.05,
+}
+PRIORITIES = {'Low': 0.30, 'Medium': 0.40, 'High': 0.20, 'Critical': 0.10}
+
+SUBJECTS = [
+    'Printer not working', 'Cannot log in', 'Invoice amount is wrong', 'Request for a new laptop',
+    'Air conditioning broken', 'Meeting room booking', 'Access card expired', 'Email not syncing',
+    'Broken chair', 'VPN disconnects', 'Parking permit', 'Software license request',
+]
+WORDS = (
+    'the unit on second floor stopped working after update please check urgent site office '
+    'again since monday error message shows when trying to open report machine team need access'
+).split()
+FIRST_NAMES = ['Andi', 'Budi', 'Citra', 'Dewi', 'Eko', 'Fitri', 'Gita', 'Hadi', 'Indra', 'Joko', 'Kartika', 'Lina']
+LAST_NAMES = ['Santoso', 'Wijaya', 'Saputra', 'Lestari', 'Hidayat', 'Pratama', 'Kusuma', 'Siregar']
+
+def _weighted(rng, choices, size):
+    names = list(choices)
+    weights = np.array([choices[name] for name in names])
+    return np.array(names, dtype=object)[rng.choice(len(names), size=size, p=weights / weights.sum())]
+
+def generate_tickets(count, seed=0, end=None):
+    """
+    DataFrame of count synthetic tickets in the tickets CSV column order
+    """
+    rng = np.random.default_rng(seed)
+    end = pd.Timestamp(end or pd.Timestamp.now().floor('s'))
+    
+    # Unique 8-character hex IDs like the app's
+    ids = rng.choice(16 ** 8, size=count, replace=False)
+    ticket_ids = np.char.upper(np.char.mod('%08x', ids)).astype(object)
+    
+    # Arrival time: a day in the last year, an hour weighted towards office hours
+    hour_weights = np.array([1, 1, 1, 1, 1, 2, 4, 10, 16, 18, 18, 14, 10, 16, 18, 16, 12, 8, 5, 3, 2, 2, 1, 1], dtype=float)
+    days = rng.integers(0, 365, size=count)
+    hours = rng.choice(24, size=count, p=hour_weights / hour_weights.sum())
+    seconds = rng.integers(0, 3600, size=count)
+    created = end - pd.to_timedelta(days * 86400 - hours * 3600 - seconds, unit='s')
+    created = created.sort_values()
+    age_days = (end - created).days.to_numpy()
+    
+    # Older tickets are more likely to be finished
+    finished = rng.random(count) < 1 - np.exp(-age_days / 7)
+    open_status = np.where(rng.random(count) < 0.6, 'Open', 'In Progress')
+    finished_status = np.where(rng.random(count) < 0.7, 'Closed', 'Resolved')
+    statuses = np.where(finished, finished_status, open_status).astype(object)
+    
+    # Updated some time after creation, never in the future
+    handling = pd.to_timedelta(rng.exponential(2 * 86400, size=count).astype(np.int64), unit='s')
+    updated = pd.DatetimeIndex(np.minimum((created + handling).values, end.to_datetime64()))
+    updated = updated.where(statuses != 'Open', created)
+    
+    names_first = rng.choice(FIRST_NAMES, size=count)
+    names_last = rng.choice(LAST_NAMES, size=count)
+    user_no = rng.integers(1, 2000, size=count).astype(str)
+    
+    # Description lengths are log-normal, from a short sentence to several paragraphs
+    lengths = np.clip(rng.lognormal(mean=3.3, sigma=0.7, size=count).astype(int), 3, 400)
+    vocabulary = np.array(WORDS, dtype=object)
+    pool = ' '.join(rng.choice(vocabulary, size=4096)) + ' '
+    word_starts = np.flatnonzero(np.frombuffer(pool.encode(), dtype=np.uint8) == ord(' ')) + 1
+    starts = rng.choice(word_starts[:len(word_starts) // 2], size=count)
+    descriptions = []
+    for start, length in zip(starts.tolist(), lengths.tolist()):
+        text = pool[start:start + length * 6]
+        descriptions.append(text[:text.rfind(' ')])
+    
+    resolutions = np.where(finished, 'Handled by the GA team.', '').astype(object)
+    
+    return pd.DataFrame({
+        'ticket_id': ticket_ids,
+        'created_at': created.strftime('%Y-%m-%d %H:%M:%S'),
+        'updated_at': updated.strftime('%Y-%m-%d %H:%M:%S'),
+        'name': np.char.add(np.char.add(names_first, ' '), names_last).astype(object),
+        'email': np.char.add(np.char.add(np.char.lower(names_first), user_no), '@example.com').astype(object),
+        'subject': rng.choice(SUBJECTS, size=count).astype(object),
+        'category': _weighted(rng, CATEGORIES, count),
+        'priority': _weighted(rng, PRIORITIES, count),
+        'status': statuses,
+        'description': descriptions,
+        'resolution': resolutions,
+    }, columns=utils.TICKET_COLUMNS)
+
+def generate_users(count, seed=0, password='password', iterations=1000):
+    """
+    List of user dicts (username, password hash, role); about one in ten is an admin.
+    A low iteration count keeps generating many hashes fast.
+    """
+    rng = np.random.default_rng(seed)
+    users = [{'username': 'admin', 'password': utils.hash_password(password, iterations=iterations), 'role': 'admin'}]
+    for n in range(1, count):
+        role = 'admin' if rng.random() < 0.1 else 'staff'
+        users.append({'username': f'user{n:05d}', 'password': utils.hash_password(password, iterations=iterations), 'role': role})
+    return users
+
+def write_data_dir(data_dir, tickets, users=0, seed=0):
+    """
+    Write tickets.csv (and admin.csv if users > 0) into data_dir. Returns the tickets file path.
+    """
+    os.makedirs(data_dir, exist_ok=True)
+    tickets_file = os.path.join(data_dir, 'tickets.csv')
+    generate_tickets(tickets, seed=seed).to_csv(tickets_file, index=False)
+    
+    if users:
+        admin_file = utils.ADMIN_FILE
+        utils.ADMIN_FILE = os.path.join(data_dir, 'admin.csv')
+        try:
+            utils._write_users(generate_users(users, seed=seed))
+        finally:
+            utils.ADMIN_FILE = admin_file
+    return tickets_file
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--size', choices=list(SIZES), default='1k', help='number of tickets')
+    parser.add_argument('--tickets', type=int, help='exact number of tickets (overrides --size)')
+    parser.add_argument('--users', type=int, default=0, help='users to write to admin.csv')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--out', default='data', help='data directory to write')
+    args = parser.parse_args()
+    
+    count = args.tickets or SIZES[args.size]
+    tickets_file = write_data_dir(args.out, count, users=args.users, seed=args.seed)
+    print(f"Wrote {count} tickets to {tickets_file} ({os.path.getsize(tickets_file) / 2**20:.1f} MiB)")
+
+if __name__ == '__main__':
+    main()
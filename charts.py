@@ -0,0 +1,91 @@
+import io
+import threading
+from collections import OrderedDict
+
+import perf_metrics
+
+# Chart rendering for the Reports page.
+#
+# Figures are created with the object-oriented API instead of pyplot, so they
+# are not registered in pyplot's global figure list and are freed as soon as
+# the PNG is written. Rendered PNG bytes are kept in a process-wide LRU cache
+# keyed by the chart type and the caller's key (filters and data version).
+# Matplotlib is only imported when a chart has to be rendered.
+
+MAX_CACHED_CHARTS = 64
+
+_cache = OrderedDict()
+_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0}
+
+def _pie(ax, counts):
+    counts.plot(kind='pie', autopct='%1.1f%%', ax=ax)
+    ax.set_title('Ticket Status Distribution')
+    ax.set_ylabel('')
+
+def _bar(ax, counts):
+    counts.plot(kind='bar', ax=ax)
+    ax.set_title('Ticket Category Distribution')
+    ax.set_xlabel('Category')
+    ax.set_ylabel('Number of Tickets')
+
+def _line(ax, counts):
+    counts.plot(kind='line', marker='o', ax=ax)
+    ax.set_title('Tickets Submitted Over Time')
+    ax.set_xlabel('Date')
+    ax.set_ylabel('Number of Tickets')
+
+# Chart type: (draw function, figure size)
+CHART_TYPES = {
+    'status_pie': (_pie, (10, 6)),
+    'category_bar': (_bar, (12, 6)),
+    'daily_line': (_line, (12, 6)),
+}
+
+def _render(chart_type, counts):
+    from matplotlib.figure import Figure
+    
+    draw, figsize = CHART_TYPES[chart_type]
+    
+    with perf_metrics.measure(f"chart.render.{chart_type}") as measurement:
+        fig = Figure(figsize=figsize)
+        ax = fig.subplots()
+        draw(ax, counts)
+        fig.tight_layout()
+        
+        buf = io.BytesIO()
+        fig.savefig(buf, format='png')
+        measurement['rows'] = len(counts)
+    return buf.getvalue()
+
+def get_chart(chart_type, key, get_counts):
+    """
+    PNG bytes of a chart. get_counts() returns the Series to plot and is only
+    called when the chart for (chart_type, key) is not cached.
+    """
+    cache_key = (chart_type, key)
+    
+    with _lock:
+        png = _cache.get(cache_key)
+        if png is not None:
+            _cache.move_to_end(cache_key)
+            _stats['hits'] += 1
+            return png
+        _stats['misses'] += 1
+    
+    png = _render(chart_type, get_counts())
+    
+    with _lock:
+        _cache[cache_key] = png
+        _cache.move_to_end(cache_key)
+        while len(_cache) > MAX_CACHED_CHARTS:
+            _cache.popitem(last=False)
+    
+    return png
+
+def get_chart_cache_stats():
+    """
+    Hit/miss counters and size of the chart cache
+    """
+    with _lock:
+        return dict(_stats, entries=len(_cache), bytes=sum(len(png) for png in _cache.values()))
@@ -0,0 +1,209 @@
+import os
+import queue
+import secrets
+import stat
+import threading
+import time
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+import perf_metrics
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows: only threads of this process are serialized
+    fcntl = None
+
+# Single writer for the CSV data files.
+#
+# Streamlit runs every session on its own thread, so all mutations are queued
+# and executed one after another by one writer thread. While it works on a
+# file it holds an exclusive lock on the file's .lock sidecar, which keeps
+# other server processes out as well. Appends that are waiting in the queue
+# together are coalesced and written by a single flush.
+
+_queue = queue.Queue()
+_thread = None
+_start_lock = threading.Lock()
+
+# Counters for monitoring: jobs executed and lock acquisitions (flushes)
+_stats = {'jobs': 0, 'flushes': 0}
+
+# The append-only sidecar logs (tombstones, index, change log, rollup) start
+# with a line holding a random generation token, written when the file is
+# created. Readers that tail a log compare it to tell a log that was removed
+# or replaced and created again, which may reuse the old file's inode number.
+GENERATION_PREFIX = b'#generation\t'
+
+def lock_path_for(file_path):
+    """
+    Path of the lock file guarding a data file
+    """
+    return os.path.splitext(file_path)[0] + '.lock'
+
+@contextmanager
+def file_lock(file_path):
+    """
+    Exclusive lock on a data file, shared with other processes
+    """
+    lock_path = lock_path_for(file_path)
+    os.makedirs(os.path.dirname(lock_path) or '.', exist_ok=True)
+    
+    with open(lock_path, 'a') as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+def replace_file(file_path, write, binary=False):
+    """
+    Atomically replace a file: write(f) fills a temp file in the same directory,
+    which is then renamed over the original, so readers and crashes never see a partial file.
+    The temp file is opened as UTF-8 text, or in binary mode if binary is set.
+    """
+    directory = os.path.dirname(file_path) or '.'
+    tmp_path = os.path.join(directory, f".{os.path.basename(file_path)}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with (open(tmp_path, 'wb') if binary else open(tmp_path, 'w', newline='', encoding='utf-8')) as f:
+            write(f)
+            f.flush()
+            os.fsync(f.fileno())
+            perf_metrics.add_bytes(written=f.tell())
+        # Keep the original file's permissions
+        if os.path.exists(file_path):
+            os.chmod(tmp_path, stat.S_IMODE(os.stat(file_path).st_mode))
+        os.replace(tmp_path, file_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+def generation_line():
+    """
+    First line of a new sidecar log, with a new generation token
+    """
+    return f"{GENERATION_PREFIX.decode('ascii')}{secrets.token_hex(8)}\n"
+
+def read_generation(f):
+    """
+    Generation of a sidecar log opened in binary mode, from its first line:
+    (token, bytes of the line), or ('', 0) for a log written without one
+    """
+    f.seek(0)
+    line = f.readline(256)
+    if line.startswith(GENERATION_PREFIX) and line.endswith(b'\n'):
+        return line[len(GENERATION_PREFIX):-1].decode('ascii'), len(line)
+    return '', 0
+
+def _ensure_started():
+    global _thread
+    with _start_lock:
+        if _thread is None or not _thread.is_alive():
+            _thread = threading.Thread(target=_worker, name='data-writer', daemon=True)
+            _thread.start()
+
+def _submit(job, measured=True):
+    job['future'] = Future()
+    # Bytes written for the job count towards the caller's measurement
+    job['measurement'] = perf_metrics.current() if measured else None
+    job['queued_at'] = time.perf_counter()
+    _ensure_started()
+    _queue.put(job)
+    return job['future']
+
+def run(file_path, func, *args, **kwargs):
+    """
+    Execute func(*args, **kwargs) on the writer thread while holding file_path's lock
+    and return its result
+    """
+    # Writes made by a job that is already running are part of that job
+    if threading.current_thread() is _thread:
+        return func(*args, **kwargs)
+    
+    return _submit({'file_path': file_path, 'func': func, 'args': args, 'kwargs': kwargs}).result()
+
+def submit(file_path, func, *args, **kwargs):
+    """
+    Queue func(*args, **kwargs) to run on the writer thread like run(), without waiting
+    for it. Returns its Future. The job isn't counted towards the caller's measurement.
+    """
+    return _submit({'file_path': file_path, 'func': func, 'args': args, 'kwargs': kwargs}, measured=False)
+
+def append(file_path, flush, item):
+    """
+    Queue an item to be appended by flush(file_path, items). Items for the same file and
+    flush function that are queued together are written by one flush call.
+    """
+    if threading.current_thread() is _thread:
+        return flush(file_path, [item])
+    
+    return _submit({'file_path': file_path, 'flush': flush, 'item': item}).result()
+
+def get_writer_stats():
+    """
+    Number of jobs executed and flushes (lock acquisitions) done by the writer
+    """
+    return dict(_stats, queued=_queue.qsize())
+
+def _worker():
+    while True:
+        jobs = [_queue.get()]
+        # Take everything else that is already waiting
+        while True:
+            try:
+                jobs.append(_queue.get_nowait())
+            except queue.Empty:
+                break
+        
+        # Jobs are run in order, grouped by file so each group needs one lock acquisition
+        group = []
+        for job in jobs:
+            if group and group[0]['file_path'] != job['file_path']:
+                _run_group(group)
+                group = []
+            group.append(job)
+        _run_group(group)
+
+def _run_group(jobs):
+    _stats['flushes'] += 1
+    try:
+        with file_lock(jobs[0]['file_path']):
+            i = 0
+            while i < len(jobs):
+                job = jobs[i]
+                if 'flush' in job:
+                    # Coalesce the following appends with the same flush function
+                    batch = [job]
+                    while i + len(batch) < len(jobs) and jobs[i + len(batch)].get('flush') is job['flush']:
+                        batch.append(jobs[i + len(batch)])
+                    _execute(batch, job['flush'], (job['file_path'], [item['item'] for item in batch]), {})
+                    i += len(batch)
+                else:
+                    _execute([job], job['func'], job['args'], job['kwargs'])
+                    i += 1
+    except Exception as e:
+        # Failing to take the lock fails every job that hasn't been answered yet
+        for job in jobs:
+            if not job['future'].done():
+                job['future'].set_exception(e)
+
+def _execute(jobs, func, args, kwargs):
+    _stats['jobs'] += len(jobs)
+    started = time.perf_counter()
+    for job in jobs:
+        perf_metrics.record('writer.queue_wait', started - job['queued_at'])
+    
+    try:
+        # A coalesced flush is attributed to the first caller in the batch
+        with perf_metrics.attached(jobs[0]['measurement']):
+            result = func(*args, **kwargs)
+    except Exception as e:
+        for job in jobs:
+            job['future'].set_exception(e)
+        return
+    
+    for job in jobs:
+        job['future'].set_result(result)
@@ -2,12 +2,15 @@ import streamlit as st
 import pandas as pd
 import os
 import sys
+import time
 import uuid
 from datetime import datetime
 
 # Add parent directory to path to import utils
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import utils
+import perf_metrics
+import ticket_schema
 
 # Page configuration
 st.set_page_config(
@@ -27,6 +30,16 @@ admin_file = os.path.join(data_dir, 'admin.csv')
 if not os.path.exists(admin_file):
     utils.initialize_admin_account('admin', 'admin123')
 
+# Manage Tickets list settings
+PAGE_SIZE_OPTIONS = [10, 25, 50, 100]
+DEFAULT_PAGE_SIZE = 25
+SORT_OPTIONS = ["Newest first", "Oldest first", "Priority"]
+PRIORITY_RANK = {"Critical": 0, "High": 1, "Medium": 2, "Low": 3}
+BULK_ACTIONS = ["Close", "Resolve", "Change priority"]
+
+# Seconds between checks of the change feed while the dashboard is idle
+POLL_INTERVAL_SECONDS = 2
+
 # Authentication function
 def authenticate():
     if 'authenticated' not in st.session_state:
@@ -45,12 +58,16 @@ def authenticate():
                 user = utils.get_admin_user(username)
                 
                 if user and utils.verify_password(user['password'], password):
+                    # Rehash legacy SHA-256 hashes (or an outdated cost) while the password is at hand
+                    if utils.password_needs_rehash(user['password']):
+                        utils.update_password(username, password)
+                    
                     st.session_state.authenticated = True
                     st.session_state.username = username
                     st.rerun()
                 else:
                     st.error("Invalid username or password")
-                    
+        
         # Display default credentials message
         st.info("Default admin credentials: username 'admin', password 'admin123'")
         # Exit function early if not authenticated
@@ -58,6 +75,50 @@ def authenticate():
     
     return True
 
+# Read-only ticket details
+def show_ticket_details(ticket):
+    st.markdown(f"**Submitted by:** {ticket['name']} ({ticket['email']})")
+    st.markdown(f"**Category:** {ticket['category']} | **Priority:** {ticket['priority']}")
+    st.markdown(f"**Created:** {ticket['created_at']} | **Updated:** {ticket['updated_at']}")
+    st.markdown("**Description:**")
+    st.write(ticket['description'])
+    
+    if isinstance(ticket['resolution'], str) and ticket['resolution']:
+        st.markdown("**Resolution:**")
+        st.write(ticket['resolution'])
+
+def load_tickets():
+    """
+    The session's copy of the ticket table, brought up to date by merging the
+    tickets changed since the last rerun
+    """
+    changes = utils.get_changes_since(st.session_state.get('tickets_version'), tickets_file)
+    
+    if changes['reset']:
+        st.session_state.tickets_df = changes['tickets']
+    elif len(changes['tickets']) > 0 or changes['deleted']:
+        changed_ids = set(changes['tickets']['ticket_id']) | set(changes['deleted'])
+        tickets_df = st.session_state.tickets_df
+        tickets_df = tickets_df[~tickets_df['ticket_id'].isin(changed_ids)]
+        st.session_state.tickets_df = pd.concat([tickets_df, changes['tickets']], ignore_index=True)
+    
+    st.session_state.tickets_version = changes['version']
+    return st.session_state.tickets_df
+
+def wait_for_changes():
+    """
+    Poll the change feed every POLL_INTERVAL_SECONDS until a ticket changes,
+    then rerun the page, which reads only the changed tickets. Each check
+    rewrites the status line, which is where Streamlit stops the wait as soon
+    as the user interacts with the page or the session ends.
+    """
+    status = st.sidebar.empty()
+    while True:
+        status.caption(f"Auto-refresh on, last checked {datetime.now().strftime('%H:%M:%S')}")
+        time.sleep(POLL_INTERVAL_SECONDS)
+        if utils.get_change_version(tickets_file) != st.session_state.get('tickets_version'):
+            st.rerun()
+
 # Main dashboard function
 def show_dashboard():
     st.title("🛠️ Admin Dashboard")
@@ -68,7 +129,14 @@ def show_dashboard():
         st.session_state.authenticated = False
         st.session_state.username = None
         st.rerun()
-        
+    
+    st.sidebar.toggle(
+        "Auto-refresh",
+        value=False,
+        key="auto_refresh",
+        help="Check for new and changed tickets every few seconds and update the page when there are any"
+    )
+    
     # Get ticket statistics
     stats = utils.get_ticket_stats(tickets_file)
     
@@ -87,117 +155,180 @@ def show_dashboard():
     with tab1:
         st.header("Ticket Management")
         
-        # Load tickets data
-        tickets_df = utils.get_all_tickets(tickets_file)
+        # Load tickets data, only the changes since the last rerun are read
+        tickets_df = load_tickets()
         
         if len(tickets_df) == 0:
             st.info("No tickets found in the system.")
         else:
-            # Status filter
-            status_options = ["All"] + sorted(tickets_df['status'].unique().tolist())
-            selected_status = st.selectbox("Filter by Status", status_options)
+            # Filter, sort and page controls
+            filter_col, sort_col, size_col = st.columns([2, 2, 1])
+            with filter_col:
+                status_options = ["All"] + sorted(tickets_df['status'].unique().tolist())
+                selected_status = st.selectbox("Filter by Status", status_options)
+            with sort_col:
+                sort_order = st.selectbox("Sort by", SORT_OPTIONS)
+            with size_col:
+                page_size = st.selectbox("Per page", PAGE_SIZE_OPTIONS, index=PAGE_SIZE_OPTIONS.index(DEFAULT_PAGE_SIZE))
             
             # Apply filters
             filtered_df = tickets_df
             if selected_status != "All":
                 filtered_df = filtered_df[filtered_df['status'] == selected_status]
             
-            # Sort by created_at in descending order (newest first)
-            filtered_df = filtered_df.sort_values('created_at', ascending=False)
+            # Sort the whole filtered set before slicing out a page
+            if sort_order == "Priority":
+                priority_rank = filtered_df['priority'].map(PRIORITY_RANK).fillna(len(PRIORITY_RANK))
+                filtered_df = filtered_df.assign(_rank=priority_rank).sort_values(
+                    ['_rank', 'created_at'], ascending=[True, False]
+                ).drop(columns='_rank')
+            else:
+                filtered_df = filtered_df.sort_values('created_at', ascending=(sort_order == "Oldest first"))
             
             # Show results
             if len(filtered_df) == 0:
                 st.info(f"No tickets with status '{selected_status}'")
             else:
-                # Display tickets in a more compact format with expandable details
-                for _, ticket in filtered_df.iterrows():
+                total_pages = (len(filtered_df) - 1) // page_size + 1
+                # The key changes with the filters, which resets to the first page
+                page = st.number_input(
+                    f"Page (of {total_pages})",
+                    min_value=1,
+                    max_value=total_pages,
+                    value=1,
+                    key=f"manage_page_{selected_status}_{sort_order}_{page_size}"
+                )
+                page_df = filtered_df.iloc[(page - 1) * page_size:page * page_size]
+                
+                st.caption(f"Showing {(page - 1) * page_size + 1}-{(page - 1) * page_size + len(page_df)} of {len(filtered_df)} tickets")
+                
+                # Multi-select table for bulk actions on this page
+                st.subheader("Bulk Actions")
+                selection_df = page_df[['ticket_id', 'subject', 'status', 'priority', 'created_at']].copy()
+                selection_df.insert(0, 'selected', False)
+                edited_df = st.data_editor(
+                    selection_df,
+                    hide_index=True,
+                    use_container_width=True,
+                    disabled=['ticket_id', 'subject', 'status', 'priority', 'created_at'],
+                    column_config={'selected': st.column_config.CheckboxColumn("Select")},
+                    key=f"bulk_select_{selected_status}_{sort_order}_{page_size}_{page}"
+                )
+                selected_ids = edited_df.loc[edited_df['selected'], 'ticket_id'].tolist()
+                
+                action_col, priority_col, apply_col = st.columns([2, 2, 1])
+                with action_col:
+                    bulk_action = st.selectbox("Action", BULK_ACTIONS)
+                with priority_col:
+                    bulk_priority = st.selectbox(
+                        "New Priority",
+                        ticket_schema.PRIORITIES,
+                        disabled=(bulk_action != "Change priority")
+                    )
+                with apply_col:
+                    st.write("")
+                    apply_bulk = st.button(f"Apply to {len(selected_ids)} selected", disabled=not selected_ids)
+                
+                if apply_bulk:
+                    if bulk_action == "Close":
+                        updates = {'status': "Closed"}
+                    elif bulk_action == "Resolve":
+                        updates = {'status': "Resolved"}
+                    else:
+                        updates = {'priority': bulk_priority}
+                    
+                    # One write for the whole selection
+                    updated_count = utils.update_tickets(selected_ids, updates, tickets_file, actor=st.session_state.username)
+                    st.success(f"Updated {updated_count} tickets.")
+                    st.rerun()
+                
+                # Read-only details for the tickets on this page
+                for _, ticket in page_df.iterrows():
                     with st.expander(f"ID: {ticket['ticket_id']} - {ticket['subject']} ({ticket['status']})"):
-                        # Layout ticket details in columns
-                        col1, col2 = st.columns([3, 1])
-                        
-                        with col1:
-                            st.markdown(f"**Submitted by:** {ticket['name']} ({ticket['email']})")
-                            st.markdown(f"**Category:** {ticket['category']} | **Priority:** {ticket['priority']}")
-                            st.markdown(f"**Created:** {ticket['created_at']} | **Updated:** {ticket['updated_at']}")
-                            st.markdown("**Description:**")
-                            st.write(ticket['description'])
-                            
-                            if ticket['resolution']:
-                                st.markdown("**Resolution:**")
-                                st.write(ticket['resolution'])
+                        show_ticket_details(ticket)
+                
+                # Update and delete widgets are only built for the selected ticket
+                st.subheader("Update Ticket")
+                selected_id = st.selectbox("Select a ticket on this page", page_df['ticket_id'].tolist())
+                ticket = page_df[page_df['ticket_id'] == selected_id].iloc[0]
+                
+                # Ticket update form
+                with st.form(f"update_ticket_{ticket['ticket_id']}"):
+                    new_status = st.selectbox(
+                        "Status",
+                        ticket_schema.STATUSES,
+                        index=ticket_schema.STATUSES.index(ticket['status'])
+                    )
+                    
+                    new_priority = st.selectbox(
+                        "Priority",
+                        ticket_schema.PRIORITIES,
+                        index=ticket_schema.PRIORITIES.index(ticket['priority'])
+                    )
+                    
+                    resolution = st.text_area(
+                        "Resolution/Notes",
+                        value=ticket['resolution'] if isinstance(ticket['resolution'], str) else "",
+                        height=100
+                    )
+                    
+                    update_button = st.form_submit_button("Update Ticket")
+                    
+                    if update_button:
+                        updates = {
+                            'status': new_status,
+                            'priority': new_priority,
+                            'resolution': resolution
+                        }
                         
-                        with col2:
-                            # Ticket update form
-                            with st.form(f"update_ticket_{ticket['ticket_id']}"):
-                                new_status = st.selectbox(
-                                    "Status",
-                                    ["Open", "In Progress", "Resolved", "Closed"],
-                                    index=["Open", "In Progress", "Resolved", "Closed"].index(ticket['status'])
-                                )
-                                
-                                new_priority = st.selectbox(
-                                    "Priority",
-                                    ["Low", "Medium", "High", "Critical"],
-                                    index=["Low", "Medium", "High", "Critical"].index(ticket['priority'])
-                                )
-                                
-                                resolution = st.text_area(
-                                    "Resolution/Notes",
-                                    value=ticket['resolution'],
-                                    height=100
-                                )
-                                
-                                update_button = st.form_submit_button("Update Ticket")
-                                
-                                if update_button:
-                                    updates = {
-                                        'status': new_status,
-                                        'priority': new_priority,
-                                        'resolution': resolution
-                                    }
-                                    
-                                    if utils.update_ticket(ticket['ticket_id'], updates, tickets_file):
-                                        st.success("Ticket updated successfully!")
-                                        st.rerun()
-                                    else:
-                                        st.error("Failed to update ticket.")
-                            
-                            # Delete button outside the form
-                            if st.button(f"Delete Ticket #{ticket['ticket_id']}", key=f"delete_{ticket['ticket_id']}"):
-                                confirm = st.checkbox(f"Confirm deletion of ticket #{ticket['ticket_id']}?", key=f"confirm_{ticket['ticket_id']}")
-                                
-                                if confirm:
-                                    if utils.delete_ticket(ticket['ticket_id'], tickets_file):
-                                        st.success("Ticket deleted successfully!")
-                                        st.rerun()
-                                    else:
-                                        st.error("Failed to delete ticket.")
+                        if utils.update_ticket(ticket['ticket_id'], updates, tickets_file, actor=st.session_state.username):
+                            st.success("Ticket updated successfully!")
+                            st.rerun()
+                        else:
+                            st.error("Failed to update ticket.")
+                
+                # Delete button outside the form, enabled once the deletion is confirmed
+                confirm = st.checkbox(f"Confirm deletion of ticket #{ticket['ticket_id']}?", key=f"confirm_{ticket['ticket_id']}")
+                if st.button(f"Delete Ticket #{ticket['ticket_id']}", key=f"delete_{ticket['ticket_id']}", disabled=not confirm):
+                    if utils.delete_ticket(ticket['ticket_id'], tickets_file):
+                        st.success("Ticket deleted successfully!")
+                        st.rerun()
+                    else:
+                        st.error("Failed to delete ticket.")
     
     # Search Tickets Tab
     with tab2:
         st.header("Search Tickets")
         
         search_term = st.text_input("Search by ID, Name, Email, or Subject")
+        match_mode = st.radio(
+            "Match",
+            ["Best match", "Words", "Substring"],
+            horizontal=True,
+            help="Best match: the most relevant tickets first, typos allowed. "
+                 "Words: every word must start a word in the ticket (fast). Substring: match text anywhere."
+        )
+        include_archive = st.checkbox(
+            "Include archived tickets",
+            help="Also search Closed and Resolved tickets moved to the archive (slower, read-only)"
+        )
         
         if search_term:
-            tickets_df = utils.get_all_tickets(tickets_file)
-            
-            if len(tickets_df) > 0:
-                # Case-insensitive search across multiple columns
-                mask = (
-                    tickets_df['ticket_id'].str.contains(search_term, case=False, na=False) |
-                    tickets_df['name'].str.contains(search_term, case=False, na=False) |
-                    tickets_df['email'].str.contains(search_term, case=False, na=False) |
-                    tickets_df['subject'].str.contains(search_term, case=False, na=False) |
-                    tickets_df['description'].str.contains(search_term, case=False, na=False)
-                )
-                search_results = tickets_df[mask].sort_values('created_at', ascending=False)
+            if stats['total'] > 0 or include_archive:
+                # Ranked top matches, word-prefix search through the inverted index, or the plain substring scan
+                mode = {"Best match": 'ranked', "Words": 'index', "Substring": 'substring'}[match_mode]
+                search_results = utils.search_tickets(search_term, tickets_file, mode=mode, include_archive=include_archive)
                 
                 if len(search_results) > 0:
-                    st.success(f"Found {len(search_results)} matching tickets.")
+                    if mode == 'ranked':
+                        st.success(f"Showing the {len(search_results)} best matching tickets.")
+                    elif len(search_results) > utils.SEARCH_LIMIT:
+                        st.success(f"Found {len(search_results)} matching tickets, showing the newest {utils.SEARCH_LIMIT}.")
+                    else:
+                        st.success(f"Found {len(search_results)} matching tickets.")
                     
-                    # Display search results
-                    for _, ticket in search_results.iterrows():
+                    # Display search results, a bounded number of them
+                    for _, ticket in search_results.head(utils.SEARCH_LIMIT).iterrows():
                         with st.expander(f"ID: {ticket['ticket_id']} - {ticket['subject']} ({ticket['status']})"):
                             col1, col2 = st.columns([3, 1])
                             
@@ -213,48 +344,57 @@ def show_dashboard():
                                     st.write(ticket['resolution'])
                             
                             with col2:
-                                # Update form (same as in tab1)
-                                with st.form(f"search_update_{ticket['ticket_id']}"):
-                                    new_status = st.selectbox(
-                                        "Status",
-                                        ["Open", "In Progress", "Resolved", "Closed"],
-                                        index=["Open", "In Progress", "Resolved", "Closed"].index(ticket['status']),
-                                        key=f"search_status_{ticket['ticket_id']}"
-                                    )
-                                    
-                                    new_priority = st.selectbox(
-                                        "Priority",
-                                        ["Low", "Medium", "High", "Critical"],
-                                        index=["Low", "Medium", "High", "Critical"].index(ticket['priority']),
-                                        key=f"search_priority_{ticket['ticket_id']}"
-                                    )
-                                    
-                                    resolution = st.text_area(
-                                        "Resolution/Notes",
-                                        value=ticket['resolution'],
-                                        height=100,
-                                        key=f"search_resolution_{ticket['ticket_id']}"
-                                    )
-                                    
-                                    update_button = st.form_submit_button("Update Ticket")
-                                    
-                                    if update_button:
-                                        updates = {
-                                            'status': new_status,
-                                            'priority': new_priority,
-                                            'resolution': resolution
-                                        }
+                                if include_archive and utils.is_archived_ticket(ticket['ticket_id'], tickets_file):
+                                    # Archived tickets are kept as they were closed
+                                    st.caption("🗄️ Archived ticket (read-only)")
+                                else:
+                                    # Update form (same as in tab1)
+                                    with st.form(f"search_update_{ticket['ticket_id']}"):
+                                        new_status = st.selectbox(
+                                            "Status",
+                                            ticket_schema.STATUSES,
+                                            index=ticket_schema.STATUSES.index(ticket['status']),
+                                            key=f"search_status_{ticket['ticket_id']}"
+                                        )
+                                        
+                                        new_priority = st.selectbox(
+                                            "Priority",
+                                            ticket_schema.PRIORITIES,
+                                            index=ticket_schema.PRIORITIES.index(ticket['priority']),
+                                            key=f"search_priority_{ticket['ticket_id']}"
+                                        )
+                                        
+                                        resolution = st.text_area(
+                                            "Resolution/Notes",
+                                            value=ticket['resolution'],
+                                            height=100,
+                                            key=f"search_resolution_{ticket['ticket_id']}"
+                                        )
                                         
-                                        if utils.update_ticket(ticket['ticket_id'], updates, tickets_file):
-                                            st.success("Ticket updated successfully!")
-                                            st.rerun()
-                                        else:
-                                            st.error("Failed to update ticket.")
+                                        update_button = st.form_submit_button("Update Ticket")
+                                        
+                                        if update_button:
+                                            updates = {
+                                                'status': new_status,
+                                                'priority': new_priority,
+                                                'resolution': resolution
+                                            }
+                                            
+                                            if utils.update_ticket(ticket['ticket_id'], updates, tickets_file, actor=st.session_state.username):
+                                                st.success("Ticket updated successfully!")
+                                                st.rerun()
+                                            else:
+                                                st.error("Failed to update ticket.")
                 else:
                     st.warning(f"No tickets found matching '{search_term}'.")
             else:
                 st.info("No tickets found in the system.")
 
-# Main execution
-if authenticate():
-    show_dashboard()
+# Main execution, timed as one rerun of the page
+with perf_metrics.measure('page.admin_dashboard'):
+    if authenticate():
+        show_dashboard()
+
+# Idle time is not part of the rerun
+if st.session_state.get('authenticated') and st.session_state.get('auto_refresh'):
+    wait_for_changes()
@@ -0,0 +1,120 @@
+import streamlit as st
+import pandas as pd
+import os
+import sys
+
+# Add parent directory to path to import utils
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import utils
+import perf_metrics
+import charts
+import data_writer
+
+# Page configuration
+st.set_page_config(
+    page_title="Performance - GA Ticket System",
+    page_icon="⏱️",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+# Data file paths
+data_dir = 'data'
+tickets_file = os.path.join(data_dir, 'tickets.csv')
+
+# Metric name prefixes shown by each view
+METRIC_GROUPS = {
+    "All": "",
+    "Page reruns": "page.",
+    "Storage calls": "storage.",
+    "CSV parsing": "csv.",
+    "Chart rendering": "chart.",
+    "Writer queue": "writer.",
+}
+
+# Authentication check
+def check_authentication():
+    if 'authenticated' not in st.session_state or not st.session_state.authenticated:
+        st.warning("Please log in from the Admin Dashboard page first.")
+        st.stop()
+
+# Performance metrics
+def show_performance():
+    st.title("⏱️ Performance")
+    st.caption("Timings recorded by this server process since it started or since the last reset.")
+    
+    # Settings
+    settings_col, reset_col = st.columns([3, 1])
+    with settings_col:
+        log_enabled = st.toggle(
+            "Write structured log lines",
+            value=perf_metrics.is_logging(),
+            help="Emit every measurement as a JSON line on the server log (ticket_perf logger)"
+        )
+        if log_enabled != perf_metrics.is_logging():
+            perf_metrics.set_logging(log_enabled)
+    with reset_col:
+        if st.button("Reset metrics"):
+            perf_metrics.reset()
+    
+    # Histograms
+    group = st.radio("Show", list(METRIC_GROUPS), horizontal=True)
+    prefix = METRIC_GROUPS[group]
+    metrics = [metric for metric in perf_metrics.get_metrics() if metric['name'].startswith(prefix)]
+    
+    if not metrics:
+        st.info("No measurements recorded yet.")
+    else:
+        metrics_df = pd.DataFrame(metrics).sort_values('total_ms', ascending=False)
+        metrics_df['kb_read'] = metrics_df.pop('bytes_read') / 1024
+        metrics_df['kb_written'] = metrics_df.pop('bytes_written') / 1024
+        st.dataframe(
+            metrics_df,
+            hide_index=True,
+            use_container_width=True,
+            column_config={
+                'name': "Metric",
+                'count': "Calls",
+                'total_ms': st.column_config.NumberColumn("Total (ms)", format="%.1f"),
+                'mean_ms': st.column_config.NumberColumn("Mean (ms)", format="%.2f"),
+                'p50_ms': st.column_config.NumberColumn("p50 (ms)", format="%.2f"),
+                'p95_ms': st.column_config.NumberColumn("p95 (ms)", format="%.2f"),
+                'p99_ms': st.column_config.NumberColumn("p99 (ms)", format="%.2f"),
+                'max_ms': st.column_config.NumberColumn("Max (ms)", format="%.2f"),
+                'rows': "Rows",
+                'kb_read': st.column_config.NumberColumn("KB read", format="%.1f"),
+                'kb_written': st.column_config.NumberColumn("KB written", format="%.1f"),
+            }
+        )
+    
+    # Caches and writer
+    st.subheader("Caches")
+    ticket_cache = utils.get_cache_stats()
+    chart_cache = charts.get_chart_cache_stats()
+    writer = data_writer.get_writer_stats()
+    
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Ticket table cache hits", ticket_cache['hits'], help=f"{ticket_cache['misses']} misses (CSV parses)")
+    col2.metric("Chart cache hits", chart_cache['hits'], help=f"{chart_cache['misses']} misses (renders)")
+    col3.metric("Writer jobs", writer['jobs'], help=f"{writer['flushes']} flushes, {writer['queued']} queued")
+    col4.metric("Cached chart size", f"{chart_cache['bytes'] / 1024:.0f} KB")
+    
+    # Deleted tickets are tombstoned; their records stay in the file until it is compacted
+    st.subheader("Storage")
+    col1, col2, col3 = st.columns(3)
+    with col3:
+        if st.button("Compact now", help="Rewrite the tickets file without the deleted records"):
+            utils.compact_tickets(tickets_file)
+    
+    tombstones = utils.get_tombstone_stats(tickets_file)
+    col1.metric("Deleted tickets not compacted", tombstones['tombstones'])
+    col2.metric(
+        "Reclaimable space",
+        f"{tombstones['reclaimable_bytes'] / 1024:.0f} KB",
+        help=f"{tombstones['reclaimable_ratio']:.0%} of the {tombstones['file_bytes'] / 1024:.0f} KB tickets file"
+    )
+
+# Main execution, timed as one rerun of the page
+with perf_metrics.measure('page.performance'):
+    check_authentication()
+    show_performance()
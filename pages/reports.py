@@ -2,13 +2,14 @@ import streamlit as st
 import pandas as pd
 import os
 import sys
-import matplotlib.pyplot as plt
-import io
 from datetime import datetime, timedelta
 
 # Add parent directory to path to import utils
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import utils
+import perf_metrics
+import charts
+import ticket_export
 
 # Page configuration
 st.set_page_config(
@@ -28,211 +29,241 @@ def check_authentication():
         st.warning("Please log in from the Admin Dashboard page first.")
         st.stop()
 
+def slice_days(tickets_df, start_day, end_day):
+    """
+    Rows of a report table created between two days (inclusive)
+    """
+    # The table is sorted by created_at, so a date range is a contiguous slice
+    start = tickets_df['created_at'].searchsorted(start_day, side='left')
+    end = tickets_df['created_at'].searchsorted(end_day + pd.Timedelta(days=1), side='left')
+    return tickets_df.iloc[start:end]
+
+def filter_tickets(start_day, end_day, categories, statuses, include_archive=False):
+    """
+    Ticket rows created between two days (inclusive) with one of the given categories and statuses
+    """
+    filtered_df = slice_days(utils.get_report_table(tickets_file), start_day, end_day)
+    
+    if include_archive:
+        # Only the archive partitions of the months in range are read
+        archived_df = slice_days(utils.get_archived_report_table(tickets_file, start_day, end_day), start_day, end_day)
+        archived_df = archived_df[~archived_df['ticket_id'].isin(filtered_df['ticket_id'])]
+        if len(archived_df) > 0:
+            filtered_df = pd.concat([archived_df, filtered_df], ignore_index=True).sort_values('created_at', kind='stable')
+    
+    if categories:
+        filtered_df = filtered_df[filtered_df['category'].isin(categories)]
+    if statuses:
+        filtered_df = filtered_df[filtered_df['status'].isin(statuses)]
+    return filtered_df
+
+# Keyed on the ticket data, the archive, the event log and the hour, so reruns with
+# the same filters reuse the result until a ticket changes or open ages move on
+@st.cache_data(max_entries=32, show_spinner=False)
+def response_metrics(data_version, archive_version, events_version, hour, start_day, end_day, categories, statuses):
+    """
+    Response, resolution and open-age distributions of the filtered tickets
+    """
+    include_archive = archive_version is not None
+    return utils.get_response_metrics(
+        filter_tickets(start_day, end_day, categories, statuses, include_archive), tickets_file
+    )
+
+def format_hours(hours):
+    """
+    Readable duration for a number of hours
+    """
+    if hours is None:
+        return "N/A"
+    if hours < 48:
+        return f"{hours:.1f} h"
+    return f"{hours / 24:.1f} d"
+
 # Generate reports
 def generate_reports():
     st.title("📊 Ticket System Reports")
     
-    # Load tickets data
-    if not os.path.exists(tickets_file):
-        st.info("No ticket data available to generate reports.")
-        return
+    # Sidebar filters
+    st.sidebar.header("Report Filters")
+    
+    include_archive = st.sidebar.checkbox(
+        "Include archived tickets",
+        value=True,
+        help="Closed and Resolved tickets moved to the archive. Only the months in the selected period are loaded."
+    )
     
-    tickets_df = pd.read_csv(tickets_file)
+    # Daily counts by category, status and priority, maintained by the write path
+    data_version = utils.get_data_version(tickets_file)
+    archive_version = utils.get_archive_version(tickets_file) if include_archive else None
+    rollup_df = utils.get_daily_rollup(tickets_file, include_archive=include_archive)
     
-    if len(tickets_df) == 0:
+    if rollup_df['count'].sum() == 0:
         st.info("No tickets found in the system.")
         return
     
-    # Convert date columns to datetime for filtering
-    tickets_df['created_at'] = pd.to_datetime(tickets_df['created_at'])
-    tickets_df['updated_at'] = pd.to_datetime(tickets_df['updated_at'])
-    
-    # Sidebar filters
-    st.sidebar.header("Report Filters")
-    
     # Date range filter
     st.sidebar.subheader("Date Range")
     date_options = ["All Time", "Last 7 Days", "Last 30 Days", "Last 90 Days", "Custom Range"]
     date_filter = st.sidebar.selectbox("Select Period", date_options)
     
+    # Filters work on whole days, the granularity of the rollup
+    min_date = rollup_df['date'].min()
+    max_date = rollup_df['date'].max()
+    
     if date_filter == "Custom Range":
-        min_date = tickets_df['created_at'].min().date()
-        max_date = tickets_df['created_at'].max().date()
+        start_date = st.sidebar.date_input("Start Date", min_date.date())
+        end_date = st.sidebar.date_input("End Date", max_date.date())
         
-        start_date = st.sidebar.date_input("Start Date", min_date)
-        end_date = st.sidebar.date_input("End Date", max_date)
-        
-        # Convert to datetime for filtering
-        start_datetime = pd.Timestamp(start_date)
-        end_datetime = pd.Timestamp(end_date) + pd.Timedelta(days=1) - pd.Timedelta(seconds=1)
-        
-        filtered_df = tickets_df[(tickets_df['created_at'] >= start_datetime) & 
-                               (tickets_df['created_at'] <= end_datetime)]
+        start_day = pd.Timestamp(start_date)
+        end_day = pd.Timestamp(end_date)
     else:
         if date_filter == "Last 7 Days":
-            cutoff_date = datetime.now() - timedelta(days=7)
+            start_day = pd.Timestamp((datetime.now() - timedelta(days=7)).date())
         elif date_filter == "Last 30 Days":
-            cutoff_date = datetime.now() - timedelta(days=30)
+            start_day = pd.Timestamp((datetime.now() - timedelta(days=30)).date())
         elif date_filter == "Last 90 Days":
-            cutoff_date = datetime.now() - timedelta(days=90)
+            start_day = pd.Timestamp((datetime.now() - timedelta(days=90)).date())
         else:  # All Time
-            cutoff_date = tickets_df['created_at'].min()
-        
-        filtered_df = tickets_df[tickets_df['created_at'] >= cutoff_date]
+            start_day = min_date
+        end_day = max_date
+    
+    filtered_rollup = rollup_df[(rollup_df['date'] >= start_day) & (rollup_df['date'] <= end_day)]
     
     # Category filter (multiselect)
-    all_categories = sorted(tickets_df['category'].unique())
+    all_categories = sorted(rollup_df.loc[rollup_df['category'] != '', 'category'].unique())
     selected_categories = st.sidebar.multiselect("Categories", all_categories, default=all_categories)
     
     if selected_categories:
-        filtered_df = filtered_df[filtered_df['category'].isin(selected_categories)]
+        filtered_rollup = filtered_rollup[filtered_rollup['category'].isin(selected_categories)]
     
     # Status filter (multiselect)
-    all_statuses = sorted(tickets_df['status'].unique())
+    all_statuses = sorted(rollup_df.loc[rollup_df['status'] != '', 'status'].unique())
     selected_statuses = st.sidebar.multiselect("Status", all_statuses, default=all_statuses)
     
     if selected_statuses:
-        filtered_df = filtered_df[filtered_df['status'].isin(selected_statuses)]
+        filtered_rollup = filtered_rollup[filtered_rollup['status'].isin(selected_statuses)]
+    
+    def load_filtered_tickets():
+        """
+        Ticket rows matching the filters, only loaded for the raw data view and exports
+        """
+        return filter_tickets(start_day, end_day, selected_categories, selected_statuses, include_archive)
     
     # Display metrics
     st.subheader("Summary Metrics")
     
-    if len(filtered_df) == 0:
+    total_tickets = int(filtered_rollup['count'].sum())
+    if total_tickets == 0:
         st.warning("No tickets match the selected filters.")
         return
     
+    metrics = response_metrics(
+        data_version, archive_version, utils.get_events_version(tickets_file), datetime.now().strftime('%Y-%m-%d %H'),
+        start_day, end_day, tuple(selected_categories), tuple(selected_statuses)
+    )
+    
     col1, col2, col3, col4 = st.columns(4)
     
     with col1:
-        st.metric("Total Tickets", len(filtered_df))
+        st.metric("Total Tickets", total_tickets)
     
     with col2:
-        avg_response_time = "N/A"  # In a real system, you'd calculate this
+        avg_response_time = format_hours(metrics['first_response_hours']['mean'])
         st.metric("Avg Response Time", avg_response_time)
     
     with col3:
-        resolution_rate = f"{len(filtered_df[filtered_df['status'] == 'Resolved']) / len(filtered_df):.1%}" if len(filtered_df) > 0 else "0%"
+        resolved_tickets = int(filtered_rollup.loc[filtered_rollup['status'] == 'Resolved', 'count'].sum())
+        resolution_rate = f"{resolved_tickets / total_tickets:.1%}"
         st.metric("Resolution Rate", resolution_rate)
     
     with col4:
-        mean_open_days = "N/A"  # In a real system, you'd calculate this
+        open_days = metrics['open_age_days']['mean']
+        mean_open_days = "N/A" if open_days is None else f"{open_days:.1f}"
         st.metric("Mean Open Days", mean_open_days)
     
+    with st.expander("Response and resolution times"):
+        # Mean and percentiles; open age covers tickets that are not Resolved or Closed
+        timing_rows = []
+        for label, name, scale in [
+            ("Time to first response", 'first_response_hours', 1),
+            ("Time to resolve", 'resolution_hours', 1),
+            ("Open age", 'open_age_days', 24),
+        ]:
+            values = metrics[name]
+            timing_rows.append({
+                'Metric': label,
+                'Mean': format_hours(None if values['mean'] is None else values['mean'] * scale),
+                'Median (p50)': format_hours(None if values['p50'] is None else values['p50'] * scale),
+                'p90': format_hours(None if values['p90'] is None else values['p90'] * scale),
+                'Tickets': values['count'],
+            })
+        st.table(pd.DataFrame(timing_rows).set_index('Metric'))
+    
     # Charts
     st.subheader("Visualizations")
     
-    tab1, tab2, tab3 = st.tabs(["Status Distribution", "Category Distribution", "Tickets Over Time"])
+    # Only the selected chart is computed and rendered
+    chart_view = st.radio(
+        "Chart",
+        ["Status Distribution", "Category Distribution", "Tickets Over Time"],
+        horizontal=True,
+        label_visibility="collapsed"
+    )
     
-    with tab1:
-        # Status distribution
-        status_counts = filtered_df['status'].value_counts()
-        
-        # Create a buffer to hold the chart
-        buf = io.BytesIO()
-        
-        # Create a figure and axis
-        fig, ax = plt.subplots(figsize=(10, 6))
-        
-        # Plot the data
-        status_counts.plot(kind='pie', autopct='%1.1f%%', ax=ax)
-        ax.set_title('Ticket Status Distribution')
-        ax.set_ylabel('')
-        
-        # Save the figure to the buffer
-        plt.tight_layout()
-        plt.savefig(buf, format='png')
-        buf.seek(0)
-        
-        # Display the figure
-        st.image(buf)
+    # The filtered set is identified by the data and archive versions, the date slice and the multiselects
+    chart_key = (data_version, archive_version, start_day, end_day, tuple(selected_categories), tuple(selected_statuses))
     
-    with tab2:
-        # Category distribution
-        category_counts = filtered_df['category'].value_counts()
-        
-        # Create a buffer to hold the chart
-        buf = io.BytesIO()
-        
-        # Create a figure and axis
-        fig, ax = plt.subplots(figsize=(12, 6))
-        
-        # Plot the data
-        category_counts.plot(kind='bar', ax=ax)
-        ax.set_title('Ticket Category Distribution')
-        ax.set_xlabel('Category')
-        ax.set_ylabel('Number of Tickets')
+    # Counts come from the rollup, largest first like value_counts()
+    if chart_view == "Status Distribution":
+        def status_counts():
+            return filtered_rollup.groupby('status')['count'].sum().sort_values(ascending=False)
         
-        # Save the figure to the buffer
-        plt.tight_layout()
-        plt.savefig(buf, format='png')
-        buf.seek(0)
+        st.image(charts.get_chart('status_pie', chart_key, status_counts))
+    
+    elif chart_view == "Category Distribution":
+        def category_counts():
+            return filtered_rollup.groupby('category')['count'].sum().sort_values(ascending=False)
         
-        # Display the figure
-        st.image(buf)
+        st.image(charts.get_chart('category_bar', chart_key, category_counts))
     
-    with tab3:
+    else:
         # Tickets over time (daily)
-        filtered_df['date'] = filtered_df['created_at'].dt.date
-        daily_counts = filtered_df.groupby('date').size()
-        
-        # Create a buffer to hold the chart
-        buf = io.BytesIO()
-        
-        # Create a figure and axis
-        fig, ax = plt.subplots(figsize=(12, 6))
-        
-        # Plot the data
-        daily_counts.plot(kind='line', marker='o', ax=ax)
-        ax.set_title('Tickets Submitted Over Time')
-        ax.set_xlabel('Date')
-        ax.set_ylabel('Number of Tickets')
+        def daily_counts():
+            daily = filtered_rollup.groupby('date')['count'].sum()
+            daily.index = daily.index.date
+            return daily
         
-        # Save the figure to the buffer
-        plt.tight_layout()
-        plt.savefig(buf, format='png')
-        buf.seek(0)
-        
-        # Display the figure
-        st.image(buf)
+        st.image(charts.get_chart('daily_line', chart_key, daily_counts))
     
     # Raw data and export options
     st.subheader("Raw Data")
     
-    # Display simplified dataframe
-    display_cols = ['ticket_id', 'created_at', 'name', 'subject', 'category', 'priority', 'status']
-    st.dataframe(filtered_df[display_cols])
+    # Display simplified dataframe, the rows are only loaded on request
+    if st.checkbox("Show ticket rows"):
+        display_cols = ['ticket_id', 'created_at', 'name', 'subject', 'category', 'priority', 'status']
+        st.dataframe(load_filtered_tickets()[display_cols])
     
     # Export options
     st.subheader("Export Options")
     
-    export_format = st.radio("Select Format", ["CSV", "Excel"], horizontal=True)
+    export_format = st.radio("Select Format", list(ticket_export.EXPORT_FORMATS), horizontal=True)
     
     if st.button("Generate Report"):
-        if export_format == "CSV":
-            csv = filtered_df.to_csv(index=False)
-            filename = f"ticket_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
-            
-            st.download_button(
-                label="Download CSV Report",
-                data=csv,
-                file_name=filename,
-                mime="text/csv"
-            )
-        else:  # Excel
-            # Generate Excel file
-            output = io.BytesIO()
-            with pd.ExcelWriter(output, engine='xlsxwriter') as writer:
-                filtered_df.to_excel(writer, sheet_name='Ticket Data', index=False)
-            
-            filename = f"ticket_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"
-            
+        filtered_df = load_filtered_tickets()
+        extension, mime = ticket_export.EXPORT_FORMATS[export_format]
+        filename = f"ticket_report_{datetime.now().strftime('%Y%m%d_%H%M%S')}.{extension}"
+        
+        # Rows are encoded chunk by chunk into a temporary file; the download
+        # button keeps its own copy of the finished file
+        with ticket_export.export_tickets(ticket_export.iter_chunks(filtered_df), filtered_df.columns, export_format) as report_file:
             st.download_button(
-                label="Download Excel Report",
-                data=output.getvalue(),
+                label=f"Download {export_format} Report",
+                data=report_file.read(),
                 file_name=filename,
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+                mime=mime
             )
 
-# Main execution
-check_authentication()
-generate_reports()
+# Main execution, timed as one rerun of the page
+with perf_metrics.measure('page.reports'):
+    check_authentication()
+    generate_reports()
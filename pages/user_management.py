@@ -1,11 +1,11 @@
 import streamlit as st
-import pandas as pd
 import os
 import sys
 
 # Add parent directory to path to import utils
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import utils
+import perf_metrics
 
 # Page configuration
 st.set_page_config(
@@ -115,14 +115,13 @@ def manage_users():
                 
                 if user_data and utils.verify_password(user_data['password'], current_password):
                     # Update password
-                    admin_df = pd.read_csv(admin_file)
-                    admin_df.loc[admin_df['username'] == current_username, 'password'] = utils.hash_password(new_password)
-                    admin_df.to_csv(admin_file, index=False)
+                    utils.update_password(current_username, new_password)
                     
                     st.success("Password changed successfully.")
                 else:
                     st.error("Current password is incorrect.")
 
-# Main execution
-check_authentication()
-manage_users()
+# Main execution, timed as one rerun of the page
+with perf_metrics.measure('page.user_management'):
+    check_authentication()
+    manage_users()
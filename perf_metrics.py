@@ -0,0 +1,196 @@
+import json
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# In-process timing instrumentation.
+#
+# Storage calls, CSV parses, chart renders and page reruns are measured with
+# measure(name): wall time, rows touched and bytes read and written. Each name
+# has a histogram with logarithmic buckets (about 10% apart), so percentiles
+# are approximate but memory stays constant however many calls are recorded.
+# Bytes are added to the innermost measurement running on the thread, and a
+# finished measurement passes its bytes on to the one it ran inside. Writes
+# done by the writer thread count towards the caller's measurement.
+#
+# With structured logging on (PERF_LOG=1 or set_logging(True)) every
+# measurement is also emitted as one JSON line on the "ticket_perf" logger.
+
+# Bucket i holds durations up to MIN_SECONDS * GROWTH ** i
+MIN_SECONDS = 1e-6
+GROWTH = 1.1
+BUCKETS = 250
+
+_histograms = {}
+_lock = threading.Lock()
+_local = threading.local()
+_settings = {'log': os.environ.get('PERF_LOG', '').strip().lower() in ('1', 'true', 'yes')}
+
+logger = logging.getLogger('ticket_perf')
+
+def _bucket(seconds):
+    if seconds <= MIN_SECONDS:
+        return 0
+    return min(BUCKETS - 1, int(math.ceil(math.log(seconds / MIN_SECONDS, GROWTH))))
+
+def _stack():
+    stack = getattr(_local, 'stack', None)
+    if stack is None:
+        stack = _local.stack = []
+    return stack
+
+def current():
+    """
+    Innermost measurement running on this thread, or None
+    """
+    stack = _stack()
+    return stack[-1] if stack else None
+
+def add_bytes(read=0, written=0):
+    """
+    Count bytes read or written towards the current measurement
+    """
+    measurement = current()
+    if measurement is not None:
+        measurement['bytes_read'] += read
+        measurement['bytes_written'] += written
+
+def record(name, seconds, rows=None, bytes_read=0, bytes_written=0):
+    """
+    Add one observation to the histogram of name
+    """
+    with _lock:
+        histogram = _histograms.get(name)
+        if histogram is None:
+            histogram = _histograms[name] = {
+                'count': 0, 'total': 0.0, 'max': 0.0, 'buckets': [0] * BUCKETS,
+                'rows': 0, 'bytes_read': 0, 'bytes_written': 0,
+            }
+        histogram['count'] += 1
+        histogram['total'] += seconds
+        histogram['max'] = max(histogram['max'], seconds)
+        histogram['buckets'][_bucket(seconds)] += 1
+        histogram['rows'] += rows or 0
+        histogram['bytes_read'] += bytes_read
+        histogram['bytes_written'] += bytes_written
+    
+    if _settings['log']:
+        _emit({'metric': name, 'ms': round(seconds * 1000, 3), 'rows': rows,
+               'bytes_read': bytes_read, 'bytes_written': bytes_written})
+
+def start(name):
+    """
+    Start measuring name and make it the current measurement. Returns the
+    measurement, which takes the number of rows touched as 'rows'.
+    """
+    measurement = {'name': name, 'rows': None, 'bytes_read': 0, 'bytes_written': 0, 'start': time.perf_counter()}
+    _stack().append(measurement)
+    return measurement
+
+def finish(measurement):
+    """
+    Record a measurement from start() and pass its bytes on to the enclosing one
+    """
+    seconds = time.perf_counter() - measurement['start']
+    stack = _stack()
+    for i in range(len(stack) - 1, -1, -1):
+        if stack[i] is measurement:
+            del stack[i]
+            break
+    record(measurement['name'], seconds, measurement['rows'], measurement['bytes_read'], measurement['bytes_written'])
+    add_bytes(measurement['bytes_read'], measurement['bytes_written'])
+
+@contextmanager
+def measure(name):
+    """
+    Time the block as an observation of name. The yielded measurement takes the
+    number of rows touched as 'rows'; bytes are added with add_bytes.
+    """
+    measurement = start(name)
+    try:
+        yield measurement
+    finally:
+        finish(measurement)
+
+@contextmanager
+def attached(measurement):
+    """
+    Make another thread's measurement the current one for the block (used by the writer thread)
+    """
+    if measurement is None:
+        yield
+        return
+    
+    stack = _stack()
+    stack.append(measurement)
+    try:
+        yield
+    finally:
+        stack.pop()
+
+def _percentile(buckets, count, fraction):
+    target = fraction * count
+    seen = 0
+    for i, bucket_count in enumerate(buckets):
+        seen += bucket_count
+        if seen >= target:
+            return MIN_SECONDS * GROWTH ** i
+    return MIN_SECONDS * GROWTH ** (len(buckets) - 1)
+
+def get_metrics():
+    """
+    One dict per metric name: count, total/mean/p50/p95/p99/max in milliseconds,
+    rows and bytes read and written
+    """
+    with _lock:
+        histograms = {name: dict(histogram, buckets=list(histogram['buckets'])) for name, histogram in _histograms.items()}
+    
+    metrics = []
+    for name, histogram in sorted(histograms.items()):
+        count = histogram['count']
+        metrics.append({
+            'name': name,
+            'count': count,
+            'total_ms': histogram['total'] * 1000,
+            'mean_ms': histogram['total'] / count * 1000,
+            # A bucket's upper bound can exceed the largest observation
+            'p50_ms': min(_percentile(histogram['buckets'], count, 0.50), histogram['max']) * 1000,
+            'p95_ms': min(_percentile(histogram['buckets'], count, 0.95), histogram['max']) * 1000,
+            'p99_ms': min(_percentile(histogram['buckets'], count, 0.99), histogram['max']) * 1000,
+            'max_ms': histogram['max'] * 1000,
+            'rows': histogram['rows'],
+            'bytes_read': histogram['bytes_read'],
+            'bytes_written': histogram['bytes_written'],
+        })
+    return metrics
+
+def reset():
+    """
+    Drop all recorded observations
+    """
+    with _lock:
+        _histograms.clear()
+
+def is_logging():
+    return _settings['log']
+
+def set_logging(enabled):
+    """
+    Turn structured log lines for every measurement on or off (for this process)
+    """
+    _settings['log'] = bool(enabled)
+
+def _emit(fields):
+    # Without a configured handler the lines would be dropped, so log to stderr
+    if not logger.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter('%(message)s'))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    
+    fields = dict(fields, ts=round(time.time(), 3), thread=threading.current_thread().name)
+    logger.info(json.dumps(fields))
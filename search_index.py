@@ -0,0 +1,324 @@
+import bisect
+import heapq
+import re
+import threading
+from collections import Counter
+from datetime import datetime
+
+# In-memory inverted index for the admin ticket search.
+#
+# Each ticket's searchable fields are split into lowercase word tokens, and
+# every token maps to the sets of ticket IDs containing it, one set per
+# weight of the heaviest field the token is in (see FIELD_WEIGHTS). A query matches
+# tickets that contain, for every query word, some token starting with that
+# word. One index is kept per tickets file and process; it is tagged with the
+# data version it was built for, patched by local writes and rebuilt when the
+# file was changed by someone else.
+#
+# Ranked search (rank) also accepts words with a typo. The vocabulary of
+# words (tokens of letters only, not IDs or numbers) has its own index from
+# character trigrams to words; a query word's trigrams find the words that
+# could be within a small edit distance of it, which are then checked.
+# Matching tickets are scored by how well and in which field each word
+# matched, boosted by recency, and only the best `limit` of them are picked,
+# with a heap.
+
+SEARCH_FIELDS = ['ticket_id', 'name', 'email', 'subject', 'description']
+# Columns the index is built from: the searched fields and the recency boost
+INDEX_COLUMNS = SEARCH_FIELDS + ['created_at']
+
+# How much a word matched in each field counts
+FIELD_WEIGHTS = {'ticket_id': 4.0, 'subject': 3.0, 'name': 2.0, 'email': 2.0, 'description': 1.0}
+# How much a token counts when it is the query word, starts with it, or is a typo away
+EXACT_SIMILARITY = 1.0
+PREFIX_SIMILARITY = 0.75
+TYPO_SIMILARITY = 0.5
+# A new ticket scores up to RECENCY_BOOST more, halving every RECENCY_HALF_LIFE_DAYS
+RECENCY_BOOST = 0.5
+RECENCY_HALF_LIFE_DAYS = 30
+
+_TOKEN_PATTERN = re.compile(r'\w+')
+_EPOCH = datetime(1970, 1, 1)
+
+# Index state per tickets file
+_indexes = {}
+_lock = threading.Lock()
+
+def tokenize(text):
+    """
+    Lowercase word tokens of a text value
+    """
+    if not isinstance(text, str):
+        # Skip empty (NaN) cells, but keep numbers such as all-digit ticket IDs
+        if text is None or text != text:
+            return []
+        text = str(text)
+    return _TOKEN_PATTERN.findall(text.lower())
+
+def trigrams(token):
+    """
+    Character trigrams of a token, padded so its start and end count as well
+    """
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+def max_typos(word):
+    """
+    Edits allowed for a query word: none for short words, where most tokens would be a typo away
+    """
+    if len(word) < 4:
+        return 0
+    return 1 if len(word) < 8 else 2
+
+def edit_distance(a, b, limit):
+    """
+    Edit distance (insertions, deletions, substitutions and swaps of
+    neighbouring characters) between a and b, or limit + 1 if it exceeds limit
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    
+    previous, current = None, list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        before, previous, current = previous, current, [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = a[i - 1] != b[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+    return current[-1]
+
+def _created_seconds(value):
+    if value is None or value != value:
+        return None
+    try:
+        return (datetime.fromisoformat(str(value)[:19]) - _EPOCH).total_seconds()
+    except ValueError:
+        return None
+
+def _ticket_tokens(row):
+    """
+    {token: weight of the heaviest field it is in} for a ticket's searchable fields
+    """
+    tokens = {}
+    for field in SEARCH_FIELDS:
+        weight = FIELD_WEIGHTS[field]
+        for token in tokenize(row.get(field)):
+            if weight > tokens.get(token, 0):
+                tokens[token] = weight
+    return tokens
+
+def _add(state, row):
+    ticket_id = str(row['ticket_id'])
+    _remove(state, ticket_id)
+    
+    tokens = _ticket_tokens(row)
+    state['doc_tokens'][ticket_id] = tokens
+    state['created'][ticket_id] = _created_seconds(row.get('created_at'))
+    for token, weight in tokens.items():
+        postings = state['postings'].get(token)
+        if postings is None:
+            postings = state['postings'][token] = {}
+            state['vocabulary_dirty'] = True
+            if state['trigrams'] is not None and token.isalpha():
+                for gram in trigrams(token):
+                    state['trigrams'].setdefault(gram, set()).add(token)
+        ticket_ids = postings.get(weight)
+        if ticket_ids is None:
+            ticket_ids = postings[weight] = set()
+        ticket_ids.add(ticket_id)
+
+def _remove(state, ticket_id):
+    state['created'].pop(ticket_id, None)
+    for token, weight in state['doc_tokens'].pop(ticket_id, {}).items():
+        postings = state['postings'][token]
+        postings[weight].discard(ticket_id)
+        if not postings[weight]:
+            del postings[weight]
+        if not postings:
+            del state['postings'][token]
+            state['vocabulary_dirty'] = True
+            if state['trigrams'] is not None and token.isalpha():
+                for gram in trigrams(token):
+                    state['trigrams'][gram].discard(token)
+
+def _build(tickets_df, version):
+    state = {
+        'version': version, 'postings': {}, 'doc_tokens': {}, 'created': {},
+        'vocabulary': [], 'vocabulary_dirty': True, 'trigrams': None,
+    }
+    columns = [column for column in INDEX_COLUMNS if column in tickets_df.columns]
+    for row in tickets_df[columns].to_dict('records'):
+        _add(state, row)
+    return state
+
+def _get_state(file_path, tickets_df, version):
+    state = _indexes.get(file_path)
+    if state is None or state['version'] != version:
+        state = _indexes[file_path] = _build(tickets_df, version)
+    return state
+
+def _prefix_tokens(state, prefix):
+    """
+    Tokens of the vocabulary starting with prefix
+    """
+    if state['vocabulary_dirty']:
+        state['vocabulary'] = sorted(state['postings'])
+        state['vocabulary_dirty'] = False
+    
+    vocabulary = state['vocabulary']
+    start = bisect.bisect_left(vocabulary, prefix)
+    end = bisect.bisect_left(vocabulary, prefix + '\uffff')
+    return vocabulary[start:end]
+
+def _prefix_matches(state, prefix):
+    """
+    Union of the posting lists of all tokens starting with prefix
+    """
+    matches = set()
+    for token in _prefix_tokens(state, prefix):
+        for ticket_ids in state['postings'][token].values():
+            matches |= ticket_ids
+    return matches
+
+def _typo_tokens(state, word):
+    """
+    {token: edit distance} of the tokens within max_typos(word) edits of word
+    """
+    limit = max_typos(word)
+    if limit == 0:
+        return {}
+    
+    if state['trigrams'] is None:
+        # Built on the first ranked search, then kept up to date by _add and _remove
+        state['trigrams'] = {}
+        for token in filter(str.isalpha, state['postings']):
+            for gram in trigrams(token):
+                state['trigrams'].setdefault(gram, set()).add(token)
+    
+    # Every edit changes at most four trigrams (a swap), so a token within
+    # limit edits still shares the rest of the word's trigrams
+    grams = trigrams(word)
+    shared = Counter()
+    for gram in grams:
+        shared.update(state['trigrams'].get(gram, ()))
+    min_shared = max(1, len(grams) - 4 * limit)
+    
+    matches = {}
+    for token, count in shared.items():
+        if count >= min_shared and token != word:
+            distance = edit_distance(word, token, limit)
+            if distance <= limit:
+                matches[token] = distance
+    return matches
+
+def search(file_path, query, tickets_df, version):
+    """
+    IDs of tickets matching every word of the query as a word prefix.
+    tickets_df is the current ticket table, only used if the index has to be (re)built.
+    """
+    terms = tokenize(query)
+    if not terms:
+        return set()
+    
+    with _lock:
+        state = _get_state(file_path, tickets_df, version)
+        
+        # Intersect starting from the most selective term
+        candidates = sorted((_prefix_matches(state, term) for term in set(terms)), key=len)
+        result = set(candidates[0])
+        for matches in candidates[1:]:
+            result &= matches
+            if not result:
+                break
+    
+    return result
+
+def _word_scores(state, word):
+    """
+    {ticket_id: score} of the tickets matching one query word: the best
+    similarity times field weight among the ticket's matching tokens
+    """
+    similarities = {token: PREFIX_SIMILARITY for token in _prefix_tokens(state, word)}
+    if word in state['postings']:
+        similarities[word] = EXACT_SIMILARITY
+    for token, distance in _typo_tokens(state, word).items():
+        similarities.setdefault(token, TYPO_SIMILARITY ** distance)
+    
+    # Set from the lowest score up, so every ticket ends up with its best one
+    groups = sorted(
+        ((similarity * weight, ticket_ids)
+         for token, similarity in similarities.items()
+         for weight, ticket_ids in state['postings'][token].items()),
+        key=lambda group: group[0]
+    )
+    scores = {}
+    for score, ticket_ids in groups:
+        scores.update(dict.fromkeys(ticket_ids, score))
+    return scores
+
+def rank(file_path, query, tickets_df, version, limit, now=None):
+    """
+    The best `limit` tickets matching every word of the query, allowing typos,
+    as (ticket_id, score) pairs from best to worst. tickets_df is only used if
+    the index has to be (re)built.
+    """
+    terms = set(tokenize(query))
+    if not terms:
+        return []
+    
+    now_seconds = ((now or datetime.now()) - _EPOCH).total_seconds()
+    with _lock:
+        state = _get_state(file_path, tickets_df, version)
+        
+        # Sum the word scores of the tickets that match every word, starting from the most selective
+        word_scores = sorted((_word_scores(state, term) for term in terms), key=len)
+        scores = word_scores[0]
+        for other in word_scores[1:]:
+            if not scores:
+                break
+            scores = {ticket_id: score + other[ticket_id] for ticket_id, score in scores.items() if ticket_id in other}
+        if not scores:
+            return []
+        
+        created = state['created']
+        half_life = RECENCY_HALF_LIFE_DAYS * 86400
+        
+        def boosted(item):
+            ticket_id, score = item
+            seconds = created.get(ticket_id)
+            if seconds is None:
+                return score
+            age = max(0.0, now_seconds - seconds)
+            return score * (1 + RECENCY_BOOST * 0.5 ** (age / half_life))
+        
+        # The boost multiplies a score by at most 1 + RECENCY_BOOST, so tickets below the
+        # limit-th best score divided by that can't make it
+        kth_score = heapq.nlargest(limit, scores.values())[-1]
+        cutoff = kth_score / (1 + RECENCY_BOOST)
+        candidates = [item for item in scores.items() if item[1] >= cutoff]
+        
+        # A heap of limit entries instead of sorting every match
+        best = heapq.nlargest(limit, candidates, key=boosted)
+        return [(ticket_id, boosted((ticket_id, score))) for ticket_id, score in best]
+
+def apply_write(file_path, version_before, version_after, removed_ids, added_rows):
+    """
+    Patch the index after a local write. An index that missed earlier changes is
+    dropped and rebuilt by the next search instead.
+    """
+    with _lock:
+        state = _indexes.get(file_path)
+        if state is None:
+            return
+        if state['version'] != version_before:
+            del _indexes[file_path]
+            return
+        
+        for ticket_id in removed_ids:
+            _remove(state, str(ticket_id))
+        for row in added_rows:
+            _add(state, row)
+        state['version'] = version_after
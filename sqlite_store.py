@@ -0,0 +1,425 @@
+import sqlite3
+import threading
+import os
+import pandas as pd
+from datetime import datetime
+
+import data_writer
+import search_index
+import ticket_events
+import ticket_ids
+import ticket_tombstones
+import utils
+
+# One connection per thread and database file (Streamlit runs each session on its own thread)
+_local = threading.local()
+
+TICKET_SCHEMA = """
+CREATE TABLE IF NOT EXISTS tickets (
+    ticket_id TEXT PRIMARY KEY,
+    created_at TEXT,
+    updated_at TEXT,
+    name TEXT,
+    email TEXT,
+    subject TEXT,
+    category TEXT,
+    priority TEXT,
+    status TEXT,
+    description TEXT,
+    resolution TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tickets_status ON tickets (status);
+CREATE INDEX IF NOT EXISTS idx_tickets_category ON tickets (category);
+CREATE INDEX IF NOT EXISTS idx_tickets_priority ON tickets (priority);
+CREATE INDEX IF NOT EXISTS idx_tickets_created_at ON tickets (created_at);
+CREATE TABLE IF NOT EXISTS ticket_changes (
+    version INTEGER PRIMARY KEY AUTOINCREMENT,
+    ticket_id TEXT,
+    op TEXT
+);
+CREATE TRIGGER IF NOT EXISTS tickets_inserted AFTER INSERT ON tickets BEGIN
+    INSERT INTO ticket_changes (ticket_id, op) VALUES (NEW.ticket_id, 'u');
+END;
+CREATE TRIGGER IF NOT EXISTS tickets_updated AFTER UPDATE ON tickets BEGIN
+    INSERT INTO ticket_changes (ticket_id, op) VALUES (NEW.ticket_id, 'u');
+END;
+CREATE TRIGGER IF NOT EXISTS tickets_deleted AFTER DELETE ON tickets BEGIN
+    INSERT INTO ticket_changes (ticket_id, op) VALUES (OLD.ticket_id, 'd');
+END;
+"""
+
+USER_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    password TEXT,
+    role TEXT
+);
+"""
+
+def db_path_for(csv_path):
+    """
+    Map a CSV data file to the SQLite database that replaces it
+    """
+    return os.path.splitext(csv_path)[0] + '.db'
+
+def _connect(db_path, schema, csv_path, migrate):
+    """
+    Get this thread's connection to a database, creating and migrating it on first use
+    """
+    connections = getattr(_local, 'connections', None)
+    if connections is None:
+        connections = _local.connections = {}
+    
+    conn = connections.get(db_path)
+    if conn is None:
+        is_new = not os.path.exists(db_path)
+        os.makedirs(os.path.dirname(db_path) or '.', exist_ok=True)
+        
+        conn = sqlite3.connect(db_path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        # WAL lets readers in other sessions and processes proceed during a write
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript(schema)
+        connections[db_path] = conn
+        
+        # One-shot import of the existing CSV data
+        if is_new and os.path.exists(csv_path):
+            migrate(csv_path, conn)
+    
+    return conn
+
+def _tickets_conn(file_path):
+    return _connect(db_path_for(file_path), TICKET_SCHEMA, file_path, _migrate_tickets)
+
+def _users_conn():
+    return _connect(db_path_for(utils.ADMIN_FILE), USER_SCHEMA, utils.ADMIN_FILE, _migrate_users)
+
+def _migrate_tickets(csv_path, conn):
+    tickets_df = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+    # Deleted tickets whose records are still in the file aren't imported
+    tickets_df = tickets_df[~tickets_df['ticket_id'].isin(ticket_tombstones.get_deleted_ids(csv_path))]
+    rows = [[row.get(col, '') for col in utils.TICKET_COLUMNS] for row in tickets_df.to_dict('records')]
+    
+    with conn:
+        conn.executemany(
+            f"INSERT OR IGNORE INTO tickets ({', '.join(utils.TICKET_COLUMNS)}) "
+            f"VALUES ({', '.join('?' for _ in utils.TICKET_COLUMNS)})",
+            rows
+        )
+
+def _migrate_users(csv_path, conn):
+    admin_df = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+    
+    with conn:
+        conn.executemany(
+            "INSERT OR IGNORE INTO users (username, password, role) VALUES (?, ?, ?)",
+            admin_df[['username', 'password', 'role']].values.tolist()
+        )
+
+def migrate_from_csv(file_path):
+    """
+    Import a tickets CSV file and the admin CSV file into their SQLite databases
+    """
+    _migrate_tickets(file_path, _tickets_conn(file_path))
+    if os.path.exists(utils.ADMIN_FILE):
+        _migrate_users(utils.ADMIN_FILE, _users_conn())
+
+def add_ticket(ticket_data, file_path):
+    """
+    Insert a new ticket row. A ticket without a ticket_id gets a new unique one,
+    which is set in ticket_data and returned.
+    """
+    conn = _tickets_conn(file_path)
+    generated = not ticket_data.get('ticket_id')
+    
+    for _ in range(ticket_ids.MAX_ATTEMPTS):
+        if generated:
+            # The primary key rejects an ID taken in the meantime, also by another process
+            ticket_data['ticket_id'] = ticket_ids.allocate(
+                lambda ticket_id: conn.execute("SELECT 1 FROM tickets WHERE ticket_id = ?", (ticket_id,)).fetchone() is not None
+            )
+        row = ['' if ticket_data.get(col) is None else ticket_data.get(col) for col in utils.TICKET_COLUMNS]
+        
+        try:
+            with conn:
+                conn.execute(
+                    f"INSERT INTO tickets ({', '.join(utils.TICKET_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' for _ in utils.TICKET_COLUMNS)})",
+                    row
+                )
+            return ticket_data['ticket_id']
+        except sqlite3.IntegrityError:
+            if not generated:
+                raise
+    raise RuntimeError(f"No free ticket ID found after {ticket_ids.MAX_ATTEMPTS} attempts")
+
+def get_ticket_by_id(ticket_id, file_path):
+    """
+    Retrieve a ticket by its ID through the primary key index
+    """
+    conn = _tickets_conn(file_path)
+    row = conn.execute("SELECT * FROM tickets WHERE ticket_id = ?", (ticket_id,)).fetchone()
+    
+    if row is None:
+        return None
+    
+    return dict(row)
+
+def update_tickets(ticket_ids, updated_data, file_path, actor=None):
+    """
+    Apply the same updates to several tickets in one transaction.
+    Status and priority changes are recorded in the event log under actor.
+    """
+    conn = _tickets_conn(file_path)
+    ticket_ids = list(ticket_ids)
+    
+    # Update timestamp
+    updated_data = dict(updated_data, updated_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    
+    # Only known columns can be updated
+    fields = [key for key in updated_data if key in utils.TICKET_COLUMNS and key != 'ticket_id']
+    assignments = ', '.join(f"{key} = ?" for key in fields)
+    
+    tracked = ['ticket_id'] + ticket_events.TRACKED_FIELDS
+    placeholders = ', '.join('?' * len(ticket_ids))
+    
+    with conn:
+        old_rows = [dict(zip(tracked, row)) for row in conn.execute(
+            f"SELECT {', '.join(tracked)} FROM tickets WHERE ticket_id IN ({placeholders})", ticket_ids
+        )]
+        cursor = conn.executemany(
+            f"UPDATE tickets SET {assignments} WHERE ticket_id = ?",
+            [[updated_data[key] for key in fields] + [ticket_id] for ticket_id in ticket_ids]
+        )
+    
+    new_rows = [dict(row, **{key: updated_data[key] for key in ticket_events.TRACKED_FIELDS if key in updated_data}) for row in old_rows]
+    events = ticket_events.diff_events(old_rows, new_rows, updated_data['updated_at'], actor)
+    if events:
+        # The event log is a shared file, append to it from the writer thread
+        data_writer.run(file_path, ticket_events.append_events, file_path, events)
+    
+    return cursor.rowcount
+
+def delete_tickets(ticket_ids, file_path):
+    """
+    Delete several tickets in one transaction
+    """
+    conn = _tickets_conn(file_path)
+    
+    with conn:
+        cursor = conn.executemany("DELETE FROM tickets WHERE ticket_id = ?", [(ticket_id,) for ticket_id in ticket_ids])
+    
+    return cursor.rowcount
+
+def get_all_tickets(file_path, start=None, end=None, include_archive=False):
+    """
+    Get all tickets as a DataFrame, optionally only those created on the days start..end.
+    The whole history stays in the database, so there is no archive to include.
+    """
+    conn = _tickets_conn(file_path)
+    
+    conditions = []
+    params = []
+    if start is not None:
+        conditions.append("substr(created_at, 1, 10) >= ?")
+        params.append(pd.Timestamp(start).strftime('%Y-%m-%d'))
+    if end is not None:
+        conditions.append("substr(created_at, 1, 10) <= ?")
+        params.append(pd.Timestamp(end).strftime('%Y-%m-%d'))
+    
+    query = f"SELECT {', '.join(utils.TICKET_COLUMNS)} FROM tickets"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    return pd.read_sql_query(query, conn, params=params)
+
+def search_tickets(search_term, file_path, mode='index', include_archive=False, limit=None):
+    """
+    Search tickets by ID, name, email, subject and description, newest first.
+    All modes run as case-insensitive substring matches (LIKE) on this backend;
+    in 'index' and 'ranked' mode every word of the search has to match, without
+    typos or relevance order. All tickets are searched.
+    """
+    conn = _tickets_conn(file_path)
+    
+    terms = [search_term] if mode == 'substring' else search_term.split()
+    conditions = []
+    params = []
+    for term in terms:
+        pattern = '%' + term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_') + '%'
+        conditions.append('(' + ' OR '.join(f"{field} LIKE ? ESCAPE '\\'" for field in search_index.SEARCH_FIELDS) + ')')
+        params.extend([pattern] * len(search_index.SEARCH_FIELDS))
+    
+    query = f"SELECT {', '.join(utils.TICKET_COLUMNS)} FROM tickets"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY created_at DESC"
+    if mode == 'ranked' and limit is None:
+        limit = utils.SEARCH_LIMIT
+    if limit is not None:
+        query += " LIMIT ?"
+        params.append(int(limit))
+    
+    return pd.read_sql_query(query, conn, params=params)
+
+def get_change_version(file_path):
+    """
+    Change version of the tickets, the last row of the change table written by the triggers
+    """
+    conn = _tickets_conn(file_path)
+    return conn.execute("SELECT COALESCE(MAX(version), 0) FROM ticket_changes").fetchone()[0]
+
+def get_changes_since(version, file_path):
+    """
+    What changed in the tickets after a change version (see utils.get_changes_since)
+    """
+    conn = _tickets_conn(file_path)
+    current = get_change_version(file_path)
+    if version is None or version > current:
+        return {'version': current, 'reset': True, 'tickets': get_all_tickets(file_path), 'deleted': []}
+    
+    # The last change of each ticket decides whether it still exists
+    ops = dict(conn.execute(
+        "SELECT ticket_id, op FROM ticket_changes WHERE version > ? AND version <= ? ORDER BY version",
+        (version, current)
+    ).fetchall())
+    updated_ids = [ticket_id for ticket_id, op in ops.items() if op == 'u']
+    if len(updated_ids) > utils.MAX_CHANGED_ROWS:
+        return {'version': current, 'reset': True, 'tickets': get_all_tickets(file_path), 'deleted': []}
+    
+    tickets_df = pd.read_sql_query(
+        f"SELECT {', '.join(utils.TICKET_COLUMNS)} FROM tickets WHERE ticket_id IN ({', '.join('?' for _ in updated_ids)})",
+        conn, params=updated_ids
+    )
+    deleted_ids = [ticket_id for ticket_id in ops if ticket_id not in set(tickets_df['ticket_id'])]
+    return {'version': current, 'reset': False, 'tickets': tickets_df, 'deleted': deleted_ids}
+
+def get_ticket_stats(file_path):
+    """
+    Get ticket statistics for dashboard from indexed group counts
+    """
+    conn = _tickets_conn(file_path)
+    
+    def counts(column):
+        query = f"SELECT {column}, COUNT(*) FROM tickets GROUP BY {column} ORDER BY COUNT(*) DESC"
+        return {value: count for value, count in conn.execute(query)}
+    
+    by_status = counts('status')
+    
+    return {
+        'total': sum(by_status.values()),
+        'open': by_status.get('Open', 0),
+        'in_progress': by_status.get('In Progress', 0),
+        'resolved': by_status.get('Resolved', 0),
+        'closed': by_status.get('Closed', 0),
+        'by_category': counts('category'),
+        'by_priority': counts('priority')
+    }
+
+def get_daily_rollup(file_path, include_archive=False):
+    """
+    Ticket counts by creation day, category, status and priority (of all tickets)
+    """
+    conn = _tickets_conn(file_path)
+    rollup_df = pd.read_sql_query(
+        "SELECT substr(created_at, 1, 10) AS date, category, status, priority, COUNT(*) AS count "
+        "FROM tickets GROUP BY 1, 2, 3, 4 ORDER BY 1",
+        conn
+    )
+    rollup_df['date'] = pd.to_datetime(rollup_df['date'], errors='coerce')
+    return rollup_df
+
+def initialize_admin_account(username, password):
+    """
+    Initialize admin account data
+    """
+    conn = _users_conn()
+    
+    # Only seed an empty user table
+    if conn.execute("SELECT 1 FROM users LIMIT 1").fetchone() is not None:
+        return False
+    
+    with conn:
+        conn.execute(
+            "INSERT OR IGNORE INTO users (username, password, role) VALUES (?, ?, 'admin')",
+            (username, utils.hash_password(password))
+        )
+    return True
+
+def get_admin_user(username):
+    """
+    Get admin user details
+    """
+    # Initialize default admin account if none exists
+    initialize_admin_account('admin', 'admin123')
+    
+    row = _users_conn().execute("SELECT * FROM users WHERE username = ?", (username,)).fetchone()
+    
+    if row is None:
+        return None
+    
+    return dict(row)
+
+def add_user(username, password, role):
+    """
+    Add a new user
+    """
+    conn = _users_conn()
+    
+    try:
+        with conn:
+            conn.execute(
+                "INSERT INTO users (username, password, role) VALUES (?, ?, ?)",
+                (username, utils.hash_password(password), role)
+            )
+    except sqlite3.IntegrityError:
+        return False  # Username already exists
+    
+    return True
+
+def update_password(username, new_password):
+    """
+    Replace a user's password
+    """
+    conn = _users_conn()
+    
+    with conn:
+        cursor = conn.execute(
+            "UPDATE users SET password = ? WHERE username = ?",
+            (utils.hash_password(new_password), username)
+        )
+    
+    return cursor.rowcount > 0
+
+def get_all_users():
+    """
+    Get all admin users
+    """
+    # Initialize default admin account if none exists
+    initialize_admin_account('admin', 'admin123')
+    
+    # For security, don't return password hashes
+    return pd.read_sql_query("SELECT username, role FROM users", _users_conn())
+
+def delete_user(username):
+    """
+    Delete a user by username
+    """
+    conn = _users_conn()
+    
+    with conn:
+        # Prevent deleting all admin users
+        admins = [row[0] for row in conn.execute("SELECT username FROM users WHERE role = 'admin'")]
+        if len(admins) <= 1 and username in admins:
+            return False
+        
+        cursor = conn.execute("DELETE FROM users WHERE username = ?", (username,))
+    
+    return cursor.rowcount > 0
+
+if __name__ == '__main__':
+    # Manual one-shot migration: python sqlite_store.py [tickets.csv]
+    import sys
+    
+    tickets_csv = sys.argv[1] if len(sys.argv) > 1 else 'data/tickets.csv'
+    migrate_from_csv(tickets_csv)
+    print(f"Migrated {tickets_csv} to {db_path_for(tickets_csv)}")
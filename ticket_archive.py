@@ -0,0 +1,232 @@
+import csv
+import glob
+import gzip
+import os
+import re
+import threading
+
+import pandas as pd
+
+import data_writer
+import perf_metrics
+import ticket_schema
+
+# Cold storage for finished tickets.
+#
+# tickets.csv is the hot store that the dashboard, the tracking page and all
+# sidecars work on. Closed and Resolved tickets that haven't changed for a
+# while are moved by the archive job into gzip-compressed partitions, one per
+# creation month (archive/tickets-YYYY-MM.csv.gz next to tickets.csv), so the
+# hot file only holds the working set however much history accumulates.
+#
+# archive/tickets.index.csv maps every archived ticket ID to its month, so a
+# single ticket is found without opening other partitions, and the ticket
+# counts of each partition are kept in memory for the Reports page. Readers
+# prune partitions by month and only load the ones a query asks for.
+
+ARCHIVED_STATUSES = ['Closed', 'Resolved']
+DEFAULT_ARCHIVE_DAYS = int(os.environ.get('TICKET_ARCHIVE_DAYS', '180'))
+
+_PARTITION_PATTERN = re.compile(r'-(\d{4}-\d{2})\.csv\.gz$')
+
+# Loaded partitions and the ID index, keyed by path: (version, contents)
+_partitions = {}
+_index = {}
+_counts = {}
+_lock = threading.Lock()
+
+def archive_dir_for(file_path):
+    """
+    Directory holding the cold partitions of a tickets CSV file
+    """
+    return os.path.join(os.path.dirname(file_path) or '.', 'archive')
+
+def _base_name(file_path):
+    return os.path.splitext(os.path.basename(file_path))[0]
+
+def partition_path_for(file_path, month):
+    """
+    Path of the partition for a creation month ("YYYY-MM")
+    """
+    return os.path.join(archive_dir_for(file_path), f"{_base_name(file_path)}-{month}.csv.gz")
+
+def index_path_for(file_path):
+    return os.path.join(archive_dir_for(file_path), f"{_base_name(file_path)}.index.csv")
+
+def _version(path):
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+def list_partitions(file_path, start=None, end=None):
+    """
+    (month, path) of the partitions, oldest first, optionally only the months
+    overlapping the days start..end (inclusive, either may be None)
+    """
+    start_month = None if start is None else pd.Timestamp(start).strftime('%Y-%m')
+    end_month = None if end is None else pd.Timestamp(end).strftime('%Y-%m')
+    
+    partitions = []
+    for path in glob.glob(os.path.join(glob.escape(archive_dir_for(file_path)), f"{glob.escape(_base_name(file_path))}-*.csv.gz")):
+        match = _PARTITION_PATTERN.search(path)
+        if match is None:
+            continue
+        month = match.group(1)
+        if (start_month is None or month >= start_month) and (end_month is None or month <= end_month):
+            partitions.append((month, path))
+    return sorted(partitions)
+
+def get_archive_version(file_path):
+    """
+    Version of the whole archive: changes whenever a partition is written
+    """
+    return tuple((month, _version(path)) for month, path in list_partitions(file_path))
+
+def load_partition(path):
+    """
+    Tickets of one partition. The DataFrame is shared and must not be modified.
+    """
+    with _lock:
+        version = _version(path)
+        entry = _partitions.get(path)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        
+        with perf_metrics.measure('archive.load') as measurement:
+            tickets_df = ticket_schema.read_tickets(path, compression='gzip')
+            measurement['rows'] = len(tickets_df)
+            perf_metrics.add_bytes(read=version[1])
+        _partitions[path] = (version, tickets_df)
+        _counts.pop(path, None)
+        return tickets_df
+
+def load_archive(file_path, start=None, end=None):
+    """
+    Archived tickets created in the months overlapping start..end, as one DataFrame
+    """
+    frames = [load_partition(path) for _, path in list_partitions(file_path, start, end)]
+    if not frames:
+        return None
+    return pd.concat(frames, ignore_index=True)
+
+def _load_index(file_path):
+    """
+    {ticket_id: month} of the archived tickets
+    """
+    index_path = index_path_for(file_path)
+    with _lock:
+        version = _version(index_path)
+        if version is None:
+            return {}
+        entry = _index.get(index_path)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        
+        with open(index_path, newline='', encoding='utf-8') as f:
+            months = {ticket_id: month for ticket_id, month in csv.reader(f)}
+        _index[index_path] = (version, months)
+        return months
+
+def is_archived(file_path, ticket_id):
+    return str(ticket_id) in _load_index(file_path)
+
+def find_ticket(file_path, ticket_id):
+    """
+    An archived ticket as a dict, or None. Only the ticket's own partition is read.
+    """
+    month = _load_index(file_path).get(str(ticket_id))
+    if month is None:
+        return None
+    
+    path = partition_path_for(file_path, month)
+    if not os.path.exists(path):
+        return None
+    
+    tickets_df = load_partition(path)
+    rows = tickets_df[tickets_df['ticket_id'].astype(str) == str(ticket_id)]
+    if len(rows) == 0:
+        return None
+    return rows.iloc[0].to_dict()
+
+def get_counts(file_path, group_columns):
+    """
+    Ticket counts of every partition by (creation day, *group_columns), summed over the
+    archive as a DataFrame with a 'count' column. Counted once per partition version.
+    """
+    frames = []
+    for _, path in list_partitions(file_path):
+        version = _version(path)
+        with _lock:
+            entry = _counts.get(path)
+        if entry is None or entry[0] != version:
+            tickets_df = load_partition(path)
+            keys = [tickets_df['created_at'].astype(str).str[:10].rename('date')] + [
+                tickets_df[column].fillna('').astype(str) for column in group_columns
+            ]
+            counts = tickets_df.groupby(keys).size().rename('count').reset_index()
+            entry = (version, counts)
+            with _lock:
+                _counts[path] = entry
+        frames.append(entry[1])
+    
+    if not frames:
+        return pd.DataFrame(columns=['date'] + list(group_columns) + ['count'])
+    return pd.concat(frames, ignore_index=True).groupby(['date'] + list(group_columns), as_index=False)['count'].sum()
+
+def select_for_archive(tickets_df, older_than_days, now):
+    """
+    Mask of tickets that are finished and haven't been updated for older_than_days
+    """
+    updated_at = pd.to_datetime(tickets_df['updated_at'], errors='coerce')
+    created_at = pd.to_datetime(tickets_df['created_at'], errors='coerce')
+    cutoff = pd.Timestamp(now) - pd.Timedelta(days=older_than_days)
+    return tickets_df['status'].isin(ARCHIVED_STATUSES) & (updated_at.fillna(created_at) < cutoff) & created_at.notna()
+
+def write_partitions(file_path, archived_df):
+    """
+    Merge tickets into their monthly partitions and record them in the ID index.
+    Runs on the writer thread, before the tickets are removed from the hot file.
+    """
+    archive_dir = archive_dir_for(file_path)
+    os.makedirs(archive_dir, exist_ok=True)
+    
+    months = pd.to_datetime(archived_df['created_at'], errors='coerce').dt.strftime('%Y-%m')
+    index_rows = []
+    for month, rows in archived_df.groupby(months):
+        path = partition_path_for(file_path, month)
+        if os.path.exists(path):
+            # A ticket archived again (e.g. after an interrupted run) keeps one copy
+            rows = pd.concat([load_partition(path), rows], ignore_index=True)
+            rows = rows.drop_duplicates('ticket_id', keep='last')
+        rows = rows.sort_values('created_at', kind='stable')
+        
+        def write(f, rows=rows):
+            data = rows.to_csv(index=False).encode('utf-8')
+            f.write(gzip.compress(data, compresslevel=6))
+        
+        data_writer.replace_file(path, write, binary=True)
+        index_rows.extend((ticket_id, month) for ticket_id in rows['ticket_id'].astype(str))
+    
+    # Rewritten as a whole so it never lists tickets twice
+    months_by_id = dict(_load_index(file_path))
+    months_by_id.update(index_rows)
+    
+    def write_index(f):
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerows(months_by_id.items())
+    
+    data_writer.replace_file(index_path_for(file_path), write_index)
+
+if __name__ == '__main__':
+    import argparse
+    import utils
+    
+    parser = argparse.ArgumentParser(description="Move finished tickets into the monthly archive partitions")
+    parser.add_argument('file', nargs='?', default='data/tickets.csv', help="tickets CSV file")
+    parser.add_argument('--days', type=int, default=DEFAULT_ARCHIVE_DAYS,
+                        help="archive Closed and Resolved tickets not updated for this many days")
+    args = parser.parse_args()
+    
+    print(f"Archived {utils.archive_tickets(args.file, older_than_days=args.days)} tickets")
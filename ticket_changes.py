@@ -0,0 +1,132 @@
+import bisect
+import os
+import threading
+
+import data_writer
+
+# Change feed of a tickets CSV file.
+#
+# Every write appends "version<TAB>ticket_id<TAB>op" lines to the change log
+# (tickets.changes next to tickets.csv): op "u" for an added or updated
+# ticket, "d" for a deleted (or archived) one. Each write gets the next
+# version number, so the version only ever grows, also across server
+# processes since writes hold the file lock. Readers keep the log in memory,
+# read only what was appended since their last look, and answer "what
+# changed after version v" by bisecting, in time proportional to the changes.
+#
+# The log is compacted to the latest line per ticket once it is several times
+# longer than that; versions are kept, so every answer stays complete. The
+# first line holds the generation of the file (see data_writer).
+
+COMPACT_RATIO = 4
+COMPACT_MIN_LINES = 10000
+
+# In-memory copies of loaded logs, keyed by CSV path
+_logs = {}
+_lock = threading.Lock()
+
+def changes_path_for(file_path):
+    """
+    Path of the change log for a tickets CSV file
+    """
+    return os.path.splitext(file_path)[0] + '.changes'
+
+def _load(file_path):
+    """
+    In-memory log for a CSV file, reading only lines appended since the last load
+    """
+    key = os.path.abspath(file_path)
+    changes_path = changes_path_for(file_path)
+    
+    try:
+        f = open(changes_path, 'rb')
+    except FileNotFoundError:
+        f = None
+    
+    if f is None:
+        # A removed log starts over
+        state = _logs[key] = {'generation': None, 'inode': None, 'pos': 0, 'versions': [], 'entries': [], 'latest': {}}
+        return state
+    
+    with f:
+        stat = os.fstat(f.fileno())
+        generation, header_bytes = data_writer.read_generation(f)
+        state = _logs.get(key)
+        # A compacted (replaced) or recreated log has to be read again from the start
+        if (state is None or state['generation'] != generation or state['inode'] != stat.st_ino
+                or stat.st_size < state['pos']):
+            state = {'generation': generation, 'inode': stat.st_ino, 'pos': header_bytes, 'versions': [], 'entries': [], 'latest': {}}
+            _logs[key] = state
+        
+        if stat.st_size > state['pos']:
+            f.seek(state['pos'])
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # Partially written line, read it next time
+                state['pos'] += len(line)
+                version, ticket_id, op = line.decode('utf-8').rstrip('\n').split('\t')
+                state['versions'].append(int(version))
+                state['entries'].append((ticket_id, op))
+                state['latest'][ticket_id] = (int(version), op)
+    
+    return state
+
+def get_version(file_path):
+    """
+    Current change version of a tickets file, 0 before its first recorded write
+    """
+    with _lock:
+        state = _load(file_path)
+        return state['versions'][-1] if state['versions'] else 0
+
+def record_changes(file_path, updated_ids, deleted_ids):
+    """
+    Log one write as the next version (runs on the writer thread)
+    """
+    if not updated_ids and not deleted_ids:
+        return
+    
+    with _lock:
+        state = _load(file_path)
+        version = (state['versions'][-1] if state['versions'] else 0) + 1
+        lines = [f"{version}\t{ticket_id}\tu\n" for ticket_id in updated_ids]
+        lines += [f"{version}\t{ticket_id}\td\n" for ticket_id in deleted_ids]
+        with open(changes_path_for(file_path), 'a', encoding='utf-8') as f:
+            if f.tell() == 0:
+                lines.insert(0, data_writer.generation_line())
+            f.write(''.join(lines))
+        state = _load(file_path)
+        
+        if len(state['entries']) >= COMPACT_MIN_LINES and len(state['entries']) > COMPACT_RATIO * len(state['latest']):
+            _compact(file_path, state)
+
+def _compact(file_path, state):
+    changes_path = changes_path_for(file_path)
+    tmp_path = f"{changes_path}.{os.getpid()}.tmp"
+    latest = sorted((version, ticket_id, op) for ticket_id, (version, op) in state['latest'].items())
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(data_writer.generation_line())
+        f.write(''.join(f"{version}\t{ticket_id}\t{op}\n" for version, ticket_id, op in latest))
+    os.replace(tmp_path, changes_path)
+    _logs.pop(os.path.abspath(file_path), None)
+
+def changes_since(file_path, version):
+    """
+    (current version, updated IDs, deleted IDs) for the writes after version. The
+    ID lists are None without a version or if the log is older than version.
+    """
+    with _lock:
+        state = _load(file_path)
+        current = state['versions'][-1] if state['versions'] else 0
+        if version is None or version > current:
+            return current, None, None
+        
+        start = bisect.bisect_right(state['versions'], version)
+        # The last change of each ticket decides whether it still exists
+        ops = {}
+        for ticket_id, op in state['entries'][start:]:
+            ops[ticket_id] = op
+    
+    updated_ids = [ticket_id for ticket_id, op in ops.items() if op == 'u']
+    deleted_ids = [ticket_id for ticket_id, op in ops.items() if op == 'd']
+    return current, updated_ids, deleted_ids
@@ -0,0 +1,159 @@
+import http.client
+import os
+import queue
+import socket
+import threading
+
+import ticket_rpc
+
+# Client of the ticket-store service (ticket_server.py), the "remote" backend.
+#
+# With TICKET_STORAGE=remote the ticket storage functions in utils are sent
+# to the server configured by TICKET_SERVER: "unix:data/ticket-store.sock"
+# (the default) or e.g. "http://127.0.0.1:8765". Requests carry the shared
+# secret from TICKET_SERVER_TOKEN, or else from the token file the server
+# wrote (TICKET_SERVER_TOKEN_FILE, default data/ticket-store.token).
+# Keep-alive connections are pooled and shared by all sessions of the
+# process. batch() sends several calls in one request.
+
+DEFAULT_SERVER = 'unix:data/ticket-store.sock'
+DEFAULT_TOKEN_FILE = 'data/ticket-store.token'
+POOL_SIZE = int(os.environ.get('TICKET_SERVER_POOL', '8'))
+TIMEOUT = float(os.environ.get('TICKET_SERVER_TIMEOUT', '30'))
+
+_pool = queue.LifoQueue()
+_stats = {'requests': 0, 'connections': 0}
+_stats_lock = threading.Lock()
+
+class RemoteError(RuntimeError):
+    """
+    A call that failed on the server, with the server's exception type name
+    """
+    def __init__(self, message, error_type):
+        super().__init__(f"{error_type}: {message}")
+        self.error_type = error_type
+
+class UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout):
+        super().__init__('localhost', timeout=timeout)
+        self.unix_path = path
+    
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.unix_path)
+
+def get_server_address():
+    return os.environ.get('TICKET_SERVER', DEFAULT_SERVER).strip()
+
+def get_token():
+    token = os.environ.get('TICKET_SERVER_TOKEN', '').strip()
+    if token:
+        return token
+    token_path = os.environ.get('TICKET_SERVER_TOKEN_FILE', DEFAULT_TOKEN_FILE)
+    try:
+        with open(token_path, encoding='utf-8') as f:
+            return f.read().strip()
+    except FileNotFoundError:
+        raise RemoteError(f"No TICKET_SERVER_TOKEN and no token file at {token_path}", 'AuthError') from None
+
+def _connect():
+    address = get_server_address()
+    with _stats_lock:
+        _stats['connections'] += 1
+    if address.startswith('unix:'):
+        return UnixHTTPConnection(address[len('unix:'):], TIMEOUT)
+    
+    host_port = address.split('://', 1)[-1].rstrip('/')
+    return http.client.HTTPConnection(host_port, timeout=TIMEOUT)
+
+def _send(connection, body):
+    connection.request('POST', '/rpc', body=body, headers={
+        'Content-Type': 'application/json',
+        'Authorization': f"Bearer {get_token()}",
+    })
+    response = connection.getresponse()
+    return response, response.read()
+
+def _post(body):
+    """
+    Send a request on a pooled connection and return the response body
+    """
+    try:
+        connection, reused = _pool.get_nowait(), True
+    except queue.Empty:
+        connection, reused = _connect(), False
+    
+    try:
+        response, data = _send(connection, body)
+    except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+        connection.close()
+        if not reused:
+            raise
+        # The server dropped an idle pooled connection; send again on a new one
+        connection = _connect()
+        try:
+            response, data = _send(connection, body)
+        except Exception:
+            connection.close()
+            raise
+    except Exception:
+        connection.close()
+        raise
+    
+    if response.status != 200:
+        connection.close()
+        raise RemoteError(ticket_rpc.decode(data).get('error', response.reason), 'HTTPError')
+    
+    if _pool.qsize() < POOL_SIZE:
+        _pool.put(connection)
+    else:
+        connection.close()
+    return data
+
+def batch(calls):
+    """
+    Run (op, args, kwargs) calls on the server in one request. Returns their
+    results in order; the first failed call raises RemoteError.
+    """
+    body = ticket_rpc.encode({'calls': [
+        {'op': op, 'args': list(args), 'kwargs': dict(kwargs)} for op, args, kwargs in calls
+    ]})
+    with _stats_lock:
+        _stats['requests'] += 1
+    
+    results = ticket_rpc.decode(_post(body))['results']
+    values = []
+    for result in results:
+        if not result['ok']:
+            raise RemoteError(result['error'], result['type'])
+        values.append(result['value'])
+    return values
+
+def call(op, *args, **kwargs):
+    return batch([(op, args, kwargs)])[0]
+
+def get_client_stats():
+    """
+    Requests sent, connections opened and idle pooled connections
+    """
+    with _stats_lock:
+        return dict(_stats, pooled=_pool.qsize())
+
+def _operation(op):
+    def remote_call(*args, **kwargs):
+        return call(op, *args, **kwargs)
+    remote_call.__name__ = op
+    remote_call.__doc__ = f"Run utils.{op} on the ticket-store server"
+    return remote_call
+
+# One function per server operation, called by utils' pluggable storage functions
+for _op in ticket_rpc.OPERATIONS:
+    globals()[_op] = _operation(_op)
+
+def add_ticket(ticket_data, file_path):
+    """
+    Add a ticket on the server; the ID it allocates is set in ticket_data and returned
+    """
+    ticket_data['ticket_id'] = call('add_ticket', ticket_data, file_path)
+    return ticket_data['ticket_id']
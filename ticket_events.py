@@ -0,0 +1,143 @@
+import csv
+import os
+import threading
+
+import pandas as pd
+
+# Append-only log of ticket status and priority changes (tickets.events.csv).
+#
+# The update path appends one line per changed field. Readers keep, per
+# process, the first response time (first status change away from Open) and
+# the resolution time (first change to Resolved or Closed) of every ticket,
+# reading only lines added since their last look, so response and resolution
+# metrics never replay the whole log.
+
+EVENT_COLUMNS = ['ticket_id', 'field', 'from_value', 'to_value', 'timestamp', 'actor']
+TRACKED_FIELDS = ['status', 'priority']
+RESOLVED_STATUSES = ['Resolved', 'Closed']
+
+# Per-ticket timings read from the log, keyed by CSV path
+_timings = {}
+_lock = threading.Lock()
+
+def events_path_for(file_path):
+    """
+    Path of the event log for a tickets CSV file
+    """
+    return os.path.splitext(file_path)[0] + '.events.csv'
+
+def get_events_version(file_path):
+    """
+    Size of the event log, which only grows
+    """
+    try:
+        return os.path.getsize(events_path_for(file_path))
+    except FileNotFoundError:
+        return 0
+
+def diff_events(old_rows, new_rows, timestamp, actor):
+    """
+    Events for the tracked fields that differ between old and new versions of the same rows
+    """
+    events = []
+    for old_row, new_row in zip(old_rows, new_rows):
+        for field in TRACKED_FIELDS:
+            if old_row.get(field) != new_row.get(field):
+                events.append([new_row['ticket_id'], field, old_row.get(field), new_row.get(field), timestamp, actor or ''])
+    return events
+
+def append_events(file_path, events):
+    """
+    Append event rows (in EVENT_COLUMNS order) to the log. Runs on the writer thread.
+    """
+    if not events:
+        return
+    
+    events_path = events_path_for(file_path)
+    write_header = not os.path.exists(events_path) or os.path.getsize(events_path) == 0
+    
+    with open(events_path, 'a', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        if write_header:
+            writer.writerow(EVENT_COLUMNS)
+        writer.writerows(events)
+
+def _load(file_path):
+    """
+    Per-ticket first response and resolution times, reading only new log lines
+    """
+    key = os.path.abspath(file_path)
+    events_path = events_path_for(file_path)
+    
+    state = _timings.get(key)
+    if state is None:
+        state = _timings[key] = {'pos': 0, 'first_response': {}, 'resolved': {}, 'frame': None}
+    
+    size = get_events_version(file_path)
+    if size > state['pos']:
+        with open(events_path, 'rb') as f:
+            f.seek(state['pos'])
+            data = f.read()
+        # Leave a partially written last line for the next load
+        data = data[:data.rfind(b'\n') + 1]
+        is_start = state['pos'] == 0
+        state['pos'] += len(data)
+        
+        rows = csv.reader(data.decode('utf-8').splitlines())
+        if is_start:
+            next(rows, None)  # Header
+        
+        for ticket_id, field, from_value, to_value, timestamp, actor in rows:
+            if field != 'status':
+                continue
+            if from_value == 'Open' and to_value != 'Open':
+                state['first_response'].setdefault(ticket_id, timestamp)
+            if to_value in RESOLVED_STATUSES:
+                state['resolved'].setdefault(ticket_id, timestamp)
+        state['frame'] = None
+    
+    return state
+
+def get_timings(file_path):
+    """
+    DataFrame indexed by ticket_id with first_response_at and resolved_at timestamps.
+    The DataFrame is shared and must not be modified.
+    """
+    with _lock:
+        state = _load(file_path)
+        if state['frame'] is None:
+            state['frame'] = pd.DataFrame({
+                'first_response_at': pd.to_datetime(pd.Series(state['first_response'], dtype=object), errors='coerce'),
+                'resolved_at': pd.to_datetime(pd.Series(state['resolved'], dtype=object), errors='coerce'),
+            })
+        return state['frame']
+
+def response_metrics(tickets_df, timings_df, now):
+    """
+    Time to first response and to resolution (hours) and age of unresolved tickets (days)
+    over a set of tickets, as {metric: {'mean', 'p50', 'p90', 'count'}}
+    """
+    created_at = pd.to_datetime(tickets_df['created_at'], errors='coerce')
+    ticket_ids = tickets_df['ticket_id'].astype(str)
+    timings = timings_df.reindex(ticket_ids.values)
+    
+    first_response = pd.Series(timings['first_response_at'].values, index=tickets_df.index)
+    resolved = pd.Series(timings['resolved_at'].values, index=tickets_df.index)
+    is_open = ~tickets_df['status'].isin(RESOLVED_STATUSES)
+    
+    durations = {
+        'first_response_hours': (first_response - created_at).dt.total_seconds() / 3600,
+        'resolution_hours': (resolved - created_at).dt.total_seconds() / 3600,
+        'open_age_days': (pd.Timestamp(now) - created_at[is_open]).dt.total_seconds() / 86400,
+    }
+    
+    metrics = {}
+    for name, values in durations.items():
+        values = values.dropna()
+        metrics[name] = {
+            'mean': values.mean() if len(values) else None,
+            'p50': values.quantile(0.5) if len(values) else None,
+            'p90': values.quantile(0.9) if len(values) else None,
+            'count': int(len(values)),
+        }
+    return metrics
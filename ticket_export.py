@@ -0,0 +1,85 @@
+import tempfile
+
+import pandas as pd
+
+# Streaming export of ticket rows for the Reports page.
+#
+# Rows are encoded a chunk at a time into a spooled temporary file, which
+# stays in memory for small exports and moves to disk once it grows past
+# SPOOL_MAX_SIZE. Only one encoded chunk exists at a time, so the memory an
+# export needs does not grow with its size. Excel files are written with
+# xlsxwriter in constant-memory mode, which flushes each row as it is written.
+
+CHUNK_ROWS = 10000
+SPOOL_MAX_SIZE = 8 * 1024 * 1024
+
+# Format: (file extension, MIME type)
+EXPORT_FORMATS = {
+    'CSV': ('csv', 'text/csv'),
+    'JSON Lines': ('jsonl', 'application/x-ndjson'),
+    'Excel': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
+
+def iter_chunks(tickets_df, chunk_rows=CHUNK_ROWS):
+    """
+    Consecutive slices of a ticket table, without copying it
+    """
+    for start in range(0, len(tickets_df), chunk_rows):
+        yield tickets_df.iloc[start:start + chunk_rows]
+
+def _as_text(chunk):
+    """
+    Chunk with timestamps in the CSV format and empty cells as empty strings
+    """
+    chunk = chunk.copy()
+    for column in chunk.columns:
+        if pd.api.types.is_datetime64_any_dtype(chunk[column]):
+            chunk[column] = chunk[column].dt.strftime('%Y-%m-%d %H:%M:%S')
+        chunk[column] = chunk[column].astype(object).where(chunk[column].notna(), '')
+    return chunk
+
+def _write_csv(out, columns, chunks):
+    out.write(','.join(columns).encode('utf-8') + b'\n')
+    for chunk in chunks:
+        out.write(_as_text(chunk).to_csv(index=False, header=False, lineterminator='\n').encode('utf-8'))
+
+def _write_jsonl(out, columns, chunks):
+    for chunk in chunks:
+        if len(chunk):
+            # Every line, including the last, ends with a newline
+            out.write(_as_text(chunk).to_json(orient='records', lines=True, force_ascii=False).encode('utf-8'))
+
+def _write_xlsx(out, columns, chunks):
+    import xlsxwriter
+    
+    workbook = xlsxwriter.Workbook(out, {'constant_memory': True})
+    worksheet = workbook.add_worksheet('Ticket Data')
+    worksheet.write_row(0, 0, columns)
+    
+    row_no = 1
+    for chunk in chunks:
+        for values in _as_text(chunk).itertuples(index=False, name=None):
+            worksheet.write_row(row_no, 0, values)
+            row_no += 1
+    workbook.close()
+
+_WRITERS = {
+    'CSV': _write_csv,
+    'JSON Lines': _write_jsonl,
+    'Excel': _write_xlsx,
+}
+
+def export_tickets(chunks, columns, export_format):
+    """
+    Encode chunks of ticket rows (DataFrames with the given columns) in one of
+    EXPORT_FORMATS. Returns a spooled temporary file positioned at the start;
+    the caller closes it.
+    """
+    out = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    try:
+        _WRITERS[export_format](out, list(columns), chunks)
+    except BaseException:
+        out.close()
+        raise
+    out.seek(0)
+    return out
@@ -0,0 +1,33 @@
+import secrets
+
+# Allocation of short ticket IDs.
+#
+# Customers see and type ticket IDs, so they stay 8 uppercase hex characters
+# (32 bits). At that size random IDs collide once there are tens of thousands
+# of tickets, so every new ID is checked against the IDs in use before it is
+# handed out. The check is a lookup in the ticket index that the storage layer
+# already keeps in memory (plus the archive's ID index), and allocation runs on
+# the writer thread under the file lock together with the append that stores
+# the ticket, so two server processes can't hand out the same ID.
+
+ID_ALPHABET = '0123456789ABCDEF'
+ID_LENGTH = 8
+
+# Drawing this many taken IDs in a row means the ID space is close to full
+MAX_ATTEMPTS = 100
+
+def new_candidate():
+    """
+    Random ID in the customer-facing format
+    """
+    return ''.join(secrets.choice(ID_ALPHABET) for _ in range(ID_LENGTH))
+
+def allocate(is_taken):
+    """
+    New ID for which is_taken(ticket_id) is false
+    """
+    for _ in range(MAX_ATTEMPTS):
+        ticket_id = new_candidate()
+        if not is_taken(ticket_id):
+            return ticket_id
+    raise RuntimeError(f"No free ticket ID found after {MAX_ATTEMPTS} attempts")
@@ -0,0 +1,207 @@
+import csv
+import io
+import os
+import threading
+
+import data_writer
+import perf_metrics
+import ticket_tombstones
+
+# Sidecar primary-key index for a tickets CSV file.
+#
+# The index file (tickets.idx next to tickets.csv) is an append-only log of
+# "ticket_id<TAB>offset<TAB>end" lines: the byte offset of the ticket's record
+# in the CSV and the CSV size after that write. Later lines win, an offset of -1
+# marks a deleted ticket. The last "end" value lets readers detect a CSV that
+# was changed without updating the index, in which case the index is rebuilt.
+# The first line holds the generation of the file (see data_writer).
+
+# In-memory copies of loaded index files, keyed by CSV path
+_indexes = {}
+_lock = threading.Lock()
+
+def index_path_for(file_path):
+    """
+    Path of the sidecar index for a tickets CSV file
+    """
+    return os.path.splitext(file_path)[0] + '.idx'
+
+def _scan_records(file_path):
+    """
+    Yield (offset, raw bytes) for every record after the header.
+    A record ends at a newline once its quote characters are balanced.
+    """
+    with open(file_path, 'rb') as f:
+        offset = 0
+        start = 0
+        quotes = 0
+        parts = []
+        is_header = True
+        
+        for line in f:
+            if not parts:
+                start = offset
+            parts.append(line)
+            quotes += line.count(b'"')
+            offset += len(line)
+            
+            if quotes % 2 == 0:
+                if not is_header:
+                    yield start, b''.join(parts)
+                is_header = False
+                parts = []
+                quotes = 0
+
+def _parse_record(raw):
+    return next(csv.reader(io.StringIO(raw.decode('utf-8'), newline='')), [])
+
+def rebuild_index(file_path):
+    """
+    Rebuild the index of a tickets CSV file from scratch
+    """
+    index_path = index_path_for(file_path)
+    entries = {}
+    
+    if os.path.exists(file_path):
+        # Deleted tickets keep their records until the file is compacted
+        deleted_ids = ticket_tombstones.get_deleted_ids(file_path)
+        for offset, raw in _scan_records(file_path):
+            fields = _parse_record(raw)
+            if fields and fields[0] and fields[0] not in deleted_ids:
+                entries[fields[0]] = offset
+        end = os.path.getsize(file_path)
+    else:
+        end = 0
+    
+    # Write to a temp file and swap it in so readers never see a partial index
+    tmp_path = index_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(data_writer.generation_line())
+        for ticket_id, offset in entries.items():
+            f.write(f"{ticket_id}\t{offset}\t{end}\n")
+        if not entries:
+            f.write(f"\t-1\t{end}\n")
+    os.replace(tmp_path, index_path)
+    
+    with _lock:
+        _indexes.pop(os.path.abspath(file_path), None)
+
+def _read_entries(f, state):
+    for line in f:
+        if not line.endswith(b'\n'):
+            break  # Partially written line, read it next time
+        state['pos'] += len(line)
+        ticket_id, offset, end = line.decode('utf-8').rstrip('\n').split('\t')
+        if ticket_id:
+            if offset == '-1':
+                state['entries'].pop(ticket_id, None)
+            else:
+                state['entries'][ticket_id] = int(offset)
+        state['end'] = int(end)
+
+def _load_index(file_path):
+    """
+    In-memory index for a CSV file, reading only lines appended since the last load
+    """
+    key = os.path.abspath(file_path)
+    index_path = index_path_for(file_path)
+    
+    try:
+        f = open(index_path, 'rb')
+    except FileNotFoundError:
+        return None
+    
+    with f:
+        stat = os.fstat(f.fileno())
+        generation, header_bytes = data_writer.read_generation(f)
+        state = _indexes.get(key)
+        # A rebuilt (replaced) or truncated index has to be read again from the start
+        if (state is None or state['generation'] != generation or state['inode'] != stat.st_ino
+                or stat.st_size < state['pos']):
+            state = {'generation': generation, 'inode': stat.st_ino, 'pos': header_bytes, 'end': -1, 'entries': {}}
+            _indexes[key] = state
+        
+        if stat.st_size > state['pos']:
+            f.seek(state['pos'])
+            _read_entries(f, state)
+    
+    return state
+
+def record_writes(file_path, entries, size_before):
+    """
+    Record where a write put tickets' records: (ticket_id, offset) pairs, offset -1 for a deletion.
+    size_before is the CSV size before the write, used to check the index was current.
+    """
+    index_path = index_path_for(file_path)
+    end = os.path.getsize(file_path)
+    
+    with _lock:
+        state = _load_index(file_path)
+        is_current = state is not None and state['end'] == size_before
+    
+    # Without an index, or with one that missed earlier writes, rebuild instead
+    if not is_current:
+        rebuild_index(file_path)
+        return
+    
+    with open(index_path, 'a', encoding='utf-8') as f:
+        f.write(''.join(f"{ticket_id}\t{offset}\t{end}\n" for ticket_id, offset in entries))
+
+def _lookup(file_path, ticket_id):
+    with _lock:
+        state = _load_index(file_path)
+        is_current = state is not None and state['end'] == os.path.getsize(file_path)
+    
+    if not is_current:
+        # Rebuild on the writer thread so it can't interleave with a write
+        data_writer.run(file_path, rebuild_index, file_path)
+        with _lock:
+            state = _load_index(file_path)
+    
+    return state['entries'].get(ticket_id)
+
+def contains(file_path, ticket_id):
+    """
+    Whether a ticket ID is in use in a CSV file, answered from the in-memory index
+    """
+    if not os.path.exists(file_path):
+        return False
+    return _lookup(file_path, ticket_id) is not None
+
+def _read_record(file_path, offset):
+    """
+    Parse the header and the single record starting at a byte offset
+    """
+    with open(file_path, 'rb') as f:
+        header_line = f.readline()
+        header = next(csv.reader([header_line.decode('utf-8')]))
+        f.seek(offset)
+        record = io.TextIOWrapper(f, encoding='utf-8', newline='')
+        fields = next(csv.reader(record), [])
+        # What was read from the file, including read-ahead past the record
+        perf_metrics.add_bytes(read=len(header_line) + f.tell() - offset)
+    
+    return header, fields
+
+def find_ticket(file_path, ticket_id):
+    """
+    Read a single ticket record through the index, or None if it doesn't exist
+    """
+    if not os.path.exists(file_path):
+        return None
+    
+    offset = _lookup(file_path, ticket_id)
+    if offset is None:
+        return None
+    
+    header, fields = _read_record(file_path, offset)
+    
+    if not fields or fields[0] != ticket_id:
+        # The CSV was rewritten under the index, rebuild and retry once
+        data_writer.run(file_path, rebuild_index, file_path)
+        offset = _lookup(file_path, ticket_id)
+        if offset is None:
+            return None
+        header, fields = _read_record(file_path, offset)
+    
+    return dict(zip(header, fields))
@@ -0,0 +1,168 @@
+import csv
+import os
+import threading
+
+import pandas as pd
+
+import data_writer
+
+# Daily rollup of ticket counts for the Reports page.
+#
+# The rollup counts tickets by creation day x category x status x priority.
+# It is persisted next to the tickets file (tickets.rollup.csv) as a log of
+# "day,category,status,priority,delta,end" lines: the write functions append
+# +1/-1 deltas for the rows they add, change or remove, and "end" is the CSV
+# size after that write, which lets readers detect a stale rollup. The log is
+# compacted into one line per cell once it grows well past the number of cells.
+# The first line holds the generation of the file (see data_writer).
+
+ROLLUP_COLUMNS = ['created_at', 'category', 'status', 'priority']
+
+# Compact when the log has this many times more lines than there are cells
+COMPACT_RATIO = 4
+COMPACT_MIN_LINES = 1000
+
+# In-memory copies of loaded rollups, keyed by CSV path
+_rollups = {}
+_lock = threading.Lock()
+
+def rollup_path_for(file_path):
+    """
+    Path of the daily rollup for a tickets CSV file
+    """
+    return os.path.splitext(file_path)[0] + '.rollup.csv'
+
+def _cell(row):
+    """
+    Rollup cell of a ticket row: (day, category, status, priority)
+    """
+    def text(value):
+        # Empty cells are NaN (never equal to itself) or None
+        return '' if value is None or value != value else str(value)
+    
+    return (text(row.get('created_at'))[:10], text(row.get('category')), text(row.get('status')), text(row.get('priority')))
+
+def _write_cells(file_path, cells):
+    end = os.path.getsize(file_path) if os.path.exists(file_path) else 0
+    
+    rollup_path = rollup_path_for(file_path)
+    tmp_path = f"{rollup_path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', newline='', encoding='utf-8') as f:
+        f.write(data_writer.generation_line())
+        writer = csv.writer(f, lineterminator='\n')
+        for cell, count in cells.items():
+            if count:
+                writer.writerow(list(cell) + [count, end])
+        # Marker line so even an empty rollup records the CSV size it matches
+        writer.writerow(['', '', '', '', 0, end])
+    os.replace(tmp_path, rollup_path)
+    
+    with _lock:
+        _rollups.pop(os.path.abspath(file_path), None)
+
+def rebuild_rollup(file_path, tickets_df):
+    """
+    Recount the rollup from the full ticket table and persist it
+    """
+    cells = {}
+    for row in tickets_df[ROLLUP_COLUMNS].to_dict('records'):
+        cell = _cell(row)
+        cells[cell] = cells.get(cell, 0) + 1
+    _write_cells(file_path, cells)
+
+def _load(file_path):
+    """
+    In-memory rollup for a CSV file, reading only lines appended since the last load
+    """
+    key = os.path.abspath(file_path)
+    rollup_path = rollup_path_for(file_path)
+    
+    try:
+        f = open(rollup_path, 'rb')
+    except FileNotFoundError:
+        return None
+    
+    with f:
+        stat = os.fstat(f.fileno())
+        generation, header_bytes = data_writer.read_generation(f)
+        state = _rollups.get(key)
+        # A compacted (replaced) or recreated rollup has to be read again from the start
+        if (state is None or state['generation'] != generation or state['inode'] != stat.st_ino
+                or stat.st_size < state['pos']):
+            state = {'generation': generation, 'inode': stat.st_ino, 'pos': header_bytes, 'end': -1, 'lines': 0, 'cells': {}, 'frame': None}
+            _rollups[key] = state
+        
+        if stat.st_size > state['pos']:
+            f.seek(state['pos'])
+            data = f.read()
+            # Leave a partially written last line for the next load
+            data = data[:data.rfind(b'\n') + 1]
+            state['pos'] += len(data)
+            
+            for day, category, status, priority, delta, end in csv.reader(data.decode('utf-8').splitlines()):
+                cell = (day, category, status, priority)
+                if int(delta):
+                    state['cells'][cell] = state['cells'].get(cell, 0) + int(delta)
+                    if state['cells'][cell] == 0:
+                        del state['cells'][cell]
+                state['end'] = int(end)
+                state['lines'] += 1
+            state['frame'] = None
+    
+    return state
+
+def apply_changes(file_path, removed, added, size_before):
+    """
+    Append the deltas of removed and added rows (dicts with created_at, category, status
+    and priority). size_before is the CSV size before the write; a rollup that doesn't
+    match it is left for utils.get_daily_rollup to rebuild. Runs on the writer thread.
+    """
+    with _lock:
+        state = _load(file_path)
+        if state is None or state['end'] != size_before:
+            return
+    
+    deltas = {}
+    for rows, step in ((removed, -1), (added, 1)):
+        for row in rows:
+            cell = _cell(row)
+            deltas[cell] = deltas.get(cell, 0) + step
+    
+    # Changes that cancel out (e.g. a priority update) still record the new CSV size
+    deltas = {cell: delta for cell, delta in deltas.items() if delta} or {('', '', '', ''): 0}
+    
+    if state['lines'] + len(deltas) > max(COMPACT_MIN_LINES, COMPACT_RATIO * len(state['cells'])):
+        with _lock:
+            cells = dict(state['cells'])
+        for cell, delta in deltas.items():
+            cells[cell] = cells.get(cell, 0) + delta
+        _write_cells(file_path, cells)
+        return
+    
+    end = os.path.getsize(file_path)
+    with open(rollup_path_for(file_path), 'a', newline='', encoding='utf-8') as f:
+        if f.tell() == 0:
+            f.write(data_writer.generation_line())
+        writer = csv.writer(f, lineterminator='\n')
+        for cell, delta in deltas.items():
+            writer.writerow(list(cell) + [delta, end])
+
+def load_rollup(file_path):
+    """
+    Rollup as a DataFrame (date, category, status, priority, count), or None if it
+    is missing or out of date with the CSV file. The DataFrame is shared and must not be modified.
+    """
+    with _lock:
+        state = _load(file_path)
+        if state is None or state['end'] != os.path.getsize(file_path):
+            return None
+        
+        if state['frame'] is None:
+            rollup_df = pd.DataFrame(
+                [list(cell) + [count] for cell, count in state['cells'].items()],
+                columns=['date', 'category', 'status', 'priority', 'count']
+            )
+            rollup_df['date'] = pd.to_datetime(rollup_df['date'], errors='coerce')
+            state['frame'] = rollup_df.sort_values('date', kind='stable').reset_index(drop=True)
+        
+        return state['frame']
@@ -0,0 +1,77 @@
+import json
+import math
+
+import numpy as np
+import pandas as pd
+
+# Wire format between the ticket-store server and its clients.
+#
+# A request is one JSON document with a batch of calls, answered by one JSON
+# document with a result per call, in order:
+#
+#     POST /rpc  {"calls": [{"op": "get_ticket_stats", "args": ["data/tickets.csv"], "kwargs": {}}, ...]}
+#     200        {"results": [{"ok": true, "value": {...}}, {"ok": false, "error": "...", "type": "ValueError"}]}
+#
+# Arguments and results are plain JSON values, except DataFrames, which are
+# sent as {"__frame__": {"columns", "rows", "datetime_columns"}} so timestamp
+# columns come back as timestamps. Empty cells travel as null.
+
+# utils functions the server executes, all of them ticket storage operations on
+# a file_path. User accounts aren't among them: they would hand out password
+# hashes and admin rights, so each process keeps reading the admin file itself.
+OPERATIONS = [
+    'add_ticket', 'get_ticket_by_id', 'update_tickets', 'delete_tickets',
+    'get_all_tickets', 'search_tickets', 'get_ticket_stats', 'get_daily_rollup',
+    'get_change_version', 'get_changes_since',
+]
+
+def _frame_to_json(df):
+    datetime_columns = [column for column in df.columns if pd.api.types.is_datetime64_any_dtype(df[column])]
+    values = df.astype({column: str for column in datetime_columns}).astype(object)
+    values = values.where(df.notna(), None)
+    return {
+        'columns': list(df.columns),
+        'rows': values.values.tolist(),
+        'datetime_columns': datetime_columns,
+    }
+
+def _frame_from_json(frame):
+    df = pd.DataFrame(frame['rows'], columns=frame['columns'])
+    for column in frame['datetime_columns']:
+        df[column] = pd.to_datetime(df[column], errors='coerce')
+    return df
+
+def _default(value):
+    """
+    JSON encoding of the values json doesn't know
+    """
+    if isinstance(value, pd.DataFrame):
+        return {'__frame__': _frame_to_json(value)}
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (pd.Timestamp, np.datetime64)):
+        return str(value)
+    if isinstance(value, (set, tuple)):
+        return list(value)
+    raise TypeError(f"{type(value).__name__} can't be sent to the ticket store")
+
+def _clean(value):
+    # NaN isn't valid JSON; empty cells are sent as null
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if isinstance(value, dict):
+        return {key: _clean(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_clean(item) for item in value]
+    return value
+
+def encode(document):
+    return json.dumps(_clean(document), default=_default).encode('utf-8')
+
+def _decode_hook(obj):
+    if '__frame__' in obj and len(obj) == 1:
+        return _frame_from_json(obj['__frame__'])
+    return obj
+
+def decode(data):
+    return json.loads(data, object_hook=_decode_hook)
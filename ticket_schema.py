@@ -0,0 +1,72 @@
+from datetime import datetime
+
+import pandas as pd
+
+# The ticket table, defined once.
+#
+# Column order of the tickets CSV file, the values the forms offer and the
+# dtype every column is read with. Readers name the columns they need and the
+# CSV parser skips the others, most of all the long description and
+# resolution texts. IDs and texts are read as strings (so an all-digit ID
+# stays an ID), status, category and priority can be read as categoricals,
+# a few codes instead of a Python string per row, and the timestamps can be
+# parsed on request.
+
+TICKET_COLUMNS = [
+    'ticket_id', 'created_at', 'updated_at', 'name', 'email',
+    'subject', 'category', 'priority', 'status', 'description', 'resolution'
+]
+
+# Choices offered by the forms
+CATEGORIES = ["General Inquiry", "Technical Support", "Billing Issue", "Feature Request", "Bug Report", "Other"]
+PRIORITIES = ["Low", "Medium", "High", "Critical"]
+STATUSES = ["Open", "In Progress", "Resolved", "Closed"]
+
+CATEGORICAL_COLUMNS = ['status', 'category', 'priority']
+DATETIME_COLUMNS = ['created_at', 'updated_at']
+
+def new_ticket(name, email, subject, category, priority, description, timestamp=None):
+    """
+    Row of a newly submitted ticket; the storage layer assigns its ticket_id
+    """
+    timestamp = timestamp or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    return {
+        'created_at': timestamp,
+        'updated_at': timestamp,
+        'name': name,
+        'email': email,
+        'subject': subject,
+        'category': category,
+        'priority': priority,
+        'status': "Open",
+        'description': description,
+        'resolution': ""
+    }
+
+def read_dtypes(columns, categorical=False):
+    """
+    dtype argument of pd.read_csv for some ticket columns
+    """
+    return {
+        column: 'category' if categorical and column in CATEGORICAL_COLUMNS else str
+        for column in columns
+    }
+
+def read_tickets(file_path, columns=None, categorical=False, parse_dates=False, **kwargs):
+    """
+    Parse a tickets CSV file, reading only the given columns (default all), with
+    categorical status/category/priority and parsed timestamps if asked for.
+    Other keyword arguments are passed to pd.read_csv.
+    """
+    if columns is None:
+        # Without usecols a file with other columns is still read
+        tickets_df = pd.read_csv(file_path, dtype=read_dtypes(TICKET_COLUMNS, categorical), **kwargs)
+    else:
+        columns = list(columns)
+        tickets_df = pd.read_csv(file_path, usecols=columns, dtype=read_dtypes(columns, categorical), **kwargs)[columns]
+    
+    if parse_dates:
+        for column in DATETIME_COLUMNS:
+            if column in tickets_df.columns:
+                tickets_df[column] = pd.to_datetime(tickets_df[column], errors='coerce')
+    return tickets_df
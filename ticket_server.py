@@ -0,0 +1,245 @@
+import argparse
+import hmac
+import inspect
+import os
+import secrets
+import socketserver
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import ticket_rpc
+import utils
+
+# Local ticket-store service.
+#
+# One process owns the data files, their sidecars and the in-memory caches;
+# any number of Streamlit server processes run with TICKET_STORAGE=remote and
+# send it their storage calls (see ticket_client.py). Since every write goes
+# through this process, its writer thread is the single writer for all of
+# them, and each table is parsed once instead of once per UI process.
+#
+# It listens on a Unix socket in its data directory (ticket-store.sock), or on
+# HTTP with --port, and only serves the tickets files it was started with
+# (tickets.csv in that directory by default). Every other path, including the
+# admin file, the token and the sidecars next to a tickets file, is refused:
+#
+#     python ticket_server.py
+#     python ticket_server.py --port 8765 --tickets tickets.csv --tickets helpdesk.csv
+#
+# Every request has to carry the shared secret as "Authorization: Bearer
+# <token>" and a JSON body; a browser page can't send either across sites.
+# The token is TICKET_SERVER_TOKEN, or else a random one the server writes
+# to ticket-store.token in the data directory, readable only by its user,
+# where clients started from the app folder find it. User accounts (password
+# hashes) aren't served at all; see ticket_rpc.OPERATIONS.
+
+DEFAULT_PORT = 8765
+SOCKET_NAME = 'ticket-store.sock'
+TOKEN_NAME = 'ticket-store.token'
+DEFAULT_TICKETS = 'tickets.csv'
+
+_stats = {'requests': 0, 'calls': 0, 'errors': 0}
+_stats_lock = threading.Lock()
+_settings = {
+    'data_dir': os.path.realpath('data'),
+    'tickets_files': {os.path.realpath(os.path.join('data', DEFAULT_TICKETS))},
+    'token': None,
+}
+
+def _check_path(op, args, kwargs):
+    """
+    Reject calls on any file but the tickets files being served
+    """
+    func = getattr(utils, op)
+    arguments = inspect.signature(func).bind(*args, **kwargs).arguments
+    file_path = arguments.get('file_path')
+    if not isinstance(file_path, str):
+        raise PermissionError(f"{op} needs a data file path")
+    
+    # Resolved, so a symlink or '..' can't name another file
+    if os.path.realpath(file_path) not in _settings['tickets_files']:
+        raise PermissionError(f"{file_path} is not a tickets file served here")
+
+def set_tickets_files(data_dir, names):
+    """
+    Serve the tickets files of these names in data_dir, and only them. Names of
+    the files the server keeps for itself are refused.
+    """
+    reserved = {os.path.basename(utils.ADMIN_FILE), SOCKET_NAME, TOKEN_NAME}
+    tickets_files = set()
+    for name in names:
+        if os.path.basename(name) != name or name in reserved or not name.endswith('.csv'):
+            raise ValueError(f"{name} can't be served as a tickets file")
+        tickets_files.add(os.path.realpath(os.path.join(data_dir, name)))
+    _settings['data_dir'] = os.path.realpath(data_dir)
+    _settings['tickets_files'] = tickets_files
+
+def execute(calls):
+    """
+    Run a batch of calls in order, returning one result per call. A failed
+    call doesn't stop the ones after it.
+    """
+    results = []
+    for call in calls:
+        op = call.get('op')
+        args = call.get('args') or []
+        kwargs = call.get('kwargs') or {}
+        try:
+            if op not in ticket_rpc.OPERATIONS:
+                raise ValueError(f"Unknown operation: {op}")
+            _check_path(op, args, kwargs)
+            results.append({'ok': True, 'value': getattr(utils, op)(*args, **kwargs)})
+        except Exception as e:
+            with _stats_lock:
+                _stats['errors'] += 1
+            results.append({'ok': False, 'error': str(e), 'type': type(e).__name__})
+    
+    with _stats_lock:
+        _stats['requests'] += 1
+        _stats['calls'] += len(calls)
+    return results
+
+def get_server_stats():
+    with _stats_lock:
+        return dict(_stats)
+
+def load_token(data_dir):
+    """
+    The shared secret: TICKET_SERVER_TOKEN, or the token file in the data
+    directory, created with a new random token if it doesn't exist
+    """
+    token = os.environ.get('TICKET_SERVER_TOKEN', '').strip()
+    if token:
+        return token
+    
+    token_path = os.path.join(data_dir, TOKEN_NAME)
+    if not os.path.exists(token_path):
+        # Created readable and writable by this user only
+        fd = os.open(token_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(secrets.token_urlsafe(32))
+    with open(token_path, encoding='utf-8') as f:
+        return f.read().strip()
+
+class RequestHandler(BaseHTTPRequestHandler):
+    # Keep-alive, so clients reuse their pooled connections. Headers and body
+    # are separate writes, which Nagle's algorithm would hold back for an ACK.
+    protocol_version = 'HTTP/1.1'
+    disable_nagle_algorithm = True
+    
+    def _reply(self, status, document):
+        body = ticket_rpc.encode(document)
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def _authorized(self):
+        """
+        Whether the request carries the shared secret, answering 401 if it doesn't
+        """
+        expected = f"Bearer {_settings['token']}"
+        if _settings['token'] and hmac.compare_digest(self.headers.get('Authorization', ''), expected):
+            return True
+        self._reply(401, {'error': 'Missing or wrong token'})
+        return False
+    
+    def do_GET(self):
+        if not self._authorized():
+            return
+        if self.path != '/health':
+            self._reply(404, {'error': 'Not found'})
+            return
+        self._reply(200, {'status': 'ok', 'stats': get_server_stats(), 'cache': utils.get_cache_stats()})
+    
+    def do_POST(self):
+        if not self._authorized():
+            return
+        if self.path != '/rpc':
+            self._reply(404, {'error': 'Not found'})
+            return
+        # Only JSON, which a cross-site form or simple fetch can't send
+        if self.headers.get_content_type() != 'application/json':
+            self._reply(415, {'error': 'Requests must be application/json'})
+            return
+        
+        try:
+            request = ticket_rpc.decode(self.rfile.read(int(self.headers.get('Content-Length', 0))))
+            calls = request['calls']
+        except (ValueError, KeyError, TypeError) as e:
+            self._reply(400, {'error': f"Malformed request: {e}"})
+            return
+        
+        self._reply(200, {'results': execute(calls)})
+    
+    def address_string(self):
+        # Unix socket peers have no address
+        return self.client_address[0] if self.client_address else 'unix'
+    
+    def log_message(self, format, *args):
+        # Every call is timed by perf_metrics; access lines only with --verbose
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+class UnixRequestHandler(RequestHandler):
+    # Not a TCP socket
+    disable_nagle_algorithm = False
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+    
+    def server_bind(self):
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+        super().server_bind()
+        # Only processes of the same user can connect
+        os.chmod(self.server_address, 0o600)
+
+def make_server(host='127.0.0.1', port=DEFAULT_PORT, unix_path=None, verbose=False, token=None):
+    """
+    HTTP server for the ticket store, on a Unix socket if unix_path is given
+    """
+    if unix_path:
+        server = UnixHTTPServer(unix_path, UnixRequestHandler)
+    else:
+        server = ThreadingHTTPServer((host, port), RequestHandler)
+    server.verbose = verbose
+    if token is not None:
+        _settings['token'] = token
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description="Ticket-store service for Streamlit processes running with TICKET_STORAGE=remote")
+    parser.add_argument('--unix', help=f"listen on this Unix socket (default: {SOCKET_NAME} in the data directory)")
+    parser.add_argument('--port', type=int, help=f"listen on HTTP on this port instead, e.g. {DEFAULT_PORT}")
+    parser.add_argument('--host', default='127.0.0.1', help="HTTP address to listen on, with --port")
+    parser.add_argument('--data-dir', default='data', help="directory of the data files served")
+    parser.add_argument('--tickets', action='append', metavar='NAME',
+                        help=f"tickets CSV file in the data directory to serve, can be repeated (default: {DEFAULT_TICKETS})")
+    parser.add_argument('--storage', choices=['csv', 'sqlite'], default='csv', help="backend the server stores data with")
+    parser.add_argument('--verbose', action='store_true', help="log every request")
+    args = parser.parse_args()
+    
+    # The server itself works on the files; clients reach it through the remote backend
+    os.environ['TICKET_STORAGE'] = args.storage
+    try:
+        set_tickets_files(args.data_dir, args.tickets or [DEFAULT_TICKETS])
+    except ValueError as e:
+        parser.error(str(e))
+    os.makedirs(_settings['data_dir'], exist_ok=True)
+    utils.ADMIN_FILE = os.path.join(_settings['data_dir'], 'admin.csv')
+    _settings['token'] = load_token(_settings['data_dir'])
+    
+    unix_path = None if args.port else (args.unix or os.path.join(_settings['data_dir'], SOCKET_NAME))
+    server = make_server(args.host, args.port, unix_path, args.verbose)
+    print(f"Ticket store serving {_settings['data_dir']} on {unix_path or f'http://{args.host}:{args.port}'}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,83 @@
+import json
+import os
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+import ticket_schema
+
+# Typed columnar snapshot of the tickets table for the Reports page.
+#
+# The snapshot (tickets.feather next to tickets.csv) holds the table with
+# parsed timestamps and categorical status/category/priority, sorted by
+# created_at so date ranges are contiguous slices. It is tagged with the data
+# version of the CSV it was made from and only regenerated when that changes.
+# Feather files are read through a memory map, and the text columns stay Arrow
+# strings in the mapped file (pandas "string[pyarrow]") instead of being copied
+# into Python objects, so a loaded table keeps only its timestamps and category
+# codes in process memory.
+
+DATETIME_COLUMNS = ticket_schema.DATETIME_COLUMNS
+CATEGORICAL_COLUMNS = ticket_schema.CATEGORICAL_COLUMNS
+
+_VERSION_KEY = b'ticket_data_version'
+
+def snapshot_path_for(file_path):
+    """
+    Path of the columnar snapshot for a tickets CSV file
+    """
+    return os.path.splitext(file_path)[0] + '.feather'
+
+def to_report_table(tickets_df):
+    """
+    Typed copy of a ticket table, sorted by creation time
+    """
+    typed_df = tickets_df.copy()
+    for column in DATETIME_COLUMNS:
+        typed_df[column] = pd.to_datetime(typed_df[column], errors='coerce')
+    for column in CATEGORICAL_COLUMNS:
+        typed_df[column] = typed_df[column].astype('category')
+    return typed_df.sort_values('created_at', kind='stable').reset_index(drop=True)
+
+def _mapped_dtype(arrow_type):
+    """
+    pandas dtype for an Arrow column of the snapshot: text stays in the Arrow buffers
+    """
+    if pa.types.is_string(arrow_type) or pa.types.is_large_string(arrow_type):
+        return pd.ArrowDtype(arrow_type)
+    return None
+
+def load_snapshot(file_path, version):
+    """
+    Snapshot table if it exists and was made from this data version, otherwise None.
+    Its text columns are backed by the memory-mapped file.
+    """
+    snapshot_path = snapshot_path_for(file_path)
+    if not os.path.exists(snapshot_path):
+        return None
+    
+    try:
+        with pa.memory_map(snapshot_path) as source:
+            reader = pa.ipc.open_file(source)
+            metadata = reader.schema.metadata or {}
+            if json.loads(metadata.get(_VERSION_KEY, b'null')) != list(version):
+                return None
+            return reader.read_all().to_pandas(split_blocks=True, types_mapper=_mapped_dtype)
+    except (pa.ArrowInvalid, OSError, ValueError):
+        return None  # Unreadable (e.g. half-written by an old version), regenerate
+
+def write_snapshot(file_path, report_df, version):
+    """
+    Persist a typed table as the snapshot for a data version
+    """
+    table = pa.Table.from_pandas(report_df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[_VERSION_KEY] = json.dumps(list(version)).encode()
+    table = table.replace_schema_metadata(metadata)
+    
+    # Uncompressed so the file can be used straight from the memory map
+    snapshot_path = snapshot_path_for(file_path)
+    tmp_path = f"{snapshot_path}.{os.getpid()}.tmp"
+    feather.write_feather(table, tmp_path, compression='uncompressed')
+    os.replace(tmp_path, snapshot_path)
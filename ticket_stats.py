@@ -0,0 +1,121 @@
+import json
+import os
+
+# Dashboard counters for a tickets CSV file, persisted next to it (tickets.stats.json).
+#
+# The aggregate holds the total and per-status, per-category and per-priority
+# counts. Write functions adjust it by the rows they add or remove instead of
+# recounting the file. Like the sidecar index, it records the CSV size it is
+# valid for, so a file changed behind its back is detected and recounted.
+
+COUNTED_COLUMNS = {'status': 'by_status', 'category': 'by_category', 'priority': 'by_priority'}
+
+def stats_path_for(file_path):
+    """
+    Path of the persisted stats aggregate for a tickets CSV file
+    """
+    return os.path.splitext(file_path)[0] + '.stats.json'
+
+def _save(file_path, counts):
+    counts['end'] = os.path.getsize(file_path) if os.path.exists(file_path) else 0
+    
+    stats_path = stats_path_for(file_path)
+    tmp_path = stats_path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(counts, f)
+    os.replace(tmp_path, stats_path)
+
+def _is_counted(value):
+    # Empty cells are NaN (never equal to itself) or blank and are not counted
+    return value is not None and value == value and value != ''
+
+def compute_counts(tickets_df):
+    """
+    Count tickets from a full table
+    """
+    counts = {'total': len(tickets_df)}
+    for column, key in COUNTED_COLUMNS.items():
+        counts[key] = {str(value): int(count) for value, count in tickets_df[column].value_counts().items()}
+    return counts
+
+def rebuild_stats(file_path, tickets_df):
+    """
+    Recount the aggregate from the full table and persist it
+    """
+    counts = compute_counts(tickets_df)
+    _save(file_path, counts)
+    return counts
+
+def load_stats(file_path):
+    """
+    Persisted aggregate, or None if missing or out of date with the CSV file
+    """
+    try:
+        with open(stats_path_for(file_path), encoding='utf-8') as f:
+            counts = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    
+    if counts.get('end') != os.path.getsize(file_path):
+        return None
+    
+    return counts
+
+def apply_changes(file_path, removed, added, size_before):
+    """
+    Adjust the aggregate by removed and added rows (dicts with status, category and priority).
+    size_before is the CSV size before the write; an aggregate that doesn't match it is left
+    for get_ticket_stats to rebuild.
+    """
+    try:
+        with open(stats_path_for(file_path), encoding='utf-8') as f:
+            counts = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return
+    
+    if counts.get('end') != size_before:
+        return
+    
+    counts['total'] += len(added) - len(removed)
+    for rows, step in ((removed, -1), (added, 1)):
+        for row in rows:
+            for column, key in COUNTED_COLUMNS.items():
+                value = row.get(column)
+                if not _is_counted(value):
+                    continue
+                value = str(value)
+                counts[key][value] = counts[key].get(value, 0) + step
+                if counts[key][value] <= 0:
+                    del counts[key][value]
+    
+    _save(file_path, counts)
+
+def summarize(counts):
+    """
+    Dashboard stats in the format returned by utils.get_ticket_stats
+    """
+    def by_count(values):
+        return dict(sorted(values.items(), key=lambda item: item[1], reverse=True))
+    
+    by_status = counts['by_status']
+    
+    return {
+        'total': counts['total'],
+        'open': by_status.get('Open', 0),
+        'in_progress': by_status.get('In Progress', 0),
+        'resolved': by_status.get('Resolved', 0),
+        'closed': by_status.get('Closed', 0),
+        'by_category': by_count(counts['by_category']),
+        'by_priority': by_count(counts['by_priority'])
+    }
+
+def verify_stats(file_path, tickets_df):
+    """
+    Check the persisted aggregate against a full recount
+    """
+    counts = load_stats(file_path)
+    if counts is None:
+        return False
+    
+    expected = compute_counts(tickets_df)
+    return all(counts[key] == expected[key] for key in expected)
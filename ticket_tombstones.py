@@ -0,0 +1,115 @@
+import os
+import threading
+
+import data_writer
+import perf_metrics
+
+# Tombstones for deleted tickets.
+#
+# Deleting a ticket doesn't rewrite tickets.csv: the ID is appended to the
+# tombstone file (tickets.deleted next to tickets.csv) together with the
+# size of its record, and readers leave tombstoned rows out. Once the
+# deleted records make up COMPACT_RATIO of the file (and at least
+# COMPACT_MIN_BYTES), utils.compact_tickets rewrites the file without them
+# and removes the tombstones. Any other full rewrite (an update) drops the
+# deleted rows as well and clears the tombstones with it.
+
+COMPACT_RATIO = float(os.environ.get('TICKET_COMPACT_RATIO', '0.2'))
+COMPACT_MIN_BYTES = 64 * 1024
+
+# In-memory copies of loaded tombstone files, keyed by CSV path
+_tombstones = {}
+_lock = threading.Lock()
+
+def tombstones_path_for(file_path):
+    """
+    Path of the tombstone file for a tickets CSV file
+    """
+    return os.path.splitext(file_path)[0] + '.deleted'
+
+def _load(file_path):
+    """
+    {ticket_id: record bytes} of the deleted tickets, reading only lines appended since the last load
+    """
+    key = os.path.abspath(file_path)
+    tombstones_path = tombstones_path_for(file_path)
+    
+    try:
+        f = open(tombstones_path, 'rb')
+    except FileNotFoundError:
+        _tombstones.pop(key, None)
+        return {}
+    
+    with f:
+        stat = os.fstat(f.fileno())
+        generation, header_bytes = data_writer.read_generation(f)
+        state = _tombstones.get(key)
+        # A cleared and recreated file has to be read again from the start
+        if (state is None or state['generation'] != generation or state['inode'] != stat.st_ino
+                or stat.st_size < state['pos']):
+            state = {'generation': generation, 'inode': stat.st_ino, 'pos': header_bytes, 'deleted': {}}
+            _tombstones[key] = state
+        
+        if stat.st_size > state['pos']:
+            f.seek(state['pos'])
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # Partially written line, read it next time
+                state['pos'] += len(line)
+                ticket_id, size = line.decode('utf-8').rstrip('\n').split('\t')
+                state['deleted'][ticket_id] = int(size)
+    
+    return state['deleted']
+
+def get_deleted_ids(file_path):
+    """
+    Set of the tombstoned ticket IDs
+    """
+    with _lock:
+        return set(_load(file_path))
+
+def contains(file_path, ticket_id):
+    with _lock:
+        return str(ticket_id) in _load(file_path)
+
+def add(file_path, entries):
+    """
+    Tombstone deleted tickets: (ticket_id, record bytes) pairs. Runs on the writer thread.
+    """
+    data = ''.join(f"{ticket_id}\t{size}\n" for ticket_id, size in entries)
+    with open(tombstones_path_for(file_path), 'a', encoding='utf-8') as f:
+        if f.tell() == 0:
+            data = data_writer.generation_line() + data
+        f.write(data)
+    perf_metrics.add_bytes(written=len(data.encode('utf-8')))
+
+def clear(file_path):
+    """
+    Remove the tombstones after the tickets file was rewritten without the deleted rows
+    """
+    with _lock:
+        try:
+            os.remove(tombstones_path_for(file_path))
+        except FileNotFoundError:
+            pass
+        _tombstones.pop(os.path.abspath(file_path), None)
+
+def get_stats(file_path):
+    """
+    Number of tombstones, bytes of deleted records a compaction would reclaim,
+    size of the tickets file and the reclaimable share of it
+    """
+    with _lock:
+        deleted = _load(file_path)
+        reclaimable = sum(deleted.values())
+    file_bytes = os.path.getsize(file_path) if os.path.exists(file_path) else 0
+    return {
+        'tombstones': len(deleted),
+        'reclaimable_bytes': reclaimable,
+        'file_bytes': file_bytes,
+        'reclaimable_ratio': reclaimable / file_bytes if file_bytes else 0.0,
+    }
+
+def needs_compaction(file_path):
+    stats = get_stats(file_path)
+    return stats['reclaimable_bytes'] >= COMPACT_MIN_BYTES and stats['reclaimable_ratio'] >= COMPACT_RATIO
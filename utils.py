@@ -1,103 +1,751 @@
 import pandas as pd
 import re
+import csv
+import io
 import hashlib
+import hmac
+import heapq
+import functools
+import inspect
+import threading
 import os
 from datetime import datetime
 
-def add_ticket(ticket_data, file_path):
+import data_writer
+import perf_metrics
+import search_index
+import ticket_archive
+import ticket_changes
+import ticket_events
+import ticket_ids
+import ticket_index
+import ticket_rollup
+import ticket_rpc
+import ticket_schema
+import ticket_stats
+import ticket_tombstones
+
+# Column order of the tickets CSV file, defined in ticket_schema
+TICKET_COLUMNS = ticket_schema.TICKET_COLUMNS
+
+ADMIN_FILE = 'data/admin.csv'
+
+def get_storage_backend():
     """
-    Add a new ticket to the CSV file
+    Name of the configured storage backend: "csv" (default), "sqlite", or "remote"
+    for the ticket-store service (ticket_server.py)
     """
-    # Read existing file
-    if os.path.exists(file_path):
-        tickets_df = pd.read_csv(file_path)
-    else:
-        # Create a new DataFrame with appropriate columns if file doesn't exist
-        tickets_df = pd.DataFrame(columns=[
-            'ticket_id', 'created_at', 'updated_at', 'name', 'email', 
-            'subject', 'category', 'priority', 'status', 'description', 'resolution'
-        ])
+    return os.environ.get('TICKET_STORAGE', 'csv').strip().lower()
+
+def _pluggable(func):
+    """
+    Route a storage function to the configured backend module.
+    The CSV implementation is the function body itself. The ticket-store
+    service only runs ticket_rpc.OPERATIONS; with the remote backend the user
+    functions read and write the local admin file.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        backend = get_storage_backend()
+        if backend == 'sqlite':
+            import sqlite_store
+            return getattr(sqlite_store, func.__name__)(*args, **kwargs)
+        if backend == 'remote' and func.__name__ in ticket_rpc.OPERATIONS:
+            import ticket_client
+            return getattr(ticket_client, func.__name__)(*args, **kwargs)
+        return func(*args, **kwargs)
+    return wrapper
+
+def _result_rows(result):
+    """
+    Rows touched according to a storage function's result, if it tells
+    """
+    if isinstance(result, pd.DataFrame):
+        return len(result)
+    if isinstance(result, int) and not isinstance(result, bool):
+        return result
+    if isinstance(result, dict) and 'ticket_id' in result:
+        return 1
+    return None
+
+def _instrumented(func):
+    """
+    Record wall time, rows and bytes of every call as the "storage.<name>" metric
+    """
+    name = f"storage.{func.__name__}"
     
-    # Append new ticket
-    new_ticket_df = pd.DataFrame([ticket_data])
-    tickets_df = pd.concat([tickets_df, new_ticket_df], ignore_index=True)
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        with perf_metrics.measure(name) as measurement:
+            result = func(*args, **kwargs)
+            measurement['rows'] = _result_rows(result)
+            return result
+    return wrapper
+
+def _serialized(func):
+    """
+    Run a CSV write on the single writer thread, holding the lock of the file it
+    changes (its file_path argument, or the admin file for the user functions)
+    """
+    signature = inspect.signature(func)
     
-    # Save to CSV
-    tickets_df.to_csv(file_path, index=False)
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        file_path = signature.bind(*args, **kwargs).arguments.get('file_path', ADMIN_FILE)
+        return data_writer.run(file_path, func, *args, **kwargs)
+    return wrapper
 
-def get_ticket_by_id(ticket_id, file_path):
+# Static files read by the pages, keyed by path: (mtime, contents)
+_static_files = {}
+# Tickets files already checked or created by ensure_tickets_file in this process
+_initialized_files = set()
+
+def read_static_file(path):
     """
-    Retrieve a ticket by its ID
+    Contents of a static text file such as the app stylesheet, read again only when it changes
     """
+    mtime = os.stat(path).st_mtime_ns
+    entry = _static_files.get(path)
+    if entry is None or entry[0] != mtime:
+        with open(path, encoding='utf-8') as f:
+            entry = _static_files[path] = (mtime, f.read())
+    return entry[1]
+
+def _create_tickets_file(file_path):
     if not os.path.exists(file_path):
-        return None
+        data_writer.replace_file(file_path, lambda f: f.write(_encode_csv_row(TICKET_COLUMNS).decode('utf-8')))
+
+def ensure_tickets_file(file_path):
+    """
+    Create the data directory and an empty tickets file if needed, once per process
+    """
+    key = os.path.abspath(file_path)
+    if key in _initialized_files:
+        return
+    
+    os.makedirs(os.path.dirname(file_path) or '.', exist_ok=True)
+    if not os.path.exists(file_path):
+        data_writer.run(file_path, _create_tickets_file, file_path)
+    _initialized_files.add(key)
+
+# Process-wide cache of parsed ticket tables, shared by every session in the server.
+# Entries are keyed on the file's data version so a parse only happens after a change.
+_ticket_cache = {}
+_ticket_cache_lock = threading.Lock()
+_ticket_cache_stats = {'hits': 0, 'misses': 0}
+# Counters bumped by the write functions in this process
+_write_versions = {}
+
+def get_data_version(file_path):
+    """
+    Version of a tickets file and its tombstones: (mtime, size, local write counter).
+    With the SQLite backend the database and its write-ahead log are checked instead.
+    """
+    key = os.path.abspath(file_path)
+    if get_storage_backend() == 'sqlite':
+        import sqlite_store
+        db_path = sqlite_store.db_path_for(file_path)
+        paths = [db_path, db_path + '-wal']
+    else:
+        paths = [file_path, ticket_tombstones.tombstones_path_for(file_path)]
     
-    tickets_df = pd.read_csv(file_path)
-    ticket = tickets_df[tickets_df['ticket_id'] == ticket_id]
+    mtime, size = 0, 0
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        mtime = max(mtime, stat.st_mtime_ns)
+        size += stat.st_size
+    return (mtime, size, _write_versions.get(key, 0))
+
+def invalidate_ticket_cache(file_path):
+    """
+    Drop the cached table for a file after it has been written locally
+    """
+    key = os.path.abspath(file_path)
+    with _ticket_cache_lock:
+        _write_versions[key] = _write_versions.get(key, 0) + 1
+        _ticket_cache.pop(key, None)
+
+def _set_cached_tickets(file_path, tickets_df):
+    """
+    Cache the table a local write left the file with, instead of parsing it again
+    """
+    key = os.path.abspath(file_path)
+    with _ticket_cache_lock:
+        _write_versions[key] = _write_versions.get(key, 0) + 1
+        _ticket_cache[key] = (get_data_version(file_path), tickets_df)
+
+def _without_deleted(file_path, tickets_df):
+    """
+    Leave out the rows of tombstoned tickets, which stay in the file until it is compacted
+    """
+    deleted_ids = ticket_tombstones.get_deleted_ids(file_path)
+    if not deleted_ids:
+        return tickets_df
+    return tickets_df[~tickets_df['ticket_id'].isin(deleted_ids)].reset_index(drop=True)
+
+def get_cache_stats():
+    """
+    Hit/miss counters of the ticket table cache
+    """
+    with _ticket_cache_lock:
+        return dict(_ticket_cache_stats, entries=len(_ticket_cache))
+
+def _load_tickets(file_path):
+    """
+    Parsed ticket table from the cache, re-reading the CSV only when its version changed.
+    The returned DataFrame is shared and must not be modified.
+    """
+    return _load_tickets_versioned(file_path)[1]
+
+def _load_tickets_versioned(file_path):
+    """
+    (data version, parsed ticket table) as cached together, for callers that tag
+    something derived from the table with its version (the search index)
+    """
+    key = os.path.abspath(file_path)
     
-    if len(ticket) == 0:
-        return None
+    with _ticket_cache_lock:
+        version = get_data_version(file_path)
+        entry = _ticket_cache.get(key)
+        if entry is not None and entry[0] == version:
+            _ticket_cache_stats['hits'] += 1
+            return entry
+        
+        # Parse while holding the lock so concurrent sessions share one parse
+        _ticket_cache_stats['misses'] += 1
+        with perf_metrics.measure('csv.parse') as measurement:
+            tickets_df = _without_deleted(file_path, ticket_schema.read_tickets(file_path))
+            measurement['rows'] = len(tickets_df)
+            perf_metrics.add_bytes(read=version[1])
+        _ticket_cache[key] = (version, tickets_df)
+        return version, tickets_df
+
+def _load_columns(file_path, columns):
+    """
+    Some columns of the ticket table: a projection of the cached table if it is
+    current, otherwise only these columns are parsed, with categorical
+    status/category/priority. The result isn't cached and must not be modified.
+    """
+    key = os.path.abspath(file_path)
+    with _ticket_cache_lock:
+        version = get_data_version(file_path)
+        entry = _ticket_cache.get(key)
+        if entry is not None and entry[0] == version:
+            _ticket_cache_stats['hits'] += 1
+            return entry[1][list(columns)]
     
-    return ticket.iloc[0].to_dict()
+    with perf_metrics.measure('csv.parse_columns') as measurement:
+        # The ID column is read as well while there are deleted rows to leave out
+        read_columns = list(columns)
+        if ticket_tombstones.get_deleted_ids(file_path) and 'ticket_id' not in read_columns:
+            read_columns = ['ticket_id'] + read_columns
+        tickets_df = _without_deleted(file_path, ticket_schema.read_tickets(file_path, read_columns, categorical=True))
+        tickets_df = tickets_df[list(columns)]
+        measurement['rows'] = len(tickets_df)
+        perf_metrics.add_bytes(read=version[1])
+    return tickets_df
 
-def update_ticket(ticket_id, updated_data, file_path):
+def _encode_csv_row(values):
+    """
+    Encode one CSV record as UTF-8 bytes, quoted the same way pandas writes it
+    """
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator='\n').writerow(values)
+    return buffer.getvalue().encode('utf-8')
+
+@_instrumented
+@_pluggable
+def add_ticket(ticket_data, file_path):
+    """
+    Add a new ticket to the CSV file. A ticket without a ticket_id gets a new
+    unique one, which is set in ticket_data and returned.
+    """
+    # Submissions queued at the same time are written by one append
+    data_writer.append(file_path, _append_tickets, ticket_data)
+    return ticket_data['ticket_id']
+
+def _append_tickets(file_path, tickets):
+    """
+    Append ticket rows to the CSV file in a single write (runs on the writer thread)
+    """
+    version_before = get_data_version(file_path)
+    
+    # Allocated under the file lock, so no other process can take the same ID before it is written
+    batch_ids = set()
+    for ticket_data in tickets:
+        if not ticket_data.get('ticket_id'):
+            ticket_data['ticket_id'] = ticket_ids.allocate(
+                lambda ticket_id: ticket_id in batch_ids
+                or ticket_index.contains(file_path, ticket_id)
+                or ticket_tombstones.contains(file_path, ticket_id)
+                or ticket_archive.is_archived(file_path, ticket_id)
+            )
+        batch_ids.add(ticket_data['ticket_id'])
+    
+    # A deleted ticket's ID can only be given again once its old record is gone
+    if any(ticket_tombstones.contains(file_path, ticket_id) for ticket_id in batch_ids):
+        compact_tickets(file_path)
+        version_before = get_data_version(file_path)
+    
+    # Only a new (or empty) file needs the header row
+    size_before = os.path.getsize(file_path) if os.path.exists(file_path) else 0
+    data = _encode_csv_row(TICKET_COLUMNS) if size_before == 0 else b''
+    
+    # Encode the tickets in the same column order as the file, noting each record's offset
+    entries = []
+    for ticket_data in tickets:
+        row = ['' if ticket_data.get(col) is None else ticket_data.get(col) for col in TICKET_COLUMNS]
+        entries.append((ticket_data['ticket_id'], size_before + len(data)))
+        data += _encode_csv_row(row)
+    
+    # Append the new rows instead of rewriting the whole file
+    with open(file_path, 'ab') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    perf_metrics.add_bytes(written=len(data))
+    
+    ticket_index.record_writes(file_path, entries, size_before)
+    ticket_stats.apply_changes(file_path, [], tickets, size_before)
+    ticket_rollup.apply_changes(file_path, [], tickets, size_before)
+    ticket_changes.record_changes(file_path, [ticket_data['ticket_id'] for ticket_data in tickets], [])
+    invalidate_ticket_cache(file_path)
+    search_index.apply_write(os.path.abspath(file_path), version_before, get_data_version(file_path), [], tickets)
+
+@_instrumented
+@_pluggable
+def get_ticket_by_id(ticket_id, file_path):
+    """
+    Retrieve a ticket by its ID
+    """
+    # Read only the ticket's own record through the sidecar index
+    ticket = ticket_index.find_ticket(file_path, ticket_id)
+    if ticket is None:
+        # Finished tickets may have been moved to the archive
+        ticket = ticket_archive.find_ticket(file_path, ticket_id)
+    return ticket
+
+def update_ticket(ticket_id, updated_data, file_path, actor=None):
     """
     Update an existing ticket
     """
+    return update_tickets([ticket_id], updated_data, file_path, actor=actor) > 0
+
+@_instrumented
+@_pluggable
+@_serialized
+def update_tickets(ticket_ids, updated_data, file_path, actor=None):
+    """
+    Apply the same updates to several tickets in one pass and one write.
+    Status and priority changes are recorded in the event log under actor.
+    Returns the number of tickets updated.
+    """
     if not os.path.exists(file_path):
-        return False
+        return 0
     
-    tickets_df = pd.read_csv(file_path)
+    # Work on a copy, the cached table is shared
+    version_before = get_data_version(file_path)
+    tickets_df = _load_tickets(file_path).copy()
     
-    # Find ticket by ID
-    mask = tickets_df['ticket_id'] == ticket_id
+    # Find tickets by ID
+    mask = tickets_df['ticket_id'].isin(list(ticket_ids))
     if not mask.any():
-        return False
+        return 0
     
     # Update timestamp
-    updated_data['updated_at'] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    updated_data = dict(updated_data, updated_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    
+    # Keep the counted fields before the change for the stats aggregate and rollup
+    counted = ticket_rollup.ROLLUP_COLUMNS
+    old_rows = tickets_df.loc[mask, counted].to_dict('records')
+    tracked = ['ticket_id'] + ticket_events.TRACKED_FIELDS
+    old_tracked = tickets_df.loc[mask, tracked].to_dict('records')
     
     # Update fields
     for key, value in updated_data.items():
         if key in tickets_df.columns:
+            # Columns that were read as all-empty (float NaN) have to take text
+            if tickets_df[key].dtype != object:
+                tickets_df[key] = tickets_df[key].astype(object)
             tickets_df.loc[mask, key] = value
     
     # Save to CSV
-    tickets_df.to_csv(file_path, index=False)
-    return True
+    size_before = os.path.getsize(file_path)
+    data_writer.replace_file(file_path, lambda f: tickets_df.to_csv(f, index=False))
+    # The rewrite dropped the deleted rows along the way
+    ticket_tombstones.clear(file_path)
+    ticket_index.rebuild_index(file_path)
+    new_rows = tickets_df.loc[mask, counted].to_dict('records')
+    ticket_stats.apply_changes(file_path, old_rows, new_rows, size_before)
+    ticket_rollup.apply_changes(file_path, old_rows, new_rows, size_before)
+    ticket_events.append_events(file_path, ticket_events.diff_events(
+        old_tracked, tickets_df.loc[mask, tracked].to_dict('records'), updated_data['updated_at'], actor
+    ))
+    ticket_changes.record_changes(file_path, tickets_df.loc[mask, 'ticket_id'].tolist(), [])
+    invalidate_ticket_cache(file_path)
+    search_index.apply_write(
+        os.path.abspath(file_path), version_before, get_data_version(file_path),
+        tickets_df.loc[mask, 'ticket_id'].tolist(), tickets_df.loc[mask, search_index.INDEX_COLUMNS].to_dict('records')
+    )
+    return int(mask.sum())
 
 def delete_ticket(ticket_id, file_path):
     """
     Delete a ticket by ID
     """
+    return delete_tickets([ticket_id], file_path) > 0
+
+@_instrumented
+@_pluggable
+@_serialized
+def delete_tickets(ticket_ids, file_path):
+    """
+    Delete several tickets in one small write: their IDs are tombstoned and the
+    file is compacted in the background once enough of it is deleted records.
+    Returns the number of tickets deleted.
+    """
     if not os.path.exists(file_path):
-        return False
+        return 0
     
-    tickets_df = pd.read_csv(file_path)
+    version_before = get_data_version(file_path)
+    tickets_df = _load_tickets(file_path)
     
-    # Find and remove ticket
-    original_count = len(tickets_df)
-    tickets_df = tickets_df[tickets_df['ticket_id'] != ticket_id]
+    # Find and remove tickets
+    mask = tickets_df['ticket_id'].isin(list(ticket_ids))
+    if not mask.any():
+        return 0  # No ticket was removed
     
-    if len(tickets_df) == original_count:
-        return False  # No ticket was removed
+    removed_rows = tickets_df.loc[mask, ticket_rollup.ROLLUP_COLUMNS].to_dict('records')
+    removed_ids = tickets_df.loc[mask, 'ticket_id'].tolist()
+    # Size of each record as it was written, for the space a compaction would reclaim
+    removed_df = tickets_df.loc[mask, TICKET_COLUMNS]
+    records = removed_df.astype(object).where(removed_df.notna(), '').values.tolist()
     
-    # Save to CSV
-    tickets_df.to_csv(file_path, index=False)
-    return True
+    # The tickets file itself is left as it is
+    size = os.path.getsize(file_path)
+    ticket_tombstones.add(file_path, [(row[0], len(_encode_csv_row(row))) for row in records])
+    ticket_index.record_writes(file_path, [(ticket_id, -1) for ticket_id in removed_ids], size)
+    ticket_stats.apply_changes(file_path, removed_rows, [], size)
+    ticket_rollup.apply_changes(file_path, removed_rows, [], size)
+    ticket_changes.record_changes(file_path, [], removed_ids)
+    _set_cached_tickets(file_path, tickets_df[~mask].reset_index(drop=True))
+    search_index.apply_write(os.path.abspath(file_path), version_before, get_data_version(file_path), removed_ids, [])
+    
+    if ticket_tombstones.needs_compaction(file_path):
+        data_writer.submit(file_path, compact_tickets, file_path)
+    return len(removed_ids)
 
-def get_all_tickets(file_path):
+@_instrumented
+@_serialized
+def compact_tickets(file_path):
     """
-    Get all tickets as a DataFrame
+    Rewrite the tickets file without the records of deleted tickets and drop
+    their tombstones. Returns the number of records removed.
+    """
+    if get_storage_backend() != 'csv' or not os.path.exists(file_path):
+        return 0
+    deleted_ids = ticket_tombstones.get_deleted_ids(file_path)
+    if not deleted_ids:
+        return 0
+    
+    version_before = get_data_version(file_path)
+    tickets_df = _load_tickets(file_path)
+    
+    size_before = os.path.getsize(file_path)
+    data_writer.replace_file(file_path, lambda f: tickets_df.to_csv(f, index=False))
+    ticket_tombstones.clear(file_path)
+    ticket_index.rebuild_index(file_path)
+    # Counts don't change, only the recorded file size
+    ticket_stats.apply_changes(file_path, [], [], size_before)
+    ticket_rollup.apply_changes(file_path, [], [], size_before)
+    _set_cached_tickets(file_path, tickets_df)
+    search_index.apply_write(os.path.abspath(file_path), version_before, get_data_version(file_path), [], [])
+    return len(deleted_ids)
+
+def get_tombstone_stats(file_path):
+    """
+    Deleted tickets still stored in the tickets file and the space compacting it would
+    reclaim. Only the CSV backend keeps tombstones; the others report none.
+    """
+    if get_storage_backend() != 'csv':
+        return {'tombstones': 0, 'reclaimable_bytes': 0, 'file_bytes': 0, 'reclaimable_ratio': 0.0}
+    return ticket_tombstones.get_stats(file_path)
+
+# More changed tickets than this are answered with the whole table
+MAX_CHANGED_ROWS = 1000
+
+@_instrumented
+@_pluggable
+def get_change_version(file_path):
+    """
+    Change version of the tickets: a number that grows with every write
+    """
+    return ticket_changes.get_version(file_path)
+
+@_instrumented
+@_pluggable
+def get_changes_since(version, file_path):
+    """
+    What changed in the tickets after a change version, for callers that keep their
+    own copy of the table: {'version', 'reset', 'tickets', 'deleted'}. 'tickets' holds
+    the current rows of the added and updated tickets and 'deleted' the IDs removed.
+    With reset set (version None, or too many changes) 'tickets' is the whole table.
+    """
+    if not os.path.exists(file_path):
+        return {'version': 0, 'reset': True, 'tickets': pd.DataFrame(columns=TICKET_COLUMNS), 'deleted': []}
+    
+    current, updated_ids, deleted_ids = ticket_changes.changes_since(file_path, version)
+    if updated_ids is None or len(updated_ids) > MAX_CHANGED_ROWS:
+        # Read after the version, so the table is at least as new
+        return {'version': current, 'reset': True, 'tickets': _load_tickets(file_path).copy(), 'deleted': []}
+    
+    # Only the changed records are read, through the sidecar index
+    rows = []
+    for ticket_id in updated_ids:
+        ticket = ticket_index.find_ticket(file_path, ticket_id)
+        if ticket is None:
+            deleted_ids.append(ticket_id)  # Deleted after the version was taken
+        else:
+            rows.append(ticket)
+    
+    # Empty fields as read_csv reads them
+    tickets_df = pd.DataFrame(rows, columns=TICKET_COLUMNS).replace('', float('nan'))
+    return {'version': current, 'reset': False, 'tickets': tickets_df, 'deleted': deleted_ids}
+
+def _created_between(tickets_df, start, end):
+    """
+    Mask of tickets created on the days start..end (inclusive, either may be None)
+    """
+    days = tickets_df['created_at'].astype(str).str[:10]
+    mask = pd.Series(True, index=tickets_df.index)
+    if start is not None:
+        mask &= days >= pd.Timestamp(start).strftime('%Y-%m-%d')
+    if end is not None:
+        mask &= days <= pd.Timestamp(end).strftime('%Y-%m-%d')
+    return mask
+
+def _with_archive(tickets_df, archived_df):
+    """
+    Hot tickets followed by archived ones; a ticket present in both keeps its hot row
+    """
+    if archived_df is None or len(archived_df) == 0:
+        return tickets_df
+    archived_df = archived_df[~archived_df['ticket_id'].isin(tickets_df['ticket_id'])]
+    return pd.concat([tickets_df, archived_df], ignore_index=True)
+
+@_instrumented
+@_pluggable
+def get_all_tickets(file_path, start=None, end=None, include_archive=False):
+    """
+    Get all tickets as a DataFrame, optionally only those created on the days
+    start..end. Archived tickets are included on request; only the partitions
+    of the months in range are read.
     """
     if not os.path.exists(file_path):
         # Return empty DataFrame with correct columns
-        return pd.DataFrame(columns=[
-            'ticket_id', 'created_at', 'updated_at', 'name', 'email', 
-            'subject', 'category', 'priority', 'status', 'description', 'resolution'
-        ])
+        return pd.DataFrame(columns=TICKET_COLUMNS)
+    
+    tickets_df = _load_tickets(file_path)
+    if start is not None or end is not None:
+        tickets_df = tickets_df[_created_between(tickets_df, start, end)]
+    
+    if include_archive:
+        archived_df = ticket_archive.load_archive(file_path, start, end)
+        if archived_df is not None and (start is not None or end is not None):
+            archived_df = archived_df[_created_between(archived_df, start, end)]
+        tickets_df = _with_archive(tickets_df, archived_df)
+    
+    # Callers may modify the result, so hand out a copy of the cached table
+    return tickets_df.copy()
+
+def _search_mask(search_term, tickets_df, index_key, version, mode):
+    """
+    Mask of the rows of tickets_df matching a search (see search_tickets)
+    """
+    if mode == 'substring':
+        # Case-insensitive search across multiple columns
+        mask = pd.Series(False, index=tickets_df.index)
+        for column in search_index.SEARCH_FIELDS:
+            mask |= tickets_df[column].astype('string').str.contains(search_term, case=False, na=False, regex=False)
+        return mask
     
-    return pd.read_csv(file_path)
+    matching_ids = search_index.search(index_key, search_term, tickets_df, version)
+    return tickets_df['ticket_id'].astype(str).isin(matching_ids)
+
+# Results of a ranked search unless the caller asks for another number
+SEARCH_LIMIT = 50
+
+def _ranked_search(search_term, file_path, include_archive, limit):
+    """
+    The best matches of a ranked search with their scores, from best to worst
+    """
+    version, tickets_df = _load_tickets_versioned(file_path)
+    ranked = search_index.rank(os.path.abspath(file_path), search_term, tickets_df, version, limit)
+    results_df = tickets_df[tickets_df['ticket_id'].astype(str).isin([ticket_id for ticket_id, _ in ranked])]
+    scores = dict(ranked)
+    
+    if include_archive:
+        archive_version = ticket_archive.get_archive_version(file_path)
+        archived_df = ticket_archive.load_archive(file_path)
+        if archived_df is not None:
+            archive_key = os.path.abspath(ticket_archive.archive_dir_for(file_path))
+            archived = search_index.rank(archive_key, search_term, archived_df, archive_version, limit)
+            # The best of both top lists
+            ranked = heapq.nlargest(limit, ranked + archived, key=lambda item: item[1])
+            scores = dict(ranked)
+            archived_ids = {ticket_id for ticket_id, _ in archived}
+            results_df = _with_archive(results_df, archived_df[archived_df['ticket_id'].astype(str).isin(archived_ids)])
+    
+    results_df = results_df[results_df['ticket_id'].astype(str).isin(scores)]
+    results_df = results_df.assign(score=results_df['ticket_id'].astype(str).map(scores))
+    return results_df.sort_values('score', ascending=False)
+
+@_instrumented
+@_pluggable
+def search_tickets(search_term, file_path, mode='index', include_archive=False, limit=None):
+    """
+    Search tickets by ID, name, email, subject and description, newest first.
+    mode 'index' matches every word as a word prefix through the inverted index,
+    mode 'substring' does case-insensitive substring matching on the raw columns.
+    mode 'ranked' also accepts words with a typo and returns the best `limit`
+    (default SEARCH_LIMIT) matches by relevance instead, with their score.
+    Archived tickets are searched only if include_archive is set.
+    """
+    if not os.path.exists(file_path):
+        return pd.DataFrame(columns=TICKET_COLUMNS)
+    
+    if mode == 'ranked':
+        return _ranked_search(search_term, file_path, include_archive, limit or SEARCH_LIMIT)
+    
+    # The index is tagged with the version of the very table it is built from
+    version, tickets_df = _load_tickets_versioned(file_path)
+    results_df = tickets_df[_search_mask(search_term, tickets_df, os.path.abspath(file_path), version, mode)]
+    
+    if include_archive:
+        # Taken before loading, so an index of newer partitions is rebuilt rather than kept stale
+        archive_version = ticket_archive.get_archive_version(file_path)
+        archived_df = ticket_archive.load_archive(file_path)
+        if archived_df is not None:
+            # The archive has its own word index, rebuilt only when a partition changes
+            archive_key = os.path.abspath(ticket_archive.archive_dir_for(file_path))
+            archive_mask = _search_mask(search_term, archived_df, archive_key, archive_version, mode)
+            results_df = _with_archive(results_df, archived_df[archive_mask])
+    
+    results_df = results_df.sort_values('created_at', ascending=False)
+    return results_df if limit is None else results_df.head(limit)
+
+# Typed report tables by file, shared by all sessions: {path: (version, DataFrame)}
+_report_tables = {}
+_report_tables_lock = threading.Lock()
+
+@_instrumented
+def get_report_table(file_path):
+    """
+    Tickets with parsed timestamps and categorical status, category and priority,
+    sorted by created_at. Loaded from the columnar snapshot, which is regenerated
+    only when the data changed. The returned DataFrame is shared and must not be modified.
+    """
+    # Imported here so pages that don't report never load pyarrow
+    import ticket_snapshot
+    
+    if get_storage_backend() != 'csv':
+        return ticket_snapshot.to_report_table(get_all_tickets(file_path))
+    
+    if not os.path.exists(file_path):
+        return ticket_snapshot.to_report_table(pd.DataFrame(columns=TICKET_COLUMNS))
+    
+    key = os.path.abspath(file_path)
+    with _report_tables_lock:
+        # The local write counter is left out, the snapshot is shared between processes
+        version = get_data_version(file_path)[:2]
+        entry = _report_tables.get(key)
+        if entry is not None and entry[0] == version:
+            return entry[1]
+        
+        report_df = ticket_snapshot.load_snapshot(file_path, version)
+        if report_df is None:
+            # Parsed typed, without going through the (untyped) ticket table cache
+            with perf_metrics.measure('csv.parse_typed') as measurement:
+                report_df = ticket_snapshot.to_report_table(
+                    _without_deleted(file_path, ticket_schema.read_tickets(file_path, categorical=True, parse_dates=True))
+                )
+                measurement['rows'] = len(report_df)
+                perf_metrics.add_bytes(read=version[1])
+            ticket_snapshot.write_snapshot(file_path, report_df, version)
+            # Served from the mapped snapshot, so the parsed copy of the text columns can go
+            snapshot_df = ticket_snapshot.load_snapshot(file_path, version)
+            if snapshot_df is not None:
+                report_df = snapshot_df
+        
+        _report_tables[key] = (version, report_df)
+        return report_df
+
+# Typed tables of archive partitions: {path: (partition DataFrame, typed DataFrame)}
+_archived_report_tables = {}
+
+@_instrumented
+def get_archived_report_table(file_path, start=None, end=None):
+    """
+    Archived tickets of the months overlapping the days start..end, typed and sorted
+    like get_report_table. The returned DataFrame must not be modified.
+    """
+    import ticket_snapshot
+    
+    frames = []
+    for _, path in ticket_archive.list_partitions(file_path, start, end):
+        # A partition that changed is loaded as a new DataFrame
+        partition_df = ticket_archive.load_partition(path)
+        with _report_tables_lock:
+            entry = _archived_report_tables.get(path)
+        if entry is None or entry[0] is not partition_df:
+            entry = (partition_df, ticket_snapshot.to_report_table(partition_df))
+            with _report_tables_lock:
+                _archived_report_tables[path] = entry
+        frames.append(entry[1])
+    
+    if not frames:
+        return ticket_snapshot.to_report_table(pd.DataFrame(columns=TICKET_COLUMNS))
+    # Partitions are months in order, so the result stays sorted by created_at
+    return pd.concat(frames, ignore_index=True)
+
+def get_archive_version(file_path):
+    """
+    Version of the archive partitions of a tickets file
+    """
+    return ticket_archive.get_archive_version(file_path)
+
+def is_archived_ticket(ticket_id, file_path):
+    """
+    Whether a ticket has been moved to the archive (archived tickets are read-only)
+    """
+    return ticket_archive.is_archived(file_path, ticket_id)
+
+@_instrumented
+@_serialized
+def archive_tickets(file_path, older_than_days=None, now=None):
+    """
+    Move Closed and Resolved tickets that haven't been updated for older_than_days
+    (default TICKET_ARCHIVE_DAYS) from the tickets file into the monthly archive
+    partitions. Returns the number of tickets archived.
+    """
+    if get_storage_backend() != 'csv' or not os.path.exists(file_path):
+        return 0
+    
+    if older_than_days is None:
+        older_than_days = ticket_archive.DEFAULT_ARCHIVE_DAYS
+    
+    tickets_df = _load_tickets(file_path)
+    mask = ticket_archive.select_for_archive(tickets_df, older_than_days, now or datetime.now())
+    if not mask.any():
+        return 0
+    
+    # Partitions are written first, so an interrupted run leaves copies, never losses
+    archived_df = tickets_df[mask]
+    ticket_archive.write_partitions(file_path, archived_df)
+    return delete_tickets(archived_df['ticket_id'].tolist(), file_path)
 
 def is_valid_email(email):
     """
@@ -106,18 +754,47 @@ def is_valid_email(email):
     pattern = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
     return re.match(pattern, email) is not None
 
-def hash_password(password):
+# Password hashes are PBKDF2-HMAC-SHA256 with a random salt, stored as
+# "pbkdf2_sha256$<iterations>$<salt hex>$<hash hex>". The iteration count is the
+# cost of a login; benchmarks/login_latency.py measures it against a latency budget.
+PASSWORD_HASH_ALGORITHM = 'pbkdf2_sha256'
+PASSWORD_HASH_ITERATIONS = int(os.environ.get('PASSWORD_HASH_ITERATIONS', '240000'))
+
+def hash_password(password, iterations=None):
     """
-    Create a SHA-256 hash of the password for basic security
+    Create a salted PBKDF2 hash of the password
     """
-    return hashlib.sha256(password.encode()).hexdigest()
+    iterations = iterations or PASSWORD_HASH_ITERATIONS
+    salt = os.urandom(16)
+    digest = hashlib.pbkdf2_hmac('sha256', password.encode(), salt, iterations)
+    return f"{PASSWORD_HASH_ALGORITHM}${iterations}${salt.hex()}${digest.hex()}"
 
 def verify_password(hashed_password, input_password):
     """
-    Verify a password against its hash
+    Verify a password against its hash. Unsalted SHA-256 hashes from older
+    versions are still accepted until the password is hashed again.
+    """
+    hashed_password = str(hashed_password)
+    if not hashed_password.startswith(PASSWORD_HASH_ALGORITHM + '$'):
+        legacy = hashlib.sha256(input_password.encode()).hexdigest()
+        return hmac.compare_digest(hashed_password, legacy)
+    
+    try:
+        _, iterations, salt, digest = hashed_password.split('$')
+        expected = hashlib.pbkdf2_hmac('sha256', input_password.encode(), bytes.fromhex(salt), int(iterations))
+    except ValueError:
+        return False
+    return hmac.compare_digest(expected.hex(), digest)
+
+def password_needs_rehash(hashed_password):
+    """
+    Whether a hash is legacy SHA-256 or uses a different cost than configured
     """
-    return hashed_password == hash_password(input_password)
+    parts = str(hashed_password).split('$')
+    return len(parts) != 4 or parts[0] != PASSWORD_HASH_ALGORITHM or parts[1] != str(PASSWORD_HASH_ITERATIONS)
 
+@_instrumented
+@_pluggable
 def get_ticket_stats(file_path):
     """
     Get ticket statistics for dashboard
@@ -133,146 +810,247 @@ def get_ticket_stats(file_path):
             'by_priority': {}
         }
     
-    tickets_df = pd.read_csv(file_path)
+    # Counters are maintained by the write functions; recount only if they are missing or stale
+    counts = ticket_stats.load_stats(file_path)
+    if counts is None:
+        # Rebuild on the writer thread so it can't interleave with a write
+        counts = data_writer.run(
+            file_path, lambda: ticket_stats.rebuild_stats(file_path, _load_columns(file_path, list(ticket_stats.COUNTED_COLUMNS)))
+        )
     
-    # Calculate stats
-    total = len(tickets_df)
+    return ticket_stats.summarize(counts)
+
+# Rollups including the archive: {path: ((data version, archive version), DataFrame)}
+_archive_rollups = {}
+_archive_rollups_lock = threading.Lock()
+
+@_instrumented
+@_pluggable
+def get_daily_rollup(file_path, include_archive=False):
+    """
+    Ticket counts by creation day, category, status and priority as a DataFrame
+    (date, category, status, priority, count). Maintained by the write functions,
+    so reading it doesn't touch the ticket rows. With include_archive the counts
+    of the archive partitions are added. The DataFrame is shared and must not be modified.
+    """
+    if not os.path.exists(file_path):
+        return pd.DataFrame(columns=['date', 'category', 'status', 'priority', 'count'])
     
-    if total == 0:
-        return {
-            'total': 0,
-            'open': 0,
-            'in_progress': 0,
-            'resolved': 0,
-            'closed': 0,
-            'by_category': {},
-            'by_priority': {}
-        }
+    rollup_df = ticket_rollup.load_rollup(file_path)
+    if rollup_df is None:
+        # Missing or stale: recount once on the writer thread
+        data_writer.run(file_path, lambda: ticket_rollup.rebuild_rollup(file_path, _load_columns(file_path, ticket_rollup.ROLLUP_COLUMNS)))
+        rollup_df = ticket_rollup.load_rollup(file_path)
+    
+    if not include_archive:
+        return rollup_df
+    
+    key = os.path.abspath(file_path)
+    version = (get_data_version(file_path), ticket_archive.get_archive_version(file_path))
+    with _archive_rollups_lock:
+        entry = _archive_rollups.get(key)
+    if entry is not None and entry[0] == version:
+        return entry[1]
+    
+    # Partition counts are kept per partition, so only changed partitions are recounted
+    archived_counts = ticket_archive.get_counts(file_path, ['category', 'status', 'priority'])
+    archived_counts['date'] = pd.to_datetime(archived_counts['date'], errors='coerce')
+    combined_df = (
+        pd.concat([rollup_df, archived_counts], ignore_index=True)
+        .groupby(['date', 'category', 'status', 'priority'], as_index=False)['count'].sum()
+        .sort_values('date', kind='stable').reset_index(drop=True)
+    )
+    with _archive_rollups_lock:
+        _archive_rollups[key] = (version, combined_df)
+    return combined_df
+
+def get_events_version(file_path):
+    """
+    Version of the status/priority event log of a tickets file
+    """
+    return ticket_events.get_events_version(file_path)
+
+def get_response_metrics(tickets_df, file_path):
+    """
+    Time to first response and to resolution (hours) and age of unresolved tickets (days)
+    for a set of tickets, as {metric: {'mean', 'p50', 'p90', 'count'}}. Response and
+    resolution times come from the event log, which is read incrementally.
+    """
+    return ticket_events.response_metrics(tickets_df, ticket_events.get_timings(file_path), datetime.now())
+
+def verify_ticket_stats(file_path):
+    """
+    Check the maintained dashboard counters against a full recount
+    """
+    if get_storage_backend() != 'csv' or not os.path.exists(file_path):
+        return True
     
-    open_tickets = len(tickets_df[tickets_df['status'] == 'Open'])
-    in_progress = len(tickets_df[tickets_df['status'] == 'In Progress'])
-    resolved = len(tickets_df[tickets_df['status'] == 'Resolved'])
-    closed = len(tickets_df[tickets_df['status'] == 'Closed'])
-    
-    # By category and priority
-    by_category = tickets_df['category'].value_counts().to_dict()
-    by_priority = tickets_df['priority'].value_counts().to_dict()
-    
-    return {
-        'total': total,
-        'open': open_tickets,
-        'in_progress': in_progress,
-        'resolved': resolved,
-        'closed': closed,
-        'by_category': by_category,
-        'by_priority': by_priority
-    }
+    return ticket_stats.verify_stats(file_path, _load_tickets(file_path))
+
+USER_COLUMNS = ['username', 'password', 'role']
 
+# Process-wide directory of the admin file's users, keyed by username. It is
+# reloaded when the file's mtime or size changes (e.g. another process wrote it)
+# or when the user functions of this process write it.
+_user_directory = {'version': None, 'users': {}}
+_user_directory_lock = threading.Lock()
+_user_writes = [0]
+
+def _user_file_version():
+    try:
+        stat = os.stat(ADMIN_FILE)
+    except FileNotFoundError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size, _user_writes[0])
+
+def _load_users():
+    """
+    Users of the admin file as {username: {'username', 'password', 'role'}}, in file order.
+    The dict is shared and must not be modified.
+    """
+    with _user_directory_lock:
+        version = _user_file_version()
+        if version is None:
+            return {}
+        if _user_directory['version'] != version:
+            with open(ADMIN_FILE, newline='', encoding='utf-8') as f:
+                users = {row['username']: {column: row.get(column) or '' for column in USER_COLUMNS} for row in csv.DictReader(f)}
+            perf_metrics.add_bytes(read=version[1])
+            _user_directory['users'] = users
+            _user_directory['version'] = version
+        return _user_directory['users']
+
+def _write_users(users):
+    """
+    Replace the admin file with a list of users and drop the cached directory
+    """
+    def write(f):
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(USER_COLUMNS)
+        for user in users:
+            writer.writerow([user[column] for column in USER_COLUMNS])
+    
+    os.makedirs(os.path.dirname(ADMIN_FILE), exist_ok=True)
+    data_writer.replace_file(ADMIN_FILE, write)
+    with _user_directory_lock:
+        _user_writes[0] += 1
+
+# The user functions hash passwords on the caller's thread and only queue the
+# admin file update on the writer, so ticket writes don't wait behind a hash.
+
+def _create_admin_file(user):
+    """
+    Create the admin file with its first user, unless it exists by now. Runs on the writer thread.
+    """
+    if os.path.exists(ADMIN_FILE):
+        return False
+    _write_users([user])
+    return True
+
+@_instrumented
+@_pluggable
 def initialize_admin_account(username, password):
     """
     Initialize admin account data
     """
-    os.makedirs('data', exist_ok=True)
-    admin_file = 'data/admin.csv'
-    
     # Create admin file if it doesn't exist
-    if not os.path.exists(admin_file):
-        admin_df = pd.DataFrame(columns=['username', 'password', 'role'])
-        admin_df = pd.concat([
-            admin_df, 
-            pd.DataFrame([{
-                'username': username,
-                'password': hash_password(password),
-                'role': 'admin'
-            }])
-        ], ignore_index=True)
-        admin_df.to_csv(admin_file, index=False)
-        return True
+    if os.path.exists(ADMIN_FILE):
+        return False
     
-    return False
+    user = {'username': username, 'password': hash_password(password), 'role': 'admin'}
+    return data_writer.run(ADMIN_FILE, _create_admin_file, user)
 
+@_instrumented
+@_pluggable
 def get_admin_user(username):
     """
     Get admin user details
     """
-    admin_file = 'data/admin.csv'
-    
-    if not os.path.exists(admin_file):
+    if not os.path.exists(ADMIN_FILE):
         # Initialize default admin account if none exists
         initialize_admin_account('admin', 'admin123')
     
-    admin_df = pd.read_csv(admin_file)
-    user = admin_df[admin_df['username'] == username]
-    
-    if len(user) == 0:
+    user = _load_users().get(username)
+    if user is None:
         return None
     
-    return user.iloc[0].to_dict()
+    return dict(user)
 
-def add_user(username, password, role):
+def _insert_user(user):
     """
-    Add a new user to the admin.csv file
+    Add a user to the admin file unless the username is taken. Runs on the writer thread.
     """
-    os.makedirs('data', exist_ok=True)
-    admin_file = 'data/admin.csv'
+    users = _load_users()
     
-    if os.path.exists(admin_file):
-        admin_df = pd.read_csv(admin_file)
-        
-        # Check if username already exists
-        if username in admin_df['username'].values:
-            return False
-    else:
-        admin_df = pd.DataFrame(columns=['username', 'password', 'role'])
-    
-    # Add new user
-    new_user = pd.DataFrame([{
-        'username': username,
-        'password': hash_password(password),
-        'role': role
-    }])
+    # Check if username already exists
+    if user['username'] in users:
+        return False
     
-    admin_df = pd.concat([admin_df, new_user], ignore_index=True)
-    admin_df.to_csv(admin_file, index=False)
+    _write_users(list(users.values()) + [user])
+    return True
+
+@_instrumented
+@_pluggable
+def add_user(username, password, role):
+    """
+    Add a new user to the admin.csv file
+    """
+    new_user = {'username': username, 'password': hash_password(password), 'role': role}
+    return data_writer.run(ADMIN_FILE, _insert_user, new_user)
+
+def _set_password(username, password):
+    """
+    Replace a user's password hash in the admin file. Runs on the writer thread.
+    """
+    users = _load_users()
+    if username not in users:
+        return False
     
+    _write_users([dict(user, password=password) if name == username else user for name, user in users.items()])
     return True
 
+@_instrumented
+@_pluggable
+def update_password(username, new_password):
+    """
+    Replace a user's password
+    """
+    return data_writer.run(ADMIN_FILE, _set_password, username, hash_password(new_password))
+
+@_instrumented
+@_pluggable
 def get_all_users():
     """
     Get all admin users
     """
-    admin_file = 'data/admin.csv'
-    
-    if not os.path.exists(admin_file):
+    if not os.path.exists(ADMIN_FILE):
         # Initialize default admin account if none exists
         initialize_admin_account('admin', 'admin123')
     
-    admin_df = pd.read_csv(admin_file)
     # For security, don't return password hashes
-    return admin_df[['username', 'role']]
+    users = _load_users()
+    return pd.DataFrame(
+        [[user['username'], user['role']] for user in users.values()],
+        columns=['username', 'role']
+    )
 
+@_instrumented
+@_pluggable
+@_serialized
 def delete_user(username):
     """
     Delete a user by username
     """
-    admin_file = 'data/admin.csv'
-    
-    if not os.path.exists(admin_file):
-        return False
-    
-    admin_df = pd.read_csv(admin_file)
+    users = _load_users()
     
     # Prevent deleting all admin users
-    if len(admin_df[admin_df['role'] == 'admin']) <= 1 and username in admin_df[admin_df['role'] == 'admin']['username'].values:
+    admins = [name for name, user in users.items() if user['role'] == 'admin']
+    if len(admins) <= 1 and username in admins:
         return False
     
-    # Find and remove user
-    original_count = len(admin_df)
-    admin_df = admin_df[admin_df['username'] != username]
-    
-    if len(admin_df) == original_count:
+    if username not in users:
         return False  # No user was removed
     
     # Save to CSV
-    admin_df.to_csv(admin_file, index=False)
+    _write_users([user for name, user in users.items() if name != username])
     return True